@@ -0,0 +1,105 @@
+"""
+TextCNN Inference Benchmark
+
+Compares CPU throughput of the fused multi-width convolution against the
+per-width Conv1d loop on random padded batches, and optionally the
+dynamically quantized model (INT8 linear layers and int8 embeddings).
+
+Usage:
+    python scripts/benchmark_cnn.py
+    python scripts/benchmark_cnn.py --batch-sizes 1 8 32 --max-length 512 --threads 4
+    python scripts/benchmark_cnn.py --quantize
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import torch
+
+from src.models.cnn_models import CONV_MODES, TextCNN
+from src.models.quantization import checkpoint_size
+from src.utils.helpers import load_config
+
+
+def time_forward(model: TextCNN, token_ids: torch.Tensor, lengths: torch.Tensor, repeats: int) -> float:
+    """Median seconds per forward pass"""
+    timings = []
+    with torch.inference_mode():
+        model(token_ids, lengths)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(token_ids, lengths)
+            timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    """Main function to benchmark the TextCNN convolution modes"""
+    parser = argparse.ArgumentParser(description='Benchmark TextCNN convolution modes')
+    parser.add_argument('--config', default='config/config.yml', help='Configuration file')
+    parser.add_argument('--variant', default=None, help='cnn_variants entry of model_configs.yml')
+    parser.add_argument('--vocab-size', type=int, default=10000, help='Vocabulary size')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 64], help='Batch sizes')
+    parser.add_argument('--max-length', type=int, default=256, help='Padded sequence length')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed passes per setting')
+    parser.add_argument('--threads', type=int, default=None, help='torch.set_num_threads value')
+    parser.add_argument('--quantize', action='store_true', help='Also benchmark the quantized model')
+
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+
+    model = TextCNN.from_config(load_config(args.config), args.vocab_size, variant=args.variant).eval()
+
+    print("\n" + "="*50)
+    print("TEXTCNN BENCHMARK")
+    print("="*50)
+    print(f"Filters: {model.filter_sizes} x {model.num_filters}, embedding_dim={model.embedding_dim}")
+    print(f"Threads: {torch.get_num_threads()}, max length: {args.max_length}")
+    print(f"{'batch':>6} {'fused ms':>10} {'loop ms':>10} {'speedup':>8} {'songs/s':>10} {'max diff':>10}")
+
+    batches = {}
+    for batch_size in args.batch_sizes:
+        lengths = torch.randint(args.max_length // 4, args.max_length + 1, (batch_size,))
+        lengths[0] = args.max_length
+        token_ids = torch.randint(1, args.vocab_size, (batch_size, args.max_length))
+        token_ids[torch.arange(args.max_length)[None, :] >= lengths[:, None]] = 0
+        batches[batch_size] = (token_ids, lengths)
+
+        timings, outputs = {}, {}
+        for mode in CONV_MODES:
+            model.conv_mode = mode
+            timings[mode] = time_forward(model, token_ids, lengths, args.repeats)
+            with torch.inference_mode():
+                outputs[mode] = model(token_ids, lengths)
+        difference = (outputs['fused'] - outputs['loop']).abs().max().item()
+        print(
+            f"{batch_size:>6} {timings['fused'] * 1000:>10.2f} {timings['loop'] * 1000:>10.2f} "
+            f"{timings['loop'] / timings['fused']:>7.2f}x {batch_size / timings['fused']:>10.0f} {difference:>10.1e}"
+        )
+    print("="*50)
+
+    if args.quantize:
+        model.conv_mode = 'fused'
+        quantized = model.quantize()
+        print(f"Checkpoint: {checkpoint_size(model) / 1e6:.2f} MB float32, "
+              f"{checkpoint_size(quantized) / 1e6:.2f} MB quantized")
+        print(f"{'batch':>6} {'fp32 ms':>10} {'int8 ms':>10} {'speedup':>8} {'max prob diff':>14}")
+        for batch_size, (token_ids, lengths) in batches.items():
+            fp32 = time_forward(model, token_ids, lengths, args.repeats)
+            int8 = time_forward(quantized, token_ids, lengths, args.repeats)
+            difference = abs(
+                model.predict_batch(token_ids, lengths) - quantized.predict_batch(token_ids, lengths)
+            ).max()
+            print(f"{batch_size:>6} {fp32 * 1000:>10.2f} {int8 * 1000:>10.2f} {fp32 / int8:>7.2f}x {difference:>14.1e}")
+        print("="*50)
+
+
+if __name__ == "__main__":
+    main()
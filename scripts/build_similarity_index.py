@@ -0,0 +1,115 @@
+"""
+Lyric Similarity Index Script
+
+Embeds songs with DocumentEmbedder and stores them in an IVF index for
+nearest-neighbour queries. Ids are the stable song keys, so rerunning with
+--incremental only embeds and inserts songs not yet indexed.
+
+Usage:
+    python scripts/build_similarity_index.py --input "data/raw/*.csv"
+    python scripts/build_similarity_index.py --input data/raw/new_songs.csv --incremental
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.data.data_loader import MusicDataLoader
+from src.data.preprocessor import SONG_KEY_COLUMNS
+from src.features.embeddings import DocumentEmbedder, EmbeddingStore
+from src.features.similarity import IVFIndex
+from src.utils.helpers import load_config, stable_row_hashes
+
+
+def main():
+    """Main function to build or extend the similarity index"""
+    parser = argparse.ArgumentParser(description='Build the lyric similarity index')
+    parser.add_argument(
+        '--input',
+        required=True,
+        help='CSV/Parquet file or glob pattern with lyrics'
+    )
+    parser.add_argument(
+        '--output',
+        default=None,
+        help='Index directory (default: features.similarity.path from config)'
+    )
+    parser.add_argument(
+        '--config',
+        default='config/config.yml',
+        help='Configuration file'
+    )
+    parser.add_argument(
+        '--data-dir',
+        default='data',
+        help='Data directory path'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Add songs to the existing index instead of rebuilding it'
+    )
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    features = load_config(args.config).get('features', {})
+    embedding_params = features.get('embeddings', {})
+    document_params = embedding_params.get('document', {})
+    index_params = features.get('similarity', {})
+    output_dir = Path(args.output or index_params.get('path', 'data/processed/similarity_index'))
+
+    loader = MusicDataLoader(data_dir=args.data_dir, config_path=args.config)
+    df = loader.load_many(args.input)
+    ids = stable_row_hashes(df, SONG_KEY_COLUMNS).view(np.int64)
+
+    backend = document_params.get('backend', 'mean')
+    store = EmbeddingStore.open(embedding_params.get('path', 'data/processed/embeddings')) if backend == 'mean' else None
+    embedder = DocumentEmbedder(
+        store,
+        backend=backend,
+        cache_dir=document_params.get('cache_dir'),
+        batch_size=document_params.get('batch_size', 64),
+        chunk_tokens=document_params.get('chunk_tokens', 256)
+    )
+
+    if args.incremental and (output_dir / IVFIndex.META_FILE).exists():
+        index = IVFIndex.load(output_dir, mmap=False)
+    else:
+        index = IVFIndex(
+            embedder.dim,
+            n_lists=index_params.get('n_lists'),
+            n_probe=index_params.get('n_probe', 8)
+        )
+
+    _, first = np.unique(ids, return_index=True)
+    new_rows = np.sort(first)
+    new_rows = new_rows[~index.contains(ids[new_rows])]
+    logger.info(f"Embedding {len(new_rows)} new songs out of {len(df)}")
+    if len(new_rows):
+        index.add(embedder.embed(df['lyrics'].iloc[new_rows].tolist()), ids=ids[new_rows])
+    index.save(output_dir)
+
+    print("\n" + "="*50)
+    print("SIMILARITY INDEX SUMMARY")
+    print("="*50)
+    print(f"Songs added: {len(new_rows)}")
+    print(f"Songs indexed: {len(index)}")
+    print(f"Inverted lists: {index.n_lists} (n_probe={index.n_probe})")
+    print(f"Index saved in: {output_dir}")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    main()
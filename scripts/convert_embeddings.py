@@ -0,0 +1,79 @@
+"""
+Pretrained Embeddings Conversion Script
+
+Converts a GloVe / word2vec / fastText text file once into a memory-mapped
+matrix aligned to the corpus vocabulary.
+
+Usage:
+    python scripts/convert_embeddings.py --vectors data/external/glove.6B.300d.txt --corpus data/processed/corpus_2024_01_01
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.preprocessor import TokenizedCorpus
+from src.features.embeddings import EmbeddingStore
+from src.utils.helpers import load_config
+
+
+def main():
+    """Main function to convert pretrained vectors into an embedding store"""
+    parser = argparse.ArgumentParser(description='Convert pretrained word vectors')
+    parser.add_argument(
+        '--vectors',
+        required=True,
+        help='GloVe / word2vec / fastText .vec text file'
+    )
+    parser.add_argument(
+        '--corpus',
+        required=True,
+        help='Tokenized corpus directory whose vocabulary the rows follow'
+    )
+    parser.add_argument(
+        '--output',
+        default=None,
+        help='Store directory (default: features.embeddings.path from config)'
+    )
+    parser.add_argument(
+        '--config',
+        default='config/config.yml',
+        help='Configuration file'
+    )
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    params = load_config(args.config).get('features', {}).get('embeddings', {})
+    output_dir = args.output or params.get('path', 'data/processed/embeddings')
+    vocabulary = TokenizedCorpus.open(args.corpus).vocabulary
+
+    store = EmbeddingStore.convert(
+        args.vectors,
+        vocabulary,
+        output_dir,
+        dtype=params.get('dtype', 'float32'),
+        buckets=params.get('subword_buckets', 2 ** 15)
+    )
+
+    print("\n" + "="*50)
+    print("EMBEDDINGS SUMMARY")
+    print("="*50)
+    print(f"Vocabulary size: {len(store)}")
+    print(f"Dimension: {store.dim} ({store.meta['dtype']})")
+    print(f"Found in pretrained file: {store.meta['found']}")
+    print(f"OOV filled from subwords: {store.meta['oov_subword_filled']}")
+    print(f"Store saved in: {output_dir}")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,14 @@ Uso:
 """
 
 import argparse
-import pandas as pd
 import numpy as np
 import sys
 from pathlib import Path
 
-# Add src to path
-sys.path.append(str(Path(__file__).parent.parent / "src"))
-from data.data_loader import MusicDataLoader
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+from src.data.data_loader import MusicDataLoader
+from src.utils.helpers import compute_decade
 
 
 def create_labeling_template(input_path: str, sample_size: int, output_dir: str):
@@ -41,19 +41,19 @@ def create_labeling_template(input_path: str, sample_size: int, output_dir: str)
     
     df = None
     for file_path in possible_files:
-        try:
-            df = pd.read_csv(file_path)
-            print(f"✅ Dados carregados de: {file_path}")
-            break
-        except FileNotFoundError:
+        if not Path(file_path).exists():
             continue
+        # Lê via cache colunar (Parquet) para evitar reprocessar o CSV a cada execução
+        df = loader.load_local_csv(file_path)
+        print(f"✅ Dados carregados de: {file_path}")
+        break
     
     if df is None:
         raise FileNotFoundError("Nenhum arquivo de dados encontrado!")
     
     # Amostragem estratificada por década
     if 'year' in df.columns:
-        df['decade'] = (df['year'] // 10) * 10
+        df['decade'] = compute_decade(df['year'])
         # Amostra proporcional por década
         sampled_df = df.groupby('decade').apply(
             lambda x: x.sample(min(len(x), sample_size // df['decade'].nunique()))
@@ -62,17 +62,7 @@ def create_labeling_template(input_path: str, sample_size: int, output_dir: str)
         # Amostragem aleatória simples
         sampled_df = df.sample(min(sample_size, len(df)))
     
-    # Mapeia nomes de colunas para nomes padronizados
-    column_mapping = {
-        'Song Title': 'title',
-        'Artist': 'artist', 
-        'Year': 'year',
-        'Lyrics': 'lyrics'
-    }
-    
-    # Renomeia as colunas
-    sampled_df = sampled_df.rename(columns=column_mapping)
-    
+    # Nomes de colunas já vêm padronizados pelo loader (config.yml: data.columns)
     # Cria template de rotulação
     labeling_df = sampled_df[['title', 'artist', 'year', 'lyrics']].copy()
     
@@ -2,4 +2,90 @@
 Data Preprocessing Pipeline Script
 
 Processes raw music data and prepares it for model training.
-"""
\ No newline at end of file
+
+Usage:
+    python scripts/data_preprocessing.py --input data/raw/music_lyrics_2019.csv
+    python scripts/data_preprocessing.py --input "data/raw/*.csv" --output data/processed/corpus_2024_01_01
+    python scripts/data_preprocessing.py --input "data/raw/*.csv" --output data/processed/corpus_2024_01_01 --incremental
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.data_loader import MusicDataLoader
+from src.data.preprocessor import LyricsPreprocessor
+from src.utils.helpers import load_config
+
+
+def main():
+    """Main function to tokenize lyrics into a memory-mapped corpus"""
+    parser = argparse.ArgumentParser(description='Preprocess music lyrics dataset')
+    parser.add_argument(
+        '--input',
+        required=True,
+        help='CSV/Parquet file or glob pattern with lyrics'
+    )
+    parser.add_argument(
+        '--output',
+        default=None,
+        help='Corpus directory (default: data/processed/corpus_YYYY_MM_DD)'
+    )
+    parser.add_argument(
+        '--config',
+        default='config/config.yml',
+        help='Configuration file'
+    )
+    parser.add_argument(
+        '--data-dir',
+        default='data',
+        help='Data directory path'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only tokenize songs not already stored in --output (requires --output)'
+    )
+
+    args = parser.parse_args()
+    if args.incremental and args.output is None:
+        # The dated default would start a new corpus on every run
+        parser.error('--incremental requires --output pointing at the corpus to update')
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    config = load_config(args.config)
+    output_dir = args.output or str(Path(args.data_dir) / "processed" / f"corpus_{time.strftime('%Y_%m_%d')}")
+
+    loader = MusicDataLoader(data_dir=args.data_dir, config_path=args.config)
+    df = loader.load_many(args.input)
+    logger.info(f"Loaded {len(df)} songs from {args.input}")
+
+    preprocessor = LyricsPreprocessor.from_config(config)
+    if args.incremental:
+        corpus, _ = preprocessor.update_corpus(df, output_dir)
+    else:
+        corpus = preprocessor.process_corpus(df['lyrics'], output_dir)
+
+    print("\n" + "="*50)
+    print("PREPROCESSING SUMMARY")
+    print("="*50)
+    print(f"Songs: {len(corpus)}")
+    print(f"Vocabulary size: {len(corpus.vocabulary)}")
+    print(f"Max sequence length: {corpus.max_sequence_length}")
+    print(f"Mean tokens per song: {corpus.lengths.mean():.1f}")
+    print(f"Corpus saved in: {output_dir}")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Downloads and prepares the music lyrics dataset from Kaggle.
 Usage:
     python scripts/download_data.py
     python scripts/download_data.py --dataset "custom/dataset-name"
+    python scripts/download_data.py --kaggle-source /mnt/kaggle-mirror
 """
 
 import argparse
@@ -13,10 +14,11 @@ import logging
 import sys
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+# Add project root to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
 
-from data.data_loader import MusicDataLoader, load_music_dataset
+from src.data.data_loader import MusicDataLoader, load_music_dataset
+from src.utils.helpers import compute_decade
 
 
 def setup_logging():
@@ -54,6 +56,11 @@ def main():
         action='store_true',
         help='Force re-download even if cached'
     )
+    parser.add_argument(
+        '--kaggle-source',
+        default=None,
+        help='Local directory mirroring Kaggle datasets (offline runs)'
+    )
     
     args = parser.parse_args()
     
@@ -65,7 +72,7 @@ def main():
         logger.info("Starting data download process...")
         
         # Initialize data loader
-        loader = MusicDataLoader(data_dir=args.data_dir)
+        loader = MusicDataLoader(data_dir=args.data_dir, kaggle_source=args.kaggle_source)
         
         # Download dataset
         df = loader.load_kaggle_dataset(
@@ -74,12 +81,10 @@ def main():
             force_download=args.force_download
         )
         
-        # Get dataset information
-        info = loader.get_dataset_info(df)
+        # Get dataset information and validate in a single profiling pass
+        info, is_valid, issues = loader.profile_dataset(df, approximate_memory=True)
         logger.info(f"Dataset info: {info}")
         
-        # Validate dataset
-        is_valid, issues = loader.validate_dataset(df)
         if not is_valid:
             logger.warning(f"Dataset validation issues found: {issues}")
         else:
@@ -95,22 +100,20 @@ def main():
         print(df.head())
         
         if 'year' in df.columns:
-            print(f"\nYear range: {df['year'].min()} - {df['year'].max()}")
+            print(f"\nYear range: {info['year_range'][0]} - {info['year_range'][1]}")
             print(f"Songs per decade:")
-            decade_counts = (df['year'] // 10 * 10).value_counts().sort_index()
+            decade_counts = compute_decade(df['year']).value_counts().sort_index()
             for decade, count in decade_counts.items():
                 print(f"  {decade}s: {count} songs")
         
         if 'artist' in df.columns:
-            print(f"\nUnique artists: {df['artist'].nunique()}")
+            print(f"\nUnique artists: {info['unique_artists']}")
             print("Top 5 artists by song count:")
-            top_artists = df['artist'].value_counts().head()
-            for artist, count in top_artists.items():
+            for artist, count in list(info['top_artists'].items())[:5]:
                 print(f"  {artist}: {count} songs")
         
         if 'lyrics' in df.columns:
-            avg_length = df['lyrics'].str.len().mean()
-            print(f"\nAverage lyrics length: {avg_length:.1f} characters")
+            print(f"\nAverage lyrics length: {info['avg_lyrics_length']:.1f} characters")
         
         print("\n" + "="*50)
         print("Data download completed successfully!")
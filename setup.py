@@ -18,6 +18,7 @@ setup(
         "scikit-learn>=1.1.0",
         "numpy>=1.21.0",
         "pandas>=1.4.0",
+        "pyarrow>=10.0.0",
         "nltk>=3.7",
         "pyyaml>=6.0",
     ],
@@ -0,0 +1,227 @@
+"""
+Length-Bucketed Batching
+
+Feeds a memory-mapped TokenizedCorpus to PyTorch models with batches of
+songs of similar length, padded only to the longest song in each batch
+instead of ``max_sequence_length``. Lyrics lengths vary widely, so this
+removes most of the padding the CNN would otherwise convolve over.
+"""
+
+import math
+import numpy as np
+from functools import partial
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import torch
+from torch.utils.data import DataLoader, Dataset, Sampler
+
+from .preprocessor import TokenizedCorpus
+
+
+class TokenizedLyricsDataset(Dataset):
+    """
+    Map-style dataset over a TokenizedCorpus
+
+    Items are ``(token_ids, label)`` with ``token_ids`` trimmed to the song
+    length. The memory maps are opened lazily and dropped when pickled, so
+    DataLoader workers map the files themselves instead of receiving a copy.
+    """
+
+    def __init__(
+        self,
+        corpus: Union[TokenizedCorpus, str, Path],
+        labels: Optional[np.ndarray] = None,
+        indices: Optional[np.ndarray] = None
+    ):
+        if isinstance(corpus, TokenizedCorpus):
+            self.path = corpus.path
+            self._corpus = corpus
+        else:
+            self.path = Path(corpus)
+            self._corpus = None
+
+        num_rows = len(self.corpus)
+        self.indices = np.arange(num_rows) if indices is None else np.asarray(indices, dtype=np.int64)
+        self.labels = None if labels is None else np.asarray(labels)
+        if self.labels is not None and len(self.labels) != len(self.indices):
+            raise ValueError(f"Got {len(self.labels)} labels for {len(self.indices)} songs")
+
+    @property
+    def corpus(self) -> TokenizedCorpus:
+        if self._corpus is None:
+            self._corpus = TokenizedCorpus.open(self.path)
+        return self._corpus
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Unpadded length of each item (used to build buckets)"""
+        return np.asarray(self.corpus.lengths)[self.indices]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_corpus'] = None
+        return state
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        row = self.indices[index]
+        length = int(self.corpus.lengths[row])
+        token_ids = self.corpus.tokens[row, :length]
+        label = None if self.labels is None else self.labels[index]
+        return token_ids, label
+
+
+class BucketBatchSampler(Sampler):
+    """
+    Batch sampler that groups songs of similar length
+
+    For training, indices are shuffled, split into pools of
+    ``batch_size * pool_factor`` songs, sorted by length inside each pool and
+    cut into batches; the batch order is then shuffled. Each epoch therefore
+    sees different batches while keeping lengths within a batch close. Without
+    shuffling, all songs are sorted by length (evaluation order).
+
+    With ``weights`` (e.g. from ``compute_sample_weights``), each training
+    epoch draws ``len(lengths)`` songs with replacement in proportion to their
+    weight before pooling, so rare labels are oversampled without copying rows
+    and batches stay length-bucketed.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        shuffle: bool = True,
+        pool_factor: int = 50,
+        drop_last: bool = False,
+        seed: int = 42,
+        weights: Optional[Sequence[float]] = None
+    ):
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        self.lengths = np.asarray(lengths)
+        self.probabilities = None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if len(weights) != len(self.lengths):
+                raise ValueError(f"Got {len(weights)} weights for {len(self.lengths)} songs")
+            if not shuffle:
+                raise ValueError("Weighted sampling requires shuffle=True")
+            if (weights < 0).any() or not weights.sum() > 0:
+                raise ValueError("Weights must be non-negative with a positive sum")
+            self.probabilities = weights / weights.sum()
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.pool_factor = pool_factor
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """Reseed the shuffle so each epoch draws different buckets"""
+        self.epoch = epoch
+
+    def _batches(self) -> List[np.ndarray]:
+        if not self.shuffle:
+            order = np.argsort(self.lengths, kind='stable')
+            batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        else:
+            rng = np.random.default_rng(self.seed + self.epoch)
+            if self.probabilities is None:
+                order = rng.permutation(len(self.lengths))
+            else:
+                order = rng.choice(len(self.lengths), size=len(self.lengths), p=self.probabilities)
+            pool_size = self.batch_size * self.pool_factor
+            batches = []
+            for start in range(0, len(order), pool_size):
+                pool = order[start:start + pool_size]
+                pool = pool[np.argsort(self.lengths[pool], kind='stable')]
+                batches.extend(pool[i:i + self.batch_size] for i in range(0, len(pool), self.batch_size))
+            rng.shuffle(batches)
+
+        if self.drop_last:
+            batches = [batch for batch in batches if len(batch) == self.batch_size]
+        return batches
+
+    def __iter__(self) -> Iterator[List[int]]:
+        for batch in self._batches():
+            yield batch.tolist()
+
+    def __len__(self) -> int:
+        # Unsorted order is one pool; otherwise every pool may end with a short batch
+        pool_size = len(self.lengths) if not self.shuffle else self.batch_size * self.pool_factor
+        if pool_size == 0:
+            return 0
+        full_pools, remainder = divmod(len(self.lengths), pool_size)
+        round_batches = math.floor if self.drop_last else math.ceil
+        return full_pools * round_batches(pool_size / self.batch_size) + round_batches(remainder / self.batch_size)
+
+
+def pad_collate(
+    batch: List[Tuple[np.ndarray, Optional[np.ndarray]]],
+    pad_id: int = 0,
+    min_length: int = 1
+) -> Tuple[torch.Tensor, torch.Tensor, Optional[torch.Tensor]]:
+    """
+    Pad a batch to its longest song
+
+    Args:
+        batch: ``(token_ids, label)`` items from TokenizedLyricsDataset
+        pad_id: Padding token id
+        min_length: Minimum padded width (e.g. the largest CNN filter size)
+
+    Returns:
+        Tuple of (token ids [batch, width], lengths [batch], labels or None)
+    """
+    lengths = np.fromiter((len(ids) for ids, _ in batch), dtype=np.int64, count=len(batch))
+    width = max(int(lengths.max(initial=0)), min_length)
+    token_ids = np.full((len(batch), width), pad_id, dtype=np.int64)
+    for i, (ids, _) in enumerate(batch):
+        token_ids[i, :len(ids)] = ids
+
+    labels = None
+    if batch and batch[0][1] is not None:
+        labels = torch.as_tensor(np.stack([label for _, label in batch]))
+    return torch.from_numpy(token_ids), torch.from_numpy(lengths), labels
+
+
+def create_dataloader(
+    dataset: TokenizedLyricsDataset,
+    batch_size: int = 32,
+    shuffle: bool = False,
+    seed: int = 42,
+    min_length: int = 1,
+    drop_last: bool = False,
+    sample_weights: Optional[Sequence[float]] = None,
+    **loader_kwargs
+) -> DataLoader:
+    """
+    DataLoader with length-bucketed batches for training and evaluation
+
+    Args:
+        dataset: Dataset over the tokenized corpus
+        batch_size: Songs per batch
+        shuffle: Shuffle within length pools (training) or sort by length (evaluation)
+        seed: Base seed for the bucket shuffle
+        min_length: Minimum padded width
+        drop_last: Drop incomplete batches
+        sample_weights: Per-song weights for sampling with replacement (requires shuffle)
+        **loader_kwargs: Forwarded to DataLoader (num_workers, pin_memory, ...)
+
+    Returns:
+        DataLoader yielding (token ids, lengths, labels)
+    """
+    sampler = BucketBatchSampler(
+        dataset.lengths, batch_size, shuffle=shuffle, drop_last=drop_last, seed=seed,
+        weights=sample_weights
+    )
+    pad_id = dataset.corpus.vocabulary.pad_id
+    return DataLoader(
+        dataset,
+        batch_sampler=sampler,
+        collate_fn=partial(pad_collate, pad_id=pad_id, min_length=min_length),
+        **loader_kwargs
+    )
@@ -6,12 +6,24 @@ Supports multiple data formats and provides standardized data access.
 """
 
 import os
+import json
+import glob
+import time
+import hashlib
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
-from typing import Optional, Tuple, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, Dict, Any, List, Iterator, Sequence, Union
 import logging
 from pathlib import Path
 
+from .dedup import count_near_duplicates, near_duplicate_clusters
+from .profiling import StreamingProfile, profile_dataframe
+from .schema import optimize_schema
+from ..utils.helpers import load_config
+
 try:
     import kagglehub
     KAGGLE_AVAILABLE = True
@@ -19,16 +31,46 @@ except ImportError:
     KAGGLE_AVAILABLE = False
     logging.warning("kagglehub not available. Install with: pip install kagglehub")
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("pyarrow not available. Columnar cache disabled. Install with: pip install pyarrow")
+
 
 class MusicDataLoader:
     """
     Main data loader for music lyrics datasets
     """
     
-    def __init__(self, data_dir: str = "data"):
+    DIGEST_INDEX_FILE = "digests.json"
+    
+    def __init__(
+        self,
+        data_dir: str = "data",
+        kaggle_source: Optional[str] = None,
+        optimize_memory: bool = True,
+        config_path: Optional[str] = None
+    ):
+        """
+        Args:
+            data_dir: Root data directory
+            kaggle_source: Local directory standing in for kagglehub; datasets are
+                read from ``<kaggle_source>/<owner>/<slug>`` without network access
+            optimize_memory: Emit the compact schema (low-cardinality title/artist as categorical,
+                int16 year/decade, Arrow-backed lyrics) from load methods
+            config_path: Configuration file providing ``data.columns``
+        """
         self.data_dir = Path(data_dir)
         self.raw_dir = self.data_dir / "raw"
         self.processed_dir = self.data_dir / "processed"
+        self.cache_dir = self.processed_dir / "cache"
+        self.manifest_path = self.raw_dir / "kaggle_manifest.json"
+        self.kaggle_source = Path(kaggle_source) if kaggle_source else None
+        self.optimize_memory = optimize_memory
+        self.column_map = column_map_from_config(load_config(config_path))
         self.logger = logging.getLogger(__name__)
         
         # Create directories if they don't exist
@@ -39,7 +81,9 @@ class MusicDataLoader:
         self, 
         dataset_name: str = "brianblakely/top-100-songs-and-lyrics-from-1959-to-2019",
         file_path: str = "",
-        force_download: bool = False
+        force_download: bool = False,
+        columns: Optional[List[str]] = None,
+        use_cache: bool = True
     ) -> pd.DataFrame:
         """
         Load dataset from Kaggle using kagglehub
@@ -47,35 +91,56 @@ class MusicDataLoader:
         Args:
             dataset_name: Kaggle dataset identifier
             file_path: Specific file path within dataset (if any)
-            force_download: Force re-download even if cached
+            force_download: Force re-download even if a verified local copy exists
+            columns: Subset of columns to load (others are never materialized)
+            use_cache: Read through the columnar cache in data/processed/cache
             
         Returns:
             pandas.DataFrame: Loaded dataset
         """
-        if not KAGGLE_AVAILABLE:
-            raise ImportError("kagglehub not available. Install with: pip install kagglehub")
-        
         try:
             self.logger.info(f"Loading Kaggle dataset: {dataset_name}")
             
-            # Download the dataset using kagglehub
-            path = kagglehub.dataset_download(dataset_name)
+            # Reuse the local download unless a refresh is explicitly requested
+            entry = None if force_download else self._verified_manifest_entry(dataset_name)
+            if entry is None:
+                path = self._download_dataset(dataset_name, force_download)
+                entry = self._record_download(dataset_name, path)
+            else:
+                self.logger.info(f"Using cached download (version {entry['version']}): {entry['path']}")
             
-            # Find CSV files in the downloaded path
-            csv_files = list(Path(path).glob("*.csv"))
-            if not csv_files:
-                raise FileNotFoundError(f"No CSV files found in downloaded dataset: {path}")
+            dataset_path = Path(entry["path"])
+            if file_path:
+                csv_files = [dataset_path / file_path]
+                if not csv_files[0].exists():
+                    raise FileNotFoundError(f"File not found in dataset: {csv_files[0]}")
+            else:
+                csv_names = sorted(name for name in entry["files"] if name.endswith(".csv"))
+                if not csv_names:
+                    raise FileNotFoundError(f"No CSV files found in downloaded dataset: {dataset_path}")
+                csv_files = [dataset_path / name for name in csv_names]
             
-            # Load the first CSV file found
-            df = pd.read_csv(csv_files[0])
+            if len(csv_files) > 1:
+                df = self.load_many([str(f) for f in csv_files], columns=columns, use_cache=use_cache)
+            else:
+                # Checksums from the manifest double as columnar cache keys
+                file_info = entry["files"].get(csv_files[0].relative_to(dataset_path).as_posix())
+                digest = file_info["checksum"] if file_info else None
+                df = self._read_normalized(csv_files[0], columns=columns, use_cache=use_cache, digest=digest)
+                if self.optimize_memory:
+                    df = optimize_schema(df)
             
             self.logger.info(f"Dataset loaded successfully. Shape: {df.shape}")
             self.logger.info(f"Columns: {list(df.columns)}")
             
-            # Save raw data locally
-            raw_file_path = self.raw_dir / f"kaggle_{dataset_name.replace('/', '_')}.csv"
-            df.to_csv(raw_file_path, index=False)
-            self.logger.info(f"Raw data saved to: {raw_file_path}")
+            # Keep a byte-for-byte copy of the raw data locally (no re-serialization)
+            raw_prefix = f"kaggle_{dataset_name.replace('/', '_')}"
+            for csv_file in csv_files:
+                name = f"{raw_prefix}.csv" if len(csv_files) == 1 else f"{raw_prefix}_{csv_file.stem}.csv"
+                raw_file_path = self.raw_dir / name
+                if not raw_file_path.exists() or raw_file_path.stat().st_size != csv_file.stat().st_size:
+                    shutil.copyfile(csv_file, raw_file_path)
+                    self.logger.info(f"Raw data saved to: {raw_file_path}")
             
             return df
             
@@ -83,97 +148,592 @@ class MusicDataLoader:
             self.logger.error(f"Error loading Kaggle dataset: {str(e)}")
             raise
     
-    def load_local_csv(self, file_path: str) -> pd.DataFrame:
+    def _download_dataset(self, dataset_name: str, force_download: bool) -> Path:
+        """
+        Fetch a dataset from kagglehub or the local stand-in directory
+        
+        Args:
+            dataset_name: Kaggle dataset identifier
+            force_download: Ask kagglehub to bypass its own cache
+            
+        Returns:
+            Path: Directory containing the dataset files
+        """
+        if self.kaggle_source is not None:
+            path = self.kaggle_source / dataset_name
+            if not path.is_dir():
+                raise FileNotFoundError(f"Dataset not found in local source: {path}")
+            return path
+        
+        if not KAGGLE_AVAILABLE:
+            raise ImportError("kagglehub not available. Install with: pip install kagglehub")
+        
+        self.logger.info(f"Downloading {dataset_name} from Kaggle")
+        return Path(kagglehub.dataset_download(dataset_name, force_download=force_download))
+    
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Load the download manifest (empty if none was written yet)"""
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Atomically write the download manifest"""
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _record_download(self, dataset_name: str, path: Path) -> Dict[str, Any]:
+        """
+        Checksum the downloaded files and store them in the manifest
+        
+        Args:
+            dataset_name: Kaggle dataset identifier
+            path: Directory containing the dataset files
+            
+        Returns:
+            Dict: Manifest entry for the dataset
+        """
+        files = {}
+        for file in sorted(p for p in path.rglob("*") if p.is_file()):
+            stat = file.stat()
+            files[file.relative_to(path).as_posix()] = {
+                "checksum": file_digest(file),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+            }
+        
+        # kagglehub caches under .../datasets/<owner>/<slug>/versions/<n>
+        parts = path.parts
+        version = parts[parts.index("versions") + 1] if "versions" in parts[:-1] else None
+        
+        entry = {
+            "dataset_name": dataset_name,
+            "version": version,
+            "path": str(path.resolve()),
+            "downloaded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "files": files,
+        }
+        manifest = self._load_manifest()
+        manifest[dataset_name] = entry
+        self._save_manifest(manifest)
+        self.logger.info(f"Manifest updated for {dataset_name}: {len(files)} files")
+        return entry
+    
+    def _verified_manifest_entry(self, dataset_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the manifest entry if every recorded file is still intact
+        
+        Files whose size and mtime match the manifest are trusted without
+        re-hashing; otherwise the checksum is recomputed and compared.
+        
+        Args:
+            dataset_name: Kaggle dataset identifier
+            
+        Returns:
+            Manifest entry, or None if the dataset must be (re)downloaded
+        """
+        manifest = self._load_manifest()
+        entry = manifest.get(dataset_name)
+        if entry is None:
+            return None
+        
+        dataset_path = Path(entry["path"])
+        touched = False
+        for name, recorded in entry["files"].items():
+            file = dataset_path / name
+            if not file.exists():
+                self.logger.warning(f"Cached file missing, re-downloading: {file}")
+                return None
+            stat = file.stat()
+            if stat.st_size == recorded["size"] and stat.st_mtime_ns == recorded["mtime"]:
+                continue
+            if file_digest(file) != recorded["checksum"]:
+                self.logger.warning(f"Checksum mismatch, re-downloading: {file}")
+                return None
+            recorded["mtime"] = stat.st_mtime_ns
+            touched = True
+        
+        if touched:
+            self._save_manifest(manifest)
+        return entry
+    
+    def load_local_csv(
+        self,
+        file_path: str,
+        columns: Optional[List[str]] = None,
+        use_cache: bool = True
+    ) -> pd.DataFrame:
         """
         Load dataset from local CSV file
         
         Args:
             file_path: Path to CSV file
+            columns: Subset of columns to load (others are never materialized)
+            use_cache: Read through the columnar cache in data/processed/cache
             
         Returns:
             pandas.DataFrame: Loaded dataset
         """
         try:
-            df = pd.read_csv(file_path)
+            df = self._read_normalized(Path(file_path), columns=columns, use_cache=use_cache)
+            if self.optimize_memory:
+                df = optimize_schema(df)
             self.logger.info(f"Local CSV loaded. Shape: {df.shape}")
             return df
         except Exception as e:
             self.logger.error(f"Error loading local CSV: {str(e)}")
             raise
     
-    def get_dataset_info(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def load_many(
+        self,
+        paths_or_globs: Union[str, Sequence[str]],
+        columns: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        dedup_subset: Optional[List[str]] = ('title', 'artist', 'year'),
+        use_cache: bool = True
+    ) -> pd.DataFrame:
         """
-        Get basic information about the dataset
+        Load many CSV/Parquet shards concurrently into one dataset
+        
+        Each shard is read in a worker process, renamed to the canonical
+        columns from ``data.columns`` and hashed for deduplication. Rows
+        repeated across shards are dropped (first occurrence wins) before a
+        single concatenation.
         
         Args:
-            df: Input dataframe
+            paths_or_globs: File paths and/or glob patterns
+            columns: Subset of canonical columns to load
+            max_workers: Worker processes (defaults to one per CPU)
+            dedup_subset: Canonical columns identifying a song; None disables dedup
+            use_cache: Read CSV shards through the columnar cache
             
         Returns:
-            Dict containing dataset statistics
+            pandas.DataFrame: Combined dataset
         """
-        info = {
-            "shape": df.shape,
-            "columns": list(df.columns),
-            "dtypes": df.dtypes.to_dict(),
-            "null_counts": df.isnull().sum().to_dict(),
-            "memory_usage": df.memory_usage(deep=True).sum(),
-            "numeric_columns": df.select_dtypes(include=[np.number]).columns.tolist(),
-            "text_columns": df.select_dtypes(include=['object']).columns.tolist()
-        }
+        if isinstance(paths_or_globs, (str, Path)):
+            paths_or_globs = [paths_or_globs]
+        
+        paths = []
+        for pattern in paths_or_globs:
+            matches = sorted(glob.glob(str(pattern))) if glob.has_magic(str(pattern)) else [str(pattern)]
+            paths.extend(Path(p) for p in matches)
+        if not paths:
+            raise FileNotFoundError(f"No files matched: {list(paths_or_globs)}")
         
-        # Additional music-specific info
-        if 'year' in df.columns:
-            info['year_range'] = (df['year'].min(), df['year'].max())
-            info['year_distribution'] = df['year'].value_counts().head(10).to_dict()
+        # Digests are resolved here so workers never touch the shared digest index
+        digests = {}
+        if use_cache and PYARROW_AVAILABLE:
+            csv_paths = [path for path in paths if path.suffix != ".parquet"]
+            digests = dict(zip(csv_paths, self._csv_digests(csv_paths)))
+        args = [
+            (str(self.data_dir), path, self.column_map, columns, use_cache, dedup_subset, digests.get(path))
+            for path in paths
+        ]
+        if len(paths) == 1:
+            results = [_load_shard(*args[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_load_shard, *zip(*args)))
         
-        if 'artist' in df.columns:
-            info['unique_artists'] = df['artist'].nunique()
-            info['top_artists'] = df['artist'].value_counts().head(10).to_dict()
+        frames = [frame for frame, _ in results]
+        if dedup_subset is not None and all(hashes is not None for _, hashes in results):
+            all_hashes = np.concatenate([hashes for _, hashes in results])
+            keep = ~pd.Series(all_hashes).duplicated().to_numpy()
+            bounds = np.cumsum([0] + [len(frame) for frame in frames])
+            # Only shards that actually contain duplicates are filtered (and copied)
+            frames = [
+                frame if keep[start:end].all() else frame[keep[start:end]]
+                for frame, start, end in zip(frames, bounds[:-1], bounds[1:])
+            ]
+            self.logger.info(f"Dropped {int((~keep).sum())} duplicate rows across {len(paths)} shards")
+        
+        df = pd.concat(frames, ignore_index=True)
+        if self.optimize_memory:
+            df = optimize_schema(df)
+        self.logger.info(f"Loaded {len(paths)} shards. Shape: {df.shape}")
+        return df
+    
+    def _read_normalized(
+        self,
+        path: Path,
+        columns: Optional[List[str]] = None,
+        use_cache: bool = True,
+        digest: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Read a CSV/Parquet file and rename its columns to canonical names
+        
+        Args:
+            path: Path to a .csv or .parquet file
+            columns: Subset of canonical columns to load
+            use_cache: Read CSVs through the columnar cache
+            digest: Known content digest of the CSV
+            
+        Returns:
+            pandas.DataFrame: Dataset with canonical column names
+        """
+        path = Path(path)
+        if path.suffix == ".parquet":
+            source_columns = list(pq.read_schema(path).names) if PYARROW_AVAILABLE else None
+        else:
+            source_columns = list(pd.read_csv(path, nrows=0).columns)
+        
+        renames = canonical_renames(source_columns, self.column_map) if source_columns else {}
+        if columns is not None:
+            inverse = {canonical: source for source, canonical in renames.items()}
+            columns = [inverse.get(col, col) for col in columns]
+        
+        if path.suffix == ".parquet":
+            df = pd.read_parquet(path, columns=columns)
+        else:
+            df = self._read_csv_cached(path, columns=columns, use_cache=use_cache, digest=digest)
+        return df.rename(columns=renames)
+    
+    def _read_csv_cached(
+        self,
+        csv_path: Path,
+        columns: Optional[List[str]] = None,
+        use_cache: bool = True,
+        digest: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Read a CSV through a content-hashed Parquet cache
         
-        if 'lyrics' in df.columns:
-            info['avg_lyrics_length'] = df['lyrics'].str.len().mean()
-            info['lyrics_length_std'] = df['lyrics'].str.len().std()
+        The first read parses the CSV once and stores it as Parquet under
+        ``processed/cache`` keyed by the file's content digest. Later reads
+        load only the requested columns, with pyarrow-backed string columns.
         
+        Args:
+            csv_path: Path to CSV file
+            columns: Subset of columns to load
+            use_cache: Disable to always parse the CSV
+            digest: Known content digest of the CSV (skips re-hashing)
+            
+        Returns:
+            pandas.DataFrame: Loaded dataset
+        """
+        if not (use_cache and PYARROW_AVAILABLE):
+            return pd.read_csv(csv_path, usecols=columns)
+        
+        cache_path = self.cache_path_for(csv_path, digest=digest)
+        if cache_path.exists():
+            self.logger.info(f"Columnar cache hit: {cache_path}")
+        else:
+            table = pa.Table.from_pandas(pd.read_csv(csv_path), preserve_index=False)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".parquet.tmp")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, cache_path)
+            self.logger.info(f"Columnar cache written: {cache_path}")
+        
+        table = pq.read_table(cache_path, columns=columns)
+        return table.to_pandas(types_mapper=_arrow_string_mapper)
+    
+    def cache_path_for(self, csv_path: Path, digest: Optional[str] = None) -> Path:
+        """
+        Get the columnar cache location for a CSV file
+        
+        Args:
+            csv_path: Path to CSV file
+            digest: Known content digest of the CSV (computed if omitted)
+            
+        Returns:
+            Path: Parquet file keyed by the CSV content digest
+        """
+        csv_path = Path(csv_path)
+        digest = digest or self._csv_digest(csv_path)
+        return self.cache_dir / f"{csv_path.stem}_{digest}.parquet"
+    
+    def _csv_digest(self, csv_path: Path) -> str:
+        """
+        Content digest of a CSV, re-hashed only when its size or mtime changed
+        
+        Args:
+            csv_path: Path to CSV file
+            
+        Returns:
+            str: Hex digest (see file_digest)
+        """
+        return self._csv_digests([csv_path])[0]
+    
+    def _csv_digests(self, csv_paths: Sequence[Path]) -> List[str]:
+        """
+        Content digests of several CSVs with one read/write of the digest index
+        
+        Digests are remembered in ``cache/digests.json`` keyed by the resolved
+        path, like the Kaggle manifest trusts unchanged files. The index is
+        rewritten through a unique temporary file and merged with the copy
+        on disk, so concurrent loaders never see a partial file; an
+        unreadable index only costs a re-hash.
+        
+        Args:
+            csv_paths: Paths to CSV files
+            
+        Returns:
+            List of hex digests (see file_digest), in input order
+        """
+        index_path = self.cache_dir / self.DIGEST_INDEX_FILE
+        index = _read_digest_index(index_path)
+        digests, updates = [], {}
+        for csv_path in csv_paths:
+            csv_path = Path(csv_path)
+            key = str(csv_path.resolve())
+            stat = csv_path.stat()
+            recorded = index.get(key)
+            if recorded and recorded["size"] == stat.st_size and recorded["mtime"] == stat.st_mtime_ns:
+                digests.append(recorded["digest"])
+                continue
+            digest = file_digest(csv_path)
+            updates[key] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "digest": digest}
+            digests.append(digest)
+        
+        if updates:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            merged = {**_read_digest_index(index_path), **updates}
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.cache_dir, prefix=index_path.name, suffix=".tmp", delete=False
+            ) as f:
+                json.dump(merged, f, indent=2)
+            os.replace(f.name, index_path)
+        return digests
+    
+    def get_dataset_info(self, df: pd.DataFrame, approximate_memory: bool = False) -> Dict[str, Any]:
+        """
+        Get basic information about the dataset
+        
+        Args:
+            df: Input dataframe
+            approximate_memory: Estimate deep memory usage from a sample
+            
+        Returns:
+            Dict containing dataset statistics
+        """
+        info, _ = profile_dataframe(df, approximate_memory=approximate_memory)
         return info
     
-    def validate_dataset(self, df: pd.DataFrame) -> Tuple[bool, list]:
+    def validate_dataset(
+        self,
+        df: pd.DataFrame,
+        near_duplicate_threshold: Optional[float] = None,
+        n_jobs: Optional[int] = None
+    ) -> Tuple[bool, list]:
         """
         Validate dataset structure and content
         
         Args:
             df: Input dataframe
+            near_duplicate_threshold: If set, also flag songs whose lyrics are
+                near-duplicates (MinHash Jaccard >= threshold) of another song
+            n_jobs: Worker processes for near-duplicate detection
             
         Returns:
             Tuple of (is_valid, list_of_issues)
         """
-        issues = []
+        _, issues = profile_dataframe(df, approximate_memory=True)
+        if near_duplicate_threshold is not None and 'lyrics' in df.columns:
+            clusters = near_duplicate_clusters(df['lyrics'], threshold=near_duplicate_threshold, n_jobs=n_jobs)
+            near_duplicates = count_near_duplicates(clusters)
+            if near_duplicates:
+                issues.append(
+                    f"Found {near_duplicates} songs with near-duplicate lyrics "
+                    f"(similarity >= {near_duplicate_threshold})"
+                )
+        is_valid = len(issues) == 0
+        return is_valid, issues
+    
+    def profile_dataset(
+        self,
+        df: pd.DataFrame,
+        approximate_memory: bool = False
+    ) -> Tuple[Dict[str, Any], bool, list]:
+        """
+        Get dataset information and validation results from a single pass
         
-        # Check required columns
-        required_columns = ['title', 'artist', 'year', 'lyrics']
-        missing_cols = [col for col in required_columns if col not in df.columns]
-        if missing_cols:
-            issues.append(f"Missing required columns: {missing_cols}")
+        Args:
+            df: Input dataframe
+            approximate_memory: Estimate deep memory usage from a sample
+            
+        Returns:
+            Tuple of (info, is_valid, list_of_issues)
+        """
+        info, issues = profile_dataframe(df, approximate_memory=approximate_memory)
+        return info, len(issues) == 0, issues
+    
+    def iter_batches(
+        self,
+        file_path: str,
+        batch_size: int = 50_000,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a CSV or Parquet file in bounded-memory chunks
         
-        # Check for empty lyrics
-        if 'lyrics' in df.columns:
-            empty_lyrics = df['lyrics'].isnull().sum()
-            if empty_lyrics > 0:
-                issues.append(f"Found {empty_lyrics} songs with empty lyrics")
+        Args:
+            file_path: Path to a .csv or .parquet file
+            batch_size: Maximum rows per chunk
+            columns: Subset of columns to load
+            
+        Yields:
+            pandas.DataFrame: Next chunk of rows
+        """
+        path = Path(file_path)
+        if path.suffix == ".parquet":
+            if not PYARROW_AVAILABLE:
+                raise ImportError("pyarrow not available. Install with: pip install pyarrow")
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+                yield batch.to_pandas(types_mapper=_arrow_string_mapper)
+        else:
+            yield from pd.read_csv(path, chunksize=batch_size, usecols=columns)
+    
+    def profile_stream(self, file_path: str, batch_size: int = 50_000) -> StreamingProfile:
+        """
+        Build a dataset profile in one streaming pass over a file
         
-        # Check year range
-        if 'year' in df.columns:
-            min_year, max_year = df['year'].min(), df['year'].max()
-            if min_year < 1900 or max_year > 2030:
-                issues.append(f"Suspicious year range: {min_year}-{max_year}")
+        Args:
+            file_path: Path to a .csv or .parquet file
+            batch_size: Maximum rows held in memory at once
+            
+        Returns:
+            StreamingProfile: Aggregated statistics (see info() and issues())
+        """
+        profile = StreamingProfile()
+        for chunk in self.iter_batches(file_path, batch_size=batch_size):
+            profile.update(chunk)
+        self.logger.info(f"Streamed profile of {file_path}: {profile.num_rows} rows")
+        return profile
+    
+    def get_dataset_info_streaming(self, file_path: str, batch_size: int = 50_000) -> Dict[str, Any]:
+        """
+        Streaming counterpart of get_dataset_info for files too large for memory
         
-        # Check duplicates
-        if 'title' in df.columns and 'artist' in df.columns:
-            duplicates = df.duplicated(subset=['title', 'artist']).sum()
-            if duplicates > 0:
-                issues.append(f"Found {duplicates} duplicate songs (same title + artist)")
+        Distinct and top artist counts are approximate.
         
-        is_valid = len(issues) == 0
-        return is_valid, issues
+        Args:
+            file_path: Path to a .csv or .parquet file
+            batch_size: Maximum rows held in memory at once
+            
+        Returns:
+            Dict containing dataset statistics
+        """
+        return self.profile_stream(file_path, batch_size).info()
+    
+    def validate_dataset_streaming(self, file_path: str, batch_size: int = 50_000) -> Tuple[bool, list]:
+        """
+        Streaming counterpart of validate_dataset for files too large for memory
+        
+        Args:
+            file_path: Path to a .csv or .parquet file
+            batch_size: Maximum rows held in memory at once
+            
+        Returns:
+            Tuple of (is_valid, list_of_issues)
+        """
+        issues = self.profile_stream(file_path, batch_size).issues()
+        return len(issues) == 0, issues
+
+
+def column_map_from_config(config: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Get the canonical column mapping from ``data.columns``
+    
+    Args:
+        config: Loaded configuration
+        
+    Returns:
+        Dict mapping canonical names to accepted source column names
+    """
+    columns = config.get("data", {}).get("columns") or {}
+    return {
+        canonical: [sources] if isinstance(sources, str) else list(sources)
+        for canonical, sources in columns.items()
+    }
+
+
+def canonical_renames(source_columns: Sequence[str], column_map: Dict[str, List[str]]) -> Dict[str, str]:
+    """
+    Compute the renames that map source columns to canonical names
+    
+    Args:
+        source_columns: Columns present in the file
+        column_map: Canonical name -> accepted source names
+        
+    Returns:
+        Dict of {source_name: canonical_name} (only columns that change)
+    """
+    present = set(source_columns)
+    renames = {}
+    for canonical, sources in column_map.items():
+        if canonical in present:
+            continue
+        for source in sources:
+            if source in present and source not in renames:
+                renames[source] = canonical
+                break
+    return renames
+
+
+def _load_shard(
+    data_dir: str,
+    path: Path,
+    column_map: Dict[str, List[str]],
+    columns: Optional[List[str]],
+    use_cache: bool,
+    dedup_subset: Optional[List[str]],
+    digest: Optional[str] = None
+) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+    """
+    Worker for MusicDataLoader.load_many: read, normalize and hash one shard
+    
+    Returns:
+        Tuple of (shard dataframe, uint64 row hashes or None)
+    """
+    loader = MusicDataLoader(data_dir=data_dir, optimize_memory=False)
+    loader.column_map = column_map
+    df = loader._read_normalized(Path(path), columns=columns, use_cache=use_cache, digest=digest)
+    
+    hashes = None
+    if dedup_subset is not None:
+        subset = [col for col in dedup_subset if col in df.columns]
+        if subset:
+            hashes = pd.util.hash_pandas_object(df[subset], index=False).to_numpy()
+    return df, hashes
+
+
+def _read_digest_index(index_path: Path) -> Dict[str, Any]:
+    """Digest index contents; missing or unreadable files count as empty"""
+    try:
+        return json.loads(index_path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute a content digest for a file, reading it in fixed-size chunks
+    
+    Args:
+        path: File to hash
+        chunk_size: Bytes read per iteration
+        
+    Returns:
+        str: Hex digest (blake2b, 16 bytes)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _arrow_string_mapper(arrow_type):
+    """Map Arrow string types to pyarrow-backed pandas strings"""
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
 
 
 def load_music_dataset(config_path: Optional[str] = None) -> pd.DataFrame:
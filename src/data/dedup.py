@@ -0,0 +1,349 @@
+"""
+Near-Duplicate Lyrics Detection
+
+MinHash signatures over word shingles plus a banded locality-sensitive
+hashing (LSH) index. The same song recurs in the Billboard data across
+years, covers and remasters with near-identical lyrics; clustering those
+copies keeps each cluster in a single train/validation/test split.
+
+Candidates are only compared when they share an LSH band, so building the
+index and clustering are roughly linear in the number of songs.
+"""
+
+import re
+import json
+import zlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+WORD_PATTERN = re.compile(r"[\w']+")
+
+# Odd 64-bit multiplier for rolling shingle hashes
+SHINGLE_BASE = np.uint64(0x100000001B3)
+EMPTY_SIGNATURE_VALUE = np.iinfo(np.uint32).max
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures of lyrics from word shingles
+
+    Each of the ``num_perm`` hash functions is a multiply-shift hash over the
+    64-bit shingle hashes; the signature keeps the minimum of each one. Two
+    signatures agree in a position with probability equal to the Jaccard
+    similarity of the shingle sets.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._powers = SHINGLE_BASE ** np.arange(shingle_size - 1, -1, -1, dtype=np.uint64)
+
+    def shingles(self, text: Optional[str]) -> np.ndarray:
+        """
+        Hash the word shingles of one song
+
+        Args:
+            text: Lyrics
+
+        Returns:
+            Unique uint64 shingle hashes (empty for missing lyrics)
+        """
+        if not isinstance(text, str):
+            return np.empty(0, dtype=np.uint64)
+        words = WORD_PATTERN.findall(text.lower())
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+
+        token_hashes = np.fromiter(
+            (zlib.crc32(word.encode("utf-8")) for word in words), dtype=np.uint64, count=len(words)
+        )
+        with np.errstate(over='ignore'):
+            if len(token_hashes) < self.shingle_size:
+                return np.array([(token_hashes * self._powers[-len(token_hashes):]).sum()], dtype=np.uint64)
+            windows = np.lib.stride_tricks.sliding_window_view(token_hashes, self.shingle_size)
+            return np.unique(windows @ self._powers)
+
+    def signature(self, text: Optional[str]) -> np.ndarray:
+        """
+        MinHash signature of one song
+
+        Args:
+            text: Lyrics
+
+        Returns:
+            uint32 array of length num_perm (all EMPTY_SIGNATURE_VALUE for empty lyrics)
+        """
+        shingles = self.shingles(text)
+        if len(shingles) == 0:
+            return np.full(self.num_perm, EMPTY_SIGNATURE_VALUE, dtype=np.uint32)
+        with np.errstate(over='ignore'):
+            hashed = (self._a[:, None] * shingles[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def signatures(
+        self,
+        texts: Sequence[Optional[str]],
+        n_jobs: Optional[int] = None,
+        chunk_size: int = 5000
+    ) -> np.ndarray:
+        """
+        MinHash signatures of many songs, in parallel worker processes
+
+        Args:
+            texts: Lyrics
+            n_jobs: Worker processes (None = one per CPU, 1 = in-process)
+            chunk_size: Songs per worker task
+
+        Returns:
+            uint32 matrix (len(texts) x num_perm)
+        """
+        texts = list(texts)
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        if n_jobs == 1 or len(chunks) <= 1:
+            partials = [_signature_chunk(self, chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                partials = list(executor.map(_signature_chunk, [self] * len(chunks), chunks))
+        if not partials:
+            return np.empty((0, self.num_perm), dtype=np.uint32)
+        return np.vstack(partials)
+
+
+def _signature_chunk(hasher: MinHasher, texts: Sequence[Optional[str]]) -> np.ndarray:
+    """Worker for MinHasher.signatures: signatures of one chunk"""
+    signatures = np.empty((len(texts), hasher.num_perm), dtype=np.uint32)
+    for i, text in enumerate(texts):
+        signatures[i] = hasher.signature(text)
+    return signatures
+
+
+def _optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows == num_perm
+
+    The LSH curve's midpoint (1/bands)^(1/rows) is kept at or below the
+    threshold, favoring recall; false candidates are removed by verification.
+    """
+    candidates = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    midpoints = {br: (1 / br[0]) ** (1 / br[1]) for br in candidates}
+    below = [br for br in candidates if midpoints[br] <= threshold]
+    if not below:
+        return min(candidates, key=lambda br: midpoints[br])
+    return max(below, key=lambda br: midpoints[br])
+
+
+class MinHashLSH:
+    """
+    Incremental LSH index over MinHash signatures
+
+    Signatures are split into ``bands`` bands of ``rows`` values; songs that
+    share any band are candidates and are kept if their estimated Jaccard
+    similarity reaches ``threshold``. Items get consecutive ids in insertion
+    order, and new songs can be added or queried at any time.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands, self.rows = _optimal_bands(num_perm, threshold)
+        self._buckets: List[dict] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+        self._num_items = 0
+
+    def __len__(self) -> int:
+        return self._num_items
+
+    @property
+    def signatures(self) -> np.ndarray:
+        """All inserted signatures (len(self) x num_perm)"""
+        if len(self._signatures) > 1:
+            self._signatures = [np.vstack(self._signatures)]
+        if not self._signatures:
+            return np.empty((0, self.hasher.num_perm), dtype=np.uint32)
+        return self._signatures[0]
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add_signatures(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        Insert precomputed signatures
+
+        Args:
+            signatures: uint32 matrix (n x num_perm)
+
+        Returns:
+            Ids assigned to the new items
+        """
+        signatures = np.asarray(signatures, dtype=np.uint32)
+        ids = np.arange(self._num_items, self._num_items + len(signatures))
+        for item_id, signature in zip(ids, signatures):
+            # Empty lyrics are stored but never bucketed
+            if signature[0] == EMPTY_SIGNATURE_VALUE and (signature == EMPTY_SIGNATURE_VALUE).all():
+                continue
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                bucket.setdefault(key, []).append(item_id)
+        self._signatures.append(signatures)
+        self._num_items += len(signatures)
+        return ids
+
+    def add(self, texts: Sequence[Optional[str]], n_jobs: Optional[int] = None) -> np.ndarray:
+        """
+        Insert songs, hashing them in parallel
+
+        Args:
+            texts: Lyrics
+            n_jobs: Worker processes for MinHash signatures
+
+        Returns:
+            Ids assigned to the new items
+        """
+        return self.add_signatures(self.hasher.signatures(texts, n_jobs=n_jobs))
+
+    def query(self, text: Optional[str]) -> List[Tuple[int, float]]:
+        """
+        Find indexed songs whose lyrics are near-duplicates of ``text``
+
+        Args:
+            text: Lyrics
+
+        Returns:
+            List of (id, estimated Jaccard similarity), most similar first
+        """
+        signature = self.hasher.signature(text)
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        if not candidates:
+            return []
+
+        ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self.signatures[ids] == signature).mean(axis=1)
+        keep = similarity >= self.threshold
+        order = np.argsort(-similarity[keep], kind='stable')
+        return [(int(i), float(s)) for i, s in zip(ids[keep][order], similarity[keep][order])]
+
+    def duplicate_pairs(self) -> np.ndarray:
+        """
+        Verified near-duplicate pairs among the indexed songs
+
+        Returns:
+            int64 array (num_pairs x 2) with id pairs i < j
+        """
+        signatures = self.signatures
+        pairs = set()
+        for bucket in self._buckets:
+            for members in bucket.values():
+                if len(members) < 2:
+                    continue
+                members = np.asarray(members)
+                left, right = np.triu_indices(len(members), k=1)
+                pairs.update(zip(members[left].tolist(), members[right].tolist()))
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+
+        pairs = np.array(sorted(pairs), dtype=np.int64)
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        return pairs[similarity >= self.threshold]
+
+    def clusters(self) -> np.ndarray:
+        """
+        Group indexed songs into near-duplicate clusters
+
+        Each bucket member is verified against the first member of the bucket
+        (a star rather than all pairs), so large buckets stay linear; the
+        connected components of the verified edges are the clusters.
+
+        Returns:
+            int64 cluster label per id (the smallest id in the cluster)
+        """
+        signatures = self.signatures
+        sources, targets = [], []
+        for bucket in self._buckets:
+            for members in bucket.values():
+                if len(members) < 2:
+                    continue
+                members = np.asarray(members)
+                similarity = (signatures[members[1:]] == signatures[members[0]]).mean(axis=1)
+                matched = members[1:][similarity >= self.threshold]
+                sources.append(np.full(len(matched), members[0]))
+                targets.append(matched)
+
+        n = len(self)
+        if sources:
+            sources, targets = np.concatenate(sources), np.concatenate(targets)
+        else:
+            sources = targets = np.empty(0, dtype=np.int64)
+        graph = coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n, n))
+        _, components = connected_components(graph, directed=False)
+
+        # Label each cluster by its smallest member
+        first_member = np.full(components.max() + 1 if n else 0, n, dtype=np.int64)
+        np.minimum.at(first_member, components, np.arange(n))
+        return first_member[components]
+
+    def save(self, path: str) -> Path:
+        """Save parameters and signatures to .npz (buckets are rebuilt on load)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'threshold': self.threshold,
+            'num_perm': self.hasher.num_perm,
+            'shingle_size': self.hasher.shingle_size,
+            'seed': self.hasher.seed,
+        }
+        with open(path, "wb") as f:
+            np.savez(f, signatures=self.signatures, meta=np.array(json.dumps(meta)))
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "MinHashLSH":
+        """Load an index saved with save"""
+        with np.load(path) as data:
+            index = cls(**json.loads(str(data['meta'])))
+            index.add_signatures(data['signatures'])
+        return index
+
+
+def near_duplicate_clusters(
+    texts: Sequence[Optional[str]],
+    threshold: float = 0.8,
+    n_jobs: Optional[int] = None,
+    **lsh_kwargs
+) -> np.ndarray:
+    """
+    Cluster songs with near-identical lyrics
+
+    Args:
+        texts: Lyrics
+        threshold: Minimum estimated Jaccard similarity of word shingles
+        n_jobs: Worker processes for MinHash signatures
+        **lsh_kwargs: num_perm, shingle_size, seed
+
+    Returns:
+        int64 cluster label per song (use as ``groups`` in the splitter)
+    """
+    index = MinHashLSH(threshold=threshold, **lsh_kwargs)
+    index.add(texts, n_jobs=n_jobs)
+    return index.clusters()
+
+
+def count_near_duplicates(clusters: np.ndarray) -> int:
+    """Number of songs that are near-duplicates of an earlier song"""
+    return int(len(clusters) - len(np.unique(clusters)))
@@ -3,4 +3,588 @@ Text Preprocessing Module for Music Lyrics
 
 Handles text cleaning, normalization, and preprocessing specific to music lyrics.
 Includes handling for music-specific elements like repetitions, ad-libs, etc.
-"""
\ No newline at end of file
+"""
+
+import os
+import re
+import json
+import time
+import heapq
+import logging
+import numpy as np
+import pandas as pd
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable, Sequence, Tuple
+
+from ..utils.helpers import stable_row_hashes
+from .schema import LyricsBuffer
+
+
+# Batches are cleaned and tokenized as one string with songs joined by this
+# separator, which the patterns below never consume and which becomes its own token
+DOC_SEPARATOR = "\x00"
+
+# [Chorus], [Verse 2: Artist], ... section annotations
+SECTION_PATTERN = re.compile(r"\[[^\]\x00]*\]")
+# (x2), (x 3), x4 repetition markers; the leading character class lets the
+# regex engine skip quickly over ordinary text
+REPEAT_PATTERN = re.compile(r"[(xX×](?:(?<=\()\s*[xX×]\s*\d+\s*\)|(?<=[xX×])(?<!\w[xX×])\d+\b)")
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s'\x00]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+TOKEN_PATTERN = re.compile(r"[\w']+|[^\w\s]")
+
+PAD_TOKEN = "<pad>"
+UNK_TOKEN = "<unk>"
+
+# Columns whose content identifies a processed song for incremental updates
+SONG_KEY_COLUMNS = ['title', 'artist', 'year', 'lyrics']
+
+
+class Vocabulary:
+    """
+    Token <-> id mapping with reserved padding (0) and unknown (1) ids
+    """
+
+    def __init__(self, tokens: Sequence[str]):
+        self.itos = [PAD_TOKEN, UNK_TOKEN] + [t for t in tokens if t not in (PAD_TOKEN, UNK_TOKEN)]
+        self._stoi: Optional[Dict[str, int]] = None
+        self._index: Optional[pd.Index] = None
+
+    @property
+    def stoi(self) -> Dict[str, int]:
+        """Token -> id dict (built on first use)"""
+        if self._stoi is None:
+            self._stoi = {token: i for i, token in enumerate(self.itos)}
+        return self._stoi
+
+    @property
+    def separator_id(self) -> int:
+        """Id returned by lookup() for DOC_SEPARATOR (outside the vocabulary)"""
+        return len(self.itos)
+
+    @property
+    def pad_id(self) -> int:
+        return 0
+
+    @property
+    def unk_id(self) -> int:
+        return 1
+
+    def __len__(self) -> int:
+        return len(self.itos)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.stoi
+
+    @classmethod
+    def build(
+        cls,
+        token_lists: Iterable[List[str]],
+        vocab_size: int = 10000,
+        min_word_freq: int = 2
+    ) -> "Vocabulary":
+        """
+        Build a vocabulary from tokenized texts
+
+        Args:
+            token_lists: Tokenized documents
+            vocab_size: Maximum vocabulary size (including reserved tokens)
+            min_word_freq: Minimum corpus frequency to keep a token
+
+        Returns:
+            Vocabulary
+        """
+        counts = Counter()
+        for tokens in token_lists:
+            counts.update(tokens)
+        return cls.from_counts(counts, vocab_size, min_word_freq)
+
+    @classmethod
+    def from_counts(cls, counts: Counter, vocab_size: int = 10000, min_word_freq: int = 2) -> "Vocabulary":
+        """
+        Build a vocabulary from token counts (ties broken alphabetically)
+
+        Args:
+            counts: Token frequencies
+            vocab_size: Maximum vocabulary size (including reserved tokens)
+            min_word_freq: Minimum corpus frequency to keep a token
+
+        Returns:
+            Vocabulary
+        """
+        kept = heapq.nsmallest(
+            max(vocab_size - 2, 0),
+            (t for t, c in counts.items() if c >= min_word_freq),
+            key=lambda t: (-counts[t], t)
+        )
+        return cls(kept)
+
+    def encode(self, tokens: List[str]) -> List[int]:
+        """Map tokens to ids (unknown tokens map to unk_id)"""
+        unk = self.unk_id
+        return [self.stoi.get(token, unk) for token in tokens]
+
+    def lookup(self, tokens: Sequence[str]) -> np.ndarray:
+        """
+        Vectorized token -> id lookup for a flat token sequence
+
+        Unknown tokens map to unk_id and DOC_SEPARATOR maps to separator_id.
+
+        Args:
+            tokens: Flat list of tokens
+
+        Returns:
+            np.ndarray: int32 ids
+        """
+        if self._index is None:
+            self._index = pd.Index(self.itos + [DOC_SEPARATOR])
+        ids = self._index.get_indexer(tokens).astype(np.int32)
+        ids[ids < 0] = self.unk_id
+        return ids
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """Map ids back to tokens, dropping padding"""
+        return [self.itos[i] for i in ids if i != self.pad_id]
+
+    def save(self, path: Path) -> None:
+        """Save as one token per line (line number = id)"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.itos))
+
+    @classmethod
+    def load(cls, path: Path) -> "Vocabulary":
+        """Load a vocabulary saved with save()"""
+        with open(path, encoding="utf-8") as f:
+            return cls(f.read().split("\n"))
+
+
+class TokenizedCorpus:
+    """
+    Memory-mapped tokenized corpus
+
+    On-disk layout of a corpus directory::
+
+        tokens.int32   raw int32 matrix (num_rows x max_sequence_length), 0-padded
+        lengths.int32  raw int32 array with the unpadded length of each row
+        keys.uint64    optional song key per row (see stable_row_hashes)
+        vocab.txt      one token per line (line number = token id)
+        meta.json      num_rows, max_sequence_length, dtype, created_at
+
+    The raw files are opened with ``np.memmap`` so training and evaluation
+    read rows straight from the page cache without deserializing. Rows are
+    only ever appended, so existing row numbers stay valid across updates.
+    """
+
+    TOKENS_FILE = "tokens.int32"
+    LENGTHS_FILE = "lengths.int32"
+    KEYS_FILE = "keys.uint64"
+    VOCAB_FILE = "vocab.txt"
+    META_FILE = "meta.json"
+
+    def __init__(
+        self,
+        path: Path,
+        tokens: np.memmap,
+        lengths: np.memmap,
+        vocabulary: Vocabulary,
+        meta: Dict[str, Any],
+        keys: Optional[np.memmap] = None
+    ):
+        self.path = Path(path)
+        self.tokens = tokens
+        self.lengths = lengths
+        self.vocabulary = vocabulary
+        self.meta = meta
+        self.keys = keys
+
+    def __len__(self) -> int:
+        return self.meta["num_rows"]
+
+    @property
+    def max_sequence_length(self) -> int:
+        return self.meta["max_sequence_length"]
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        num_rows: int,
+        max_sequence_length: int,
+        vocabulary: Vocabulary,
+        keys: Optional[np.ndarray] = None
+    ) -> "TokenizedCorpus":
+        """
+        Allocate a new corpus on disk with writable memory maps
+
+        Args:
+            path: Corpus directory
+            num_rows: Number of songs
+            max_sequence_length: Row width (longer songs are truncated)
+            vocabulary: Vocabulary used for encoding
+            keys: Optional uint64 song key per row
+
+        Returns:
+            TokenizedCorpus opened in write mode
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "num_rows": int(num_rows),
+            "max_sequence_length": int(max_sequence_length),
+            "dtype": "int32",
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        # np.memmap cannot map empty files; keep at least one row allocated
+        shape = (max(num_rows, 1), max_sequence_length)
+        tokens = np.memmap(path / cls.TOKENS_FILE, dtype=np.int32, mode="w+", shape=shape)
+        lengths = np.memmap(path / cls.LENGTHS_FILE, dtype=np.int32, mode="w+", shape=(shape[0],))
+        if keys is not None:
+            np.asarray(keys, dtype=np.uint64).tofile(path / cls.KEYS_FILE)
+        vocabulary.save(path / cls.VOCAB_FILE)
+        cls._write_meta(path, meta)
+        return cls(path, tokens[:num_rows], lengths[:num_rows], vocabulary, meta)
+
+    @classmethod
+    def _write_meta(cls, path: Path, meta: Dict[str, Any]) -> None:
+        """Atomically write meta.json (the row count commits appended data)"""
+        tmp_path = path / (cls.META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, path / cls.META_FILE)
+
+    @classmethod
+    def open(cls, path: Path, mode: str = "r") -> "TokenizedCorpus":
+        """
+        Open an existing corpus without loading it into memory
+
+        Args:
+            path: Corpus directory
+            mode: np.memmap mode ('r' read-only, 'r+' read-write, 'c' copy-on-write)
+
+        Returns:
+            TokenizedCorpus
+        """
+        path = Path(path)
+        with open(path / cls.META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        num_rows, width = meta["num_rows"], meta["max_sequence_length"]
+        shape = (max(num_rows, 1), width)
+        tokens = np.memmap(path / cls.TOKENS_FILE, dtype=np.int32, mode=mode, shape=shape)[:num_rows]
+        lengths = np.memmap(path / cls.LENGTHS_FILE, dtype=np.int32, mode=mode, shape=(shape[0],))[:num_rows]
+        vocabulary = Vocabulary.load(path / cls.VOCAB_FILE)
+        keys = None
+        if (path / cls.KEYS_FILE).exists() and num_rows > 0:
+            keys = np.memmap(path / cls.KEYS_FILE, dtype=np.uint64, mode=mode, shape=(num_rows,))
+        return cls(path, tokens, lengths, vocabulary, meta, keys)
+
+    def append(self, token_ids: np.ndarray, lengths: np.ndarray, keys: np.ndarray) -> "TokenizedCorpus":
+        """
+        Append rows to the on-disk files and reopen the corpus
+
+        Data is written past the committed rows first; meta.json is updated
+        last, so an interrupted append leaves the corpus unchanged.
+
+        Args:
+            token_ids: int32 matrix (n x max_sequence_length)
+            lengths: int32 lengths (n)
+            keys: uint64 song keys (n)
+
+        Returns:
+            TokenizedCorpus reopened read-only with the new rows
+        """
+        num_rows = len(self)
+        arrays = [
+            (self.TOKENS_FILE, np.ascontiguousarray(token_ids, dtype=np.int32), 4 * self.max_sequence_length),
+            (self.LENGTHS_FILE, np.ascontiguousarray(lengths, dtype=np.int32), 4),
+            (self.KEYS_FILE, np.ascontiguousarray(keys, dtype=np.uint64), 8),
+        ]
+        for name, array, row_bytes in arrays:
+            with open(self.path / name, "ab") as f:
+                # Drop placeholder or uncommitted bytes beyond the committed rows
+                f.truncate(num_rows * row_bytes)
+                f.write(array.tobytes())
+
+        meta = dict(self.meta, num_rows=num_rows + len(lengths), updated_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        self._write_meta(self.path, meta)
+        return TokenizedCorpus.open(self.path)
+
+    def flush(self) -> None:
+        """Flush pending writes to disk"""
+        for array in (self.tokens, self.lengths):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+class LyricsPreprocessor:
+    """
+    Cleans, tokenizes and encodes lyrics into a memory-mapped corpus
+    """
+
+    def __init__(
+        self,
+        max_sequence_length: int = 512,
+        vocab_size: int = 10000,
+        min_word_freq: int = 2,
+        lowercase: bool = True,
+        remove_punctuation: bool = False
+    ):
+        self.max_sequence_length = max_sequence_length
+        self.vocab_size = vocab_size
+        self.min_word_freq = min_word_freq
+        self.lowercase = lowercase
+        self.remove_punctuation = remove_punctuation
+        self.vocabulary: Optional[Vocabulary] = None
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LyricsPreprocessor":
+        """
+        Create a preprocessor from the ``text_processing`` config section
+
+        Args:
+            config: Loaded configuration
+
+        Returns:
+            LyricsPreprocessor
+        """
+        params = config.get("text_processing", {})
+        return cls(
+            max_sequence_length=params.get("max_sequence_length", 512),
+            vocab_size=params.get("vocab_size", 10000),
+            min_word_freq=params.get("min_word_freq", 2),
+            lowercase=params.get("lowercase", True),
+            remove_punctuation=params.get("remove_punctuation", False),
+        )
+
+    def clean_text(self, text: Optional[str]) -> str:
+        """
+        Normalize a lyric: drop section headers and repetition markers,
+        optionally lowercase/strip punctuation, collapse whitespace
+
+        Args:
+            text: Raw lyric (None is treated as empty)
+
+        Returns:
+            str: Cleaned text
+        """
+        if not isinstance(text, str):
+            return ""
+        return WHITESPACE_PATTERN.sub(" ", self._normalize(text)).strip()
+
+    def _normalize(self, text: str) -> str:
+        """Apply the cleaning rules except whitespace collapsing"""
+        text = SECTION_PATTERN.sub(" ", text)
+        text = REPEAT_PATTERN.sub(" ", text)
+        if self.lowercase:
+            text = text.lower()
+        if self.remove_punctuation:
+            text = PUNCTUATION_PATTERN.sub(" ", text)
+        return text
+
+    def tokenize(self, text: Optional[str]) -> List[str]:
+        """Clean and split a lyric into word and punctuation tokens"""
+        return TOKEN_PATTERN.findall(self.clean_text(text))
+
+    def clean_batch(self, texts: Iterable[Optional[str]]) -> str:
+        """
+        Clean many lyrics at once as a single DOC_SEPARATOR-joined string
+
+        Each regex runs once over the whole batch instead of once per song.
+        Whitespace is left uncollapsed since tokenization ignores it. A
+        LyricsBuffer or Arrow-backed Series is joined straight from its
+        UTF-8 buffer, without a Python string per song.
+
+        Args:
+            texts: Raw lyrics
+
+        Returns:
+            str: Cleaned lyrics joined by DOC_SEPARATOR
+        """
+        buffer = LyricsBuffer.maybe_from(texts)
+        if buffer is not None:
+            return self._normalize(buffer.joined(DOC_SEPARATOR))
+        joined = DOC_SEPARATOR.join(
+            text.replace(DOC_SEPARATOR, " ") if isinstance(text, str) else "" for text in texts
+        )
+        return self._normalize(joined)
+
+    def count_tokens(
+        self,
+        texts: Sequence[Optional[str]],
+        n_jobs: Optional[int] = None,
+        chunk_size: int = 20000
+    ) -> Counter:
+        """
+        Count token frequencies, in parallel worker processes for large corpora
+
+        Each worker counts one chunk of songs; the per-chunk counters are
+        merged, so cost grows linearly with the number of tokens.
+
+        Args:
+            texts: Raw lyrics
+            n_jobs: Worker processes (None = one per CPU, 1 = in-process)
+            chunk_size: Songs per worker task
+
+        Returns:
+            Counter of token frequencies
+        """
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        if n_jobs == 1 or len(chunks) <= 1:
+            partials = [_count_chunk(self, chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                partials = list(executor.map(_count_chunk, [self] * len(chunks), chunks))
+
+        counts = Counter()
+        for partial in partials:
+            counts.update(partial)
+        return counts
+
+    def fit(self, texts: Sequence[Optional[str]], n_jobs: Optional[int] = None) -> Vocabulary:
+        """
+        Build the vocabulary from a corpus, pruned by vocab_size and min_word_freq
+
+        Args:
+            texts: Raw lyrics
+            n_jobs: Worker processes for token counting
+
+        Returns:
+            Vocabulary
+        """
+        counts = self.count_tokens(texts, n_jobs=n_jobs)
+        self.vocabulary = Vocabulary.from_counts(counts, self.vocab_size, self.min_word_freq)
+        self.logger.info(f"Vocabulary built: {len(self.vocabulary)} tokens from {len(counts)} distinct")
+        return self.vocabulary
+
+    def encode(self, texts: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode lyrics to a padded int32 id matrix
+
+        The batch is tokenized as one string, ids are looked up in one
+        vectorized call and scattered into the padded matrix with NumPy.
+
+        Args:
+            texts: Raw lyrics
+
+        Returns:
+            Tuple of (token_ids [n x max_sequence_length], lengths [n])
+        """
+        if self.vocabulary is None:
+            raise ValueError("Vocabulary not built. Call fit() first.")
+        n = len(texts)
+        token_ids = np.zeros((n, self.max_sequence_length), dtype=np.int32)
+        if n == 0:
+            return token_ids, np.zeros(0, dtype=np.int32)
+
+        ids = self.vocabulary.lookup(TOKEN_PATTERN.findall(self.clean_batch(texts)))
+        separators = np.flatnonzero(ids == self.vocabulary.separator_id)
+        starts = np.concatenate(([0], separators + 1))
+        ends = np.concatenate((separators, [len(ids)]))
+        lengths = np.minimum(ends - starts, self.max_sequence_length).astype(np.int32)
+
+        rows = np.repeat(np.arange(n), lengths)
+        cols = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        token_ids[rows, cols] = ids[np.repeat(starts, lengths) + cols]
+        return token_ids, lengths
+
+    def process_corpus(
+        self,
+        texts: Sequence[Optional[str]],
+        output_dir: str,
+        batch_size: int = 10000,
+        n_jobs: Optional[int] = None,
+        keys: Optional[np.ndarray] = None
+    ) -> TokenizedCorpus:
+        """
+        Fit the vocabulary (if needed) and write a memory-mapped corpus
+
+        Rows are encoded batch by batch straight into the memory map, so peak
+        memory is bounded by batch_size rather than the corpus size.
+
+        Args:
+            texts: Raw lyrics
+            output_dir: Corpus directory
+            batch_size: Songs encoded per batch
+            n_jobs: Worker processes for vocabulary counting
+            keys: Optional uint64 song key per row (enables update_corpus)
+
+        Returns:
+            TokenizedCorpus opened read-only
+        """
+        if self.vocabulary is None:
+            self.fit(texts, n_jobs=n_jobs)
+
+        corpus = TokenizedCorpus.create(output_dir, len(texts), self.max_sequence_length, self.vocabulary, keys)
+        for start in range(0, len(texts), batch_size):
+            stop = min(start + batch_size, len(texts))
+            token_ids, lengths = self.encode(texts[start:stop])
+            corpus.tokens[start:stop] = token_ids
+            corpus.lengths[start:stop] = lengths
+        corpus.flush()
+        self.logger.info(f"Tokenized corpus written to {output_dir}: {len(texts)} songs")
+        return TokenizedCorpus.open(output_dir)
+
+    def update_corpus(
+        self,
+        df: pd.DataFrame,
+        output_dir: str,
+        batch_size: int = 10000,
+        n_jobs: Optional[int] = None
+    ) -> Tuple[TokenizedCorpus, np.ndarray]:
+        """
+        Incrementally bring a corpus up to date with a dataset
+
+        Songs are keyed by a stable hash of (title, artist, year, lyrics).
+        Only songs whose key is not yet stored are cleaned, tokenized and
+        appended; everything else is reused from the memory-mapped files.
+        The first call builds the corpus (and vocabulary) from scratch;
+        later calls reuse the stored vocabulary, so new words map to <unk>
+        until the corpus is rebuilt.
+
+        Args:
+            df: Current catalog with SONG_KEY_COLUMNS
+            output_dir: Corpus directory
+            batch_size: Songs encoded per batch
+            n_jobs: Worker processes for vocabulary counting (first build)
+
+        Returns:
+            Tuple of (corpus, row index of each df row in the corpus)
+        """
+        keys = stable_row_hashes(df, SONG_KEY_COLUMNS)
+        lyrics = df['lyrics'].reset_index(drop=True)
+        meta_path = Path(output_dir) / TokenizedCorpus.META_FILE
+
+        if not meta_path.exists():
+            first = ~pd.Series(keys).duplicated().to_numpy()
+            corpus = self.process_corpus(
+                lyrics[first], output_dir, batch_size=batch_size, n_jobs=n_jobs, keys=keys[first]
+            )
+        else:
+            corpus = TokenizedCorpus.open(output_dir)
+            if corpus.keys is None and len(corpus) > 0:
+                raise ValueError(f"Corpus at {output_dir} has no song keys; rebuild it with update_corpus")
+            self.vocabulary = corpus.vocabulary
+
+            stored = corpus.keys if corpus.keys is not None else np.empty(0, dtype=np.uint64)
+            new_mask = pd.Index(stored).get_indexer(keys) < 0
+            new_mask &= ~pd.Series(keys).duplicated().to_numpy()
+            new_rows = np.flatnonzero(new_mask)
+            self.logger.info(f"Incremental update: {len(new_rows)} new or changed of {len(df)} songs")
+
+            for start in range(0, len(new_rows), batch_size):
+                rows = new_rows[start:start + batch_size]
+                token_ids, lengths = self.encode(lyrics.iloc[rows].tolist())
+                corpus = corpus.append(token_ids, lengths, keys[rows])
+
+        stored = corpus.keys if corpus.keys is not None else np.empty(0, dtype=np.uint64)
+        row_index = pd.Index(np.asarray(stored)).get_indexer(keys).astype(np.int64)
+        return corpus, row_index
+
+
+def _count_chunk(preprocessor: LyricsPreprocessor, texts: Sequence[Optional[str]]) -> Counter:
+    """Worker for LyricsPreprocessor.count_tokens: count tokens of one chunk"""
+    counts = Counter(TOKEN_PATTERN.findall(preprocessor.clean_batch(texts)))
+    counts.pop(DOC_SEPARATOR, None)
+    return counts
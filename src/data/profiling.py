@@ -0,0 +1,378 @@
+"""
+Dataset Profiling Module
+
+Incremental statistics for music lyrics datasets. Profiles are built
+chunk by chunk so arbitrarily large corpora can be described and validated
+in bounded memory.
+"""
+
+import numpy as np
+import pandas as pd
+from collections import Counter
+from typing import Optional, Tuple, Dict, Any, List
+
+
+REQUIRED_COLUMNS = ['title', 'artist', 'year', 'lyrics']
+MIN_VALID_YEAR = 1900
+MAX_VALID_YEAR = 2030
+
+
+def validation_issues(
+    columns: List[str],
+    empty_lyrics: Optional[int],
+    year_range: Optional[Tuple[Any, Any]],
+    duplicates: Optional[int]
+) -> List[str]:
+    """
+    Build the list of validation issues from precomputed statistics
+
+    Args:
+        columns: Dataset columns
+        empty_lyrics: Number of null lyrics (None if no lyrics column)
+        year_range: (min_year, max_year) or None if no year column
+        duplicates: Number of duplicate (title, artist) rows or None
+
+    Returns:
+        List of human-readable issues
+    """
+    issues = []
+
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_cols:
+        issues.append(f"Missing required columns: {missing_cols}")
+
+    if empty_lyrics:
+        issues.append(f"Found {empty_lyrics} songs with empty lyrics")
+
+    if year_range is not None:
+        min_year, max_year = year_range
+        if min_year < MIN_VALID_YEAR or max_year > MAX_VALID_YEAR:
+            issues.append(f"Suspicious year range: {min_year}-{max_year}")
+
+    if duplicates:
+        issues.append(f"Found {duplicates} duplicate songs (same title + artist)")
+
+    return issues
+
+
+class HyperLogLog:
+    """
+    HyperLogLog cardinality sketch over 64-bit hashes
+
+    Uses 2**precision one-byte registers (16 KB at the default precision),
+    giving a relative standard error of about 1.04 / sqrt(2**precision).
+    """
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = np.zeros(self.num_registers, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """
+        Add a batch of uint64 hashes to the sketch
+
+        Args:
+            hashes: Array of uint64 hash values
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+
+        value_bits = 64 - self.precision
+        index = (hashes >> np.uint64(value_bits)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << value_bits) - 1)
+
+        # Rank = position of the leftmost 1-bit in the remaining bits
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = (value_bits - np.minimum(bit_length, value_bits) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Merge another sketch with the same precision into this one"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """Estimate the number of distinct hashes added"""
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class RunningStats:
+    """Online mean/standard deviation merged batch by batch (Chan et al.)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Merge a batch of values into the running statistics
+
+        Args:
+            values: Numeric array without NaNs
+        """
+        n = values.size
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas)"""
+        if self.count < 2:
+            return float('nan')
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+class StreamingProfile:
+    """
+    Incremental dataset profile fed with DataFrame chunks
+
+    Memory stays bounded by the chunk size except for exact duplicate
+    detection, which keeps 8 bytes per distinct (title, artist) pair.
+    Distinct artists are estimated with HyperLogLog and top artists with a
+    bounded counter, so both are approximate on very large corpora.
+    """
+
+    def __init__(self, top_k_capacity: int = 1000, hll_precision: int = 14):
+        self.top_k_capacity = top_k_capacity
+        self.num_rows = 0
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, Any] = {}
+        self.null_counts: Counter = Counter()
+        self.memory_usage = 0
+        self.year_min = None
+        self.year_max = None
+        self.year_counts: Counter = Counter()
+        self.artist_counts: Counter = Counter()
+        self.artist_sketch = HyperLogLog(hll_precision)
+        self.lyrics_length = RunningStats()
+        self.duplicates = 0
+        self._seen_songs = np.empty(0, dtype=np.uint64)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Add a DataFrame chunk to the profile
+
+        Args:
+            chunk: Next batch of rows
+        """
+        if not self.columns:
+            self.columns = list(chunk.columns)
+            self.dtypes = chunk.dtypes.to_dict()
+
+        self.num_rows += len(chunk)
+        self.null_counts.update(chunk.isnull().sum().to_dict())
+        self.memory_usage += int(chunk.memory_usage(deep=True).sum())
+
+        if 'year' in chunk.columns:
+            years = pd.to_numeric(chunk['year'], errors='coerce').dropna()
+            if len(years):
+                chunk_min, chunk_max = years.min(), years.max()
+                self.year_min = chunk_min if self.year_min is None else min(self.year_min, chunk_min)
+                self.year_max = chunk_max if self.year_max is None else max(self.year_max, chunk_max)
+                self.year_counts.update(years.value_counts().to_dict())
+
+        if 'artist' in chunk.columns:
+            artists = chunk['artist'].dropna()
+            self.artist_sketch.add_hashes(pd.util.hash_pandas_object(artists, index=False).to_numpy())
+            self.artist_counts.update(artists.value_counts().to_dict())
+            if len(self.artist_counts) > 2 * self.top_k_capacity:
+                self.artist_counts = Counter(dict(self.artist_counts.most_common(self.top_k_capacity)))
+
+        if 'lyrics' in chunk.columns:
+            lengths = chunk['lyrics'].dropna().str.len().to_numpy(dtype=np.float64)
+            self.lyrics_length.update(lengths)
+
+        if 'title' in chunk.columns and 'artist' in chunk.columns:
+            keys = pd.util.hash_pandas_object(chunk[['title', 'artist']], index=False).to_numpy()
+            unique_keys = np.unique(keys)
+            repeated = np.isin(unique_keys, self._seen_songs, assume_unique=True)
+            self.duplicates += len(keys) - int((~repeated).sum())
+            self._seen_songs = np.union1d(self._seen_songs, unique_keys[~repeated])
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Dataset information with the same keys as MusicDataLoader.get_dataset_info
+
+        Returns:
+            Dict containing dataset statistics
+        """
+        numeric = [col for col, dtype in self.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+        text = [
+            col for col, dtype in self.dtypes.items()
+            if pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.StringDtype)
+        ]
+        info = {
+            "shape": (self.num_rows, len(self.columns)),
+            "columns": list(self.columns),
+            "dtypes": dict(self.dtypes),
+            "null_counts": {col: int(self.null_counts[col]) for col in self.columns},
+            "memory_usage": self.memory_usage,
+            "numeric_columns": numeric,
+            "text_columns": text
+        }
+
+        if 'year' in self.columns:
+            info['year_range'] = (self.year_min, self.year_max)
+            info['year_distribution'] = dict(self.year_counts.most_common(10))
+
+        if 'artist' in self.columns:
+            info['unique_artists'] = self.artist_sketch.count()
+            info['top_artists'] = dict(self.artist_counts.most_common(10))
+
+        if 'lyrics' in self.columns:
+            info['avg_lyrics_length'] = self.lyrics_length.mean if self.lyrics_length.count else float('nan')
+            info['lyrics_length_std'] = self.lyrics_length.std
+
+        return info
+
+    def issues(self) -> List[str]:
+        """
+        Validation issues with the same rules as MusicDataLoader.validate_dataset
+
+        Returns:
+            List of human-readable issues
+        """
+        has_year = 'year' in self.columns and self.year_min is not None
+        return validation_issues(
+            self.columns,
+            empty_lyrics=self.null_counts['lyrics'] if 'lyrics' in self.columns else None,
+            year_range=(self.year_min, self.year_max) if has_year else None,
+            duplicates=self.duplicates if 'title' in self.columns and 'artist' in self.columns else None
+        )
+
+
+def _codes(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Integer codes and unique values for a column (-1 marks nulls)
+
+    Categorical columns reuse their existing codes instead of re-hashing.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), pd.Index(series.cat.categories)
+    codes, uniques = pd.factorize(series)
+    return codes, pd.Index(uniques)
+
+
+def _top_counts(codes: np.ndarray, uniques: pd.Index, k: int = 10) -> Tuple[np.ndarray, Dict[Any, int]]:
+    """Per-code counts and the k most frequent values (nulls excluded)"""
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    top = np.argsort(-counts, kind='stable')[:k]
+    return counts, {uniques[i]: int(counts[i]) for i in top if counts[i] > 0}
+
+
+def estimate_memory_usage(df: pd.DataFrame, sample_size: int = 1000, random_state: int = 0) -> int:
+    """
+    Approximate deep memory usage by sampling variable-width columns
+
+    Fixed-width columns are measured exactly; categorical columns count
+    their codes plus the deep size of their categories; object columns are
+    extrapolated from a random sample of rows.
+
+    Args:
+        df: Input dataframe
+        sample_size: Rows sampled for object columns
+        random_state: Seed for the sample
+
+    Returns:
+        int: Estimated bytes
+    """
+    shallow = df.memory_usage(deep=False)
+    total = int(shallow.sum())
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Shallow usage only counts the category pointers, not the strings
+            categories = df[col].cat.categories
+            total += int(categories.memory_usage(deep=True) - categories.memory_usage(deep=False))
+    object_cols = [col for col in df.columns if pd.api.types.is_object_dtype(df[col].dtype)]
+    if not object_cols or len(df) == 0:
+        return total
+
+    n = min(sample_size, len(df))
+    sample = df[object_cols].sample(n=n, random_state=random_state)
+    deep_sample = sample.memory_usage(deep=True, index=False) - sample.memory_usage(deep=False, index=False)
+    return total + int(deep_sample.sum() * len(df) / n)
+
+
+def profile_dataframe(
+    df: pd.DataFrame,
+    approximate_memory: bool = False
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Compute dataset information and validation issues in one shared pass
+
+    Each column is scanned once: artist/title/year are factorized to integer
+    codes (or reuse categorical codes) and lyrics lengths are computed once
+    as int32. Counts, top values and (title, artist) duplicates are then
+    derived from the codes without touching the strings again.
+
+    Args:
+        df: Input dataframe
+        approximate_memory: Estimate deep memory usage from a sample
+
+    Returns:
+        Tuple of (info dict as in get_dataset_info, list_of_issues)
+    """
+    columns = list(df.columns)
+    null_counts = df.isnull().sum()
+    info = {
+        "shape": df.shape,
+        "columns": columns,
+        "dtypes": df.dtypes.to_dict(),
+        "null_counts": null_counts.to_dict(),
+        "memory_usage": estimate_memory_usage(df) if approximate_memory else df.memory_usage(deep=True).sum(),
+        "numeric_columns": df.select_dtypes(include=[np.number]).columns.tolist(),
+        "text_columns": df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
+    }
+    if 'memory_footprint' in df.attrs:
+        # Footprint before/after MusicDataLoader converted to the compact schema
+        info['memory_footprint'] = dict(df.attrs['memory_footprint'])
+
+    year_range = None
+    if 'year' in df.columns:
+        year_codes, years = _codes(df['year'])
+        _, info['year_distribution'] = _top_counts(year_codes, years)
+        year_values = pd.Series(years)
+        year_range = (year_values.min(), year_values.max())
+        info['year_range'] = year_range
+
+    artist_codes = None
+    if 'artist' in df.columns:
+        artist_codes, artists = _codes(df['artist'])
+        counts, info['top_artists'] = _top_counts(artist_codes, artists)
+        info['unique_artists'] = int(np.count_nonzero(counts))
+
+    empty_lyrics = None
+    if 'lyrics' in df.columns:
+        empty_lyrics = int(null_counts['lyrics'])
+        lengths = df['lyrics'].str.len().to_numpy(dtype=np.float64, na_value=np.nan)
+        lengths = lengths[~np.isnan(lengths)].astype(np.int32)
+        info['avg_lyrics_length'] = lengths.mean(dtype=np.float64) if lengths.size else np.nan
+        info['lyrics_length_std'] = lengths.std(dtype=np.float64, ddof=1) if lengths.size > 1 else np.nan
+
+    duplicates = None
+    if 'title' in df.columns and artist_codes is not None:
+        title_codes, _ = _codes(df['title'])
+        combined = (title_codes.astype(np.int64) + 1) * (int(artist_codes.max(initial=-1)) + 2) \
+            + (artist_codes.astype(np.int64) + 1)
+        duplicates = len(df) - len(pd.unique(combined))
+
+    issues = validation_issues(columns, empty_lyrics, year_range, duplicates)
+    return info, issues
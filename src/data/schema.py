@@ -0,0 +1,217 @@
+"""
+Compact In-Memory Schema
+
+Converts loaded lyrics datasets to a memory-efficient representation:
+categorical title/artist (when repeated enough to pay off), int16
+year/decade and Arrow-backed lyrics stored
+as one contiguous UTF-8 buffer plus an offsets array.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Iterator, Optional, Union
+
+from .profiling import estimate_memory_usage
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+CATEGORICAL_COLUMNS = ['title', 'artist']
+# Above this share of distinct values a categorical outweighs the object column
+MAX_CATEGORICAL_UNIQUE_RATIO = 0.5
+SMALL_INT_COLUMNS = ['year', 'decade']
+
+
+def _to_int16(series: pd.Series) -> pd.Series:
+    """
+    Downcast a year-like column to int16 (nullable Int16 if it has nulls)
+
+    Columns with non-numeric, fractional or out-of-range values are
+    returned unchanged so validation can report the offending values.
+    """
+    values = pd.to_numeric(series, errors='coerce')
+    if values.isnull().sum() > series.isnull().sum():
+        return series
+    known = values.dropna().to_numpy(dtype=np.float64)
+    limits = np.iinfo(np.int16)
+    if len(known) and (
+        (known != np.round(known)).any() or known.min() < limits.min or known.max() > limits.max
+    ):
+        return series
+    if values.isnull().any():
+        return values.astype('Int16')
+    return values.astype(np.int16)
+
+
+def optimize_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a lyrics DataFrame to the compact schema
+
+    The before/after footprint is recorded in ``df.attrs['memory_footprint']``
+    and reported by ``MusicDataLoader.get_dataset_info``.
+
+    Args:
+        df: Loaded dataset
+
+    Returns:
+        pandas.DataFrame: Dataset with compact dtypes
+    """
+    before = estimate_memory_usage(df)
+    converted = {}
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            if df[col].nunique() <= MAX_CATEGORICAL_UNIQUE_RATIO * len(df):
+                converted[col] = df[col].astype('category')
+
+    for col in SMALL_INT_COLUMNS:
+        if col in df.columns and df[col].dtype != np.int16:
+            converted[col] = _to_int16(df[col])
+
+    if PYARROW_AVAILABLE and 'lyrics' in df.columns and df['lyrics'].dtype != pd.StringDtype("pyarrow"):
+        converted['lyrics'] = df['lyrics'].astype(pd.StringDtype("pyarrow"))
+
+    compact = df.assign(**converted) if converted else df.copy(deep=False)
+    after = estimate_memory_usage(compact)
+    compact.attrs['memory_footprint'] = {
+        'before': before,
+        'after': after,
+        'reduction': 1 - after / before if before else 0.0
+    }
+    return compact
+
+
+class LyricsBuffer:
+    """
+    Lyrics as a contiguous UTF-8 byte buffer plus int64 offsets
+
+    Song ``i`` occupies ``data[offsets[i]:offsets[i + 1]]``. When built from
+    a single-chunk Arrow ``large_string`` column the arrays are views over
+    the Arrow buffers and no lyric bytes are copied; ``string`` columns
+    (int32 offsets) and multi-chunk columns are copied once on conversion.
+
+    ``LyricsPreprocessor.clean_batch`` (and so ``TextFeatureExtractor`` and
+    ``TemporalFeatureExtractor``) accepts a buffer or an Arrow-backed
+    column directly and decodes the whole batch with one ``joined`` call
+    instead of materializing a Python string per song. Slices are
+    contiguous views, so chunks sent to worker processes only carry their
+    own bytes.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, null_mask: Optional[np.ndarray] = None):
+        self.data = data
+        self.offsets = offsets
+        self.null_mask = null_mask if null_mask is not None else np.zeros(len(offsets) - 1, dtype=bool)
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "LyricsBuffer":
+        """
+        Build a buffer from a lyrics column
+
+        Args:
+            series: Lyrics column (Arrow-backed columns are wrapped zero-copy)
+
+        Returns:
+            LyricsBuffer
+        """
+        if PYARROW_AVAILABLE and series.dtype == pd.StringDtype("pyarrow"):
+            # Multi-chunk columns are concatenated once; single chunks are views
+            chunked = series.array.__arrow_array__()
+            array = chunked.chunk(0) if chunked.num_chunks == 1 else chunked.combine_chunks()
+            if not pa.types.is_large_string(array.type):
+                array = array.cast(pa.large_string())
+            _, offsets_buf, data_buf = array.buffers()
+            offsets = np.frombuffer(offsets_buf, dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+            data = np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else np.empty(0, np.uint8)
+            null_mask = array.is_null().to_numpy(zero_copy_only=False)
+            return cls(data, offsets, null_mask)
+
+        null_mask = series.isnull().to_numpy()
+        encoded = [b"" if missing else str(text).encode("utf-8") for text, missing in zip(series, null_mask)]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets, null_mask)
+
+    @classmethod
+    def maybe_from(cls, texts: Any) -> Optional["LyricsBuffer"]:
+        """
+        The buffer for texts that already have one
+
+        Args:
+            texts: Lyrics in any form
+
+        Returns:
+            ``texts`` itself if it is a LyricsBuffer, a buffer over an
+            Arrow-backed Series, or None for other inputs
+        """
+        if isinstance(texts, cls):
+            return texts
+        if PYARROW_AVAILABLE and isinstance(texts, pd.Series) and texts.dtype == pd.StringDtype("pyarrow"):
+            return cls.from_series(texts)
+        return None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Optional[str], "LyricsBuffer"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("LyricsBuffer slices must be contiguous")
+            stop = max(stop, start)
+            base = self.offsets[start]
+            return LyricsBuffer(
+                self.data[base:self.offsets[stop]],
+                self.offsets[start:stop + 1] - base,
+                self.null_mask[start:stop]
+            )
+        if self.null_mask[index]:
+            return None
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def joined(self, separator: str = "\x00") -> str:
+        """
+        All songs decoded as one separator-joined string (nulls are empty)
+
+        The separator is inserted into the byte buffer and the result is
+        decoded once. Separator characters inside lyrics become spaces.
+
+        Args:
+            separator: Single ASCII character
+
+        Returns:
+            str
+        """
+        sep = separator.encode("ascii")
+        if len(sep) != 1:
+            raise ValueError("separator must be a single ASCII character")
+        if len(self) == 0:
+            return ""
+
+        data = self.data[self.offsets[0]:self.offsets[-1]]
+        lengths = self.byte_lengths()
+        if (self.null_mask & (lengths > 0)).any():
+            data = data[np.repeat(~self.null_mask, lengths)]
+            lengths = np.where(self.null_mask, 0, lengths)
+        if (data == sep[0]).any():
+            data = np.where(data == sep[0], np.uint8(ord(" ")), data)
+        starts = np.cumsum(lengths[:-1])
+        return np.insert(data, starts, sep[0]).tobytes().decode("utf-8")
+
+    def byte_lengths(self) -> np.ndarray:
+        """UTF-8 length of each song in bytes"""
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the buffer, offsets and null mask"""
+        return self.data.nbytes + self.offsets.nbytes + self.null_mask.nbytes
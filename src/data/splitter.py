@@ -5,132 +5,829 @@ Provides stratified splitting of music data considering temporal, genre,
 and label distribution aspects for robust train/validation/test sets.
 """
 
+import os
+import json
 import pandas as pd
 import numpy as np
+from pathlib import Path
 from sklearn.model_selection import train_test_split
-from typing import Tuple, Optional
+from typing import Dict, Iterator, Optional, Sequence, Tuple
 import warnings
 
+from ..utils.helpers import compute_decade, stable_row_hashes
 
-def create_stratified_split(
+
+SPLIT_NAMES = ('train', 'val', 'test')
+
+# Colunas que identificam uma música para a atribuição por hash
+SONG_IDENTITY_COLUMNS = ('title', 'artist')
+
+
+def _stratification_codes(
+    df: pd.DataFrame,
+    stratify_by: Optional[str]
+) -> Tuple[Optional[np.ndarray], Optional[pd.Index]]:
+    """Códigos inteiros e valores distintos da coluna de estratificação"""
+    if stratify_by is None:
+        return None, None
+    if stratify_by in df.columns:
+        values = df[stratify_by]
+    elif stratify_by == 'decade' and 'year' in df.columns:
+        values = compute_decade(df['year'])
+    else:
+        warnings.warn(f"Coluna '{stratify_by}' não encontrada. Usando divisão aleatória.")
+        return None, None
+
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), pd.Index(uniques)
+
+
+def stratification_key(df: pd.DataFrame, stratify_by: Optional[str] = 'decade') -> Optional[np.ndarray]:
+    """
+    Calcula a chave de estratificação como códigos inteiros
+
+    Lê apenas a coluna necessária; a década é derivada do ano sem copiar o
+    DataFrame.
+
+    Args:
+        df: DataFrame com dados musicais
+        stratify_by: Coluna para estratificação ('decade', 'year', 'genre')
+
+    Returns:
+        Array int64 com um código por linha, ou None se a coluna não existir
+    """
+    return _stratification_codes(df, stratify_by)[0]
+
+
+def create_split_indices(
     df: pd.DataFrame,
     test_size: float = 0.2,
     val_size: float = 0.1,
-    stratify_by: str = 'decade',
-    random_state: int = 42
-) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    stratify_by: Optional[str] = 'decade',
+    random_state: int = 42,
+    key: Optional[np.ndarray] = None,
+    groups: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
     """
-    Cria divisão estratificada dos dados musicais
-    
+    Cria divisão estratificada como arrays de posições
+
+    Apenas índices inteiros são divididos; nenhuma letra é copiada. Use
+    ``take_split`` para materializar um DataFrame quando necessário. Com
+    ``groups`` (ex.: clusters de ``near_duplicate_clusters``), cada grupo
+    inteiro vai para uma única divisão, estratificado pela primeira linha.
+
     Args:
         df: DataFrame com dados musicais
         test_size: Proporção para teste (0.2 = 20%)
         val_size: Proporção para validação (0.1 = 10%)
         stratify_by: Coluna para estratificação ('decade', 'year', 'genre')
         random_state: Seed para reprodutibilidade
-        
+        key: Chave de estratificação já calculada (ignora stratify_by)
+        groups: Rótulo de grupo por linha; linhas do mesmo grupo ficam juntas
+
     Returns:
-        Tuple com (train_df, val_df, test_df)
+        Dict com arrays de posições ordenadas para 'train', 'val' e 'test'
     """
-    
-    # Cria coluna de década se necessário
-    if stratify_by == 'decade' and 'decade' not in df.columns and 'year' in df.columns:
-        df = df.copy()
-        df['decade'] = (df['year'] // 10) * 10
-    
-    # Verifica se coluna de estratificação existe
-    if stratify_by not in df.columns:
-        warnings.warn(f"Coluna '{stratify_by}' não encontrada. Usando divisão aleatória.")
-        stratify_col = None
-    else:
-        stratify_col = df[stratify_by]
-    
+    if key is None:
+        key = stratification_key(df, stratify_by)
+    positions = np.arange(len(df))
+    if groups is not None:
+        _, first_row, row_group = np.unique(np.asarray(groups), return_index=True, return_inverse=True)
+        positions = np.arange(len(first_row))
+        key = None if key is None else key[first_row]
+
     # Primeira divisão: treino+val vs teste
-    train_val_df, test_df = train_test_split(
-        df,
+    train_val_idx, test_idx = train_test_split(
+        positions,
         test_size=test_size,
-        stratify=stratify_col,
+        stratify=key,
         random_state=random_state
     )
-    
-    # Segunda divisão: treino vs validação
-    # Ajusta proporção da validação
+
+    # Segunda divisão: treino vs validação (proporção ajustada)
     val_size_adjusted = val_size / (1 - test_size)
-    
-    if stratify_by in train_val_df.columns:
-        stratify_col_train_val = train_val_df[stratify_by]
-    else:
-        stratify_col_train_val = None
-    
-    train_df, val_df = train_test_split(
-        train_val_df,
+    train_idx, val_idx = train_test_split(
+        train_val_idx,
         test_size=val_size_adjusted,
-        stratify=stratify_col_train_val,
+        stratify=None if key is None else key[train_val_idx],
         random_state=random_state
     )
-    
+
+    parts = (train_idx, val_idx, test_idx)
+    if groups is not None:
+        group_part = np.empty(len(positions), dtype=np.int8)
+        for part, idx in enumerate(parts):
+            group_part[idx] = part
+        return _parts_to_indices(group_part[row_group])
+
+    # Posições ordenadas mantêm leituras sequenciais no DataFrame e no memmap
+    return {name: np.sort(idx) for name, idx in zip(SPLIT_NAMES, parts)}
+
+
+def _parts_to_indices(parts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Converte o número da divisão de cada linha em arrays de posições"""
+    return {name: np.flatnonzero(parts == i) for i, name in enumerate(SPLIT_NAMES)}
+
+
+def take_split(df: pd.DataFrame, indices: np.ndarray) -> pd.DataFrame:
+    """
+    Materializa o DataFrame de uma divisão
+
+    Args:
+        df: DataFrame original
+        indices: Posições retornadas por create_split_indices
+
+    Returns:
+        DataFrame com as linhas da divisão
+    """
+    return df.iloc[indices]
+
+
+def save_split_indices(splits: Dict[str, np.ndarray], output_dir: str) -> Path:
+    """
+    Salva os índices de cada divisão como <nome>.npy
+
+    Args:
+        splits: Dict retornado por create_split_indices
+        output_dir: Diretório de saída
+
+    Returns:
+        Path do diretório
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, indices in splits.items():
+        np.save(output_dir / f"{name}.npy", np.asarray(indices, dtype=np.int64))
+    return output_dir
+
+
+def load_split_indices(output_dir: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Carrega índices salvos por save_split_indices
+
+    Args:
+        output_dir: Diretório com os arquivos .npy
+        mmap: Abre os arrays como memmap somente leitura
+
+    Returns:
+        Dict nome -> array de posições
+    """
+    output_dir = Path(output_dir)
+    mmap_mode = 'r' if mmap else None
+    return {
+        path.stem: np.load(path, mmap_mode=mmap_mode)
+        for path in sorted(output_dir.glob("*.npy"))
+    }
+
+
+def summarize_split(
+    splits: Dict[str, np.ndarray],
+    key: Optional[np.ndarray] = None,
+    strata: Optional[pd.Index] = None
+) -> pd.DataFrame:
+    """
+    Conta linhas por divisão e por estrato com np.bincount
+
+    Códigos -1 (valor ausente, como atribuído por pd.factorize) são
+    contados em um estrato próprio, na coluna 'missing'.
+
+    Args:
+        splits: Dict nome -> posições
+        key: Códigos de estratificação (opcional)
+        strata: Nome de cada código, usado nas colunas (opcional)
+
+    Returns:
+        DataFrame com uma linha por divisão (total e contagem por estrato)
+    """
+    total = sum(len(idx) for idx in splits.values())
+    summary = pd.DataFrame(
+        {'count': [len(idx) for idx in splits.values()]},
+        index=list(splits)
+    )
+    summary['fraction'] = summary['count'] / total if total else 0.0
+    if key is not None:
+        key = np.asarray(key)
+        num_strata = max(int(key.max()) + 1, 0) if len(key) else 0
+        if strata is not None:
+            num_strata = max(num_strata, len(strata))
+        missing = bool((key < 0).any())
+        if missing:
+            key = np.where(key < 0, num_strata, key)
+        width = num_strata + missing
+        counts = np.stack([np.bincount(key[idx], minlength=width) for idx in splits.values()])
+        columns = None
+        if strata is not None:
+            columns = list(strata[:num_strata]) + (['missing'] if missing else [])
+        elif missing:
+            columns = list(range(num_strata)) + ['missing']
+        summary = summary.join(pd.DataFrame(counts, index=list(splits), columns=columns))
+    return summary
+
+
+def _largest_remainder(total: int, weights: np.ndarray, at_least_one: bool = False) -> np.ndarray:
+    """
+    Distribui ``total`` itens entre grupos proporcionalmente aos pesos
+
+    Args:
+        total: Número de itens
+        weights: Peso de cada grupo (negativos contam como zero)
+        at_least_one: Garante ao menos um item por grupo quando possível
+
+    Returns:
+        Array int64 com a contagem de cada grupo (soma igual a total)
+    """
+    weights = np.clip(np.asarray(weights, dtype=float), 0, None)
+    if weights.sum() <= 0:
+        weights = np.ones_like(weights)
+    quotas = total * weights / weights.sum()
+    counts = np.floor(quotas).astype(np.int64)
+    # Sobras vão para os maiores restos (empate: maior peso)
+    leftover = total - counts.sum()
+    if leftover:
+        order = np.lexsort((-weights, -(quotas - counts)))
+        counts[order[:leftover]] += 1
+
+    if at_least_one and total >= len(counts):
+        for group in np.flatnonzero(counts == 0):
+            counts[np.argmax(counts)] -= 1
+            counts[group] += 1
+    return counts
+
+
+def iterative_stratification(
+    labels: np.ndarray,
+    proportions: Sequence[float],
+    random_state: int = 42
+) -> np.ndarray:
+    """
+    Estratificação iterativa multirrótulo (Sechidis et al., 2011) vetorizada
+
+    Os rótulos são processados do mais raro para o mais comum; os exemplos
+    ainda livres de cada rótulo são distribuídos de uma vez entre as partes
+    conforme a demanda restante daquele rótulo, e a demanda de todos os
+    rótulos é atualizada com uma soma matricial. Cada linha é atribuída uma
+    única vez, então o custo é O(n · rótulos). Rótulos com ao menos um
+    exemplo por parte aparecem em todas as partes.
+
+    Args:
+        labels: Matriz binária (n x rótulos)
+        proportions: Proporção de cada parte (ex.: [0.7, 0.1, 0.2])
+        random_state: Seed para reprodutibilidade
+
+    Returns:
+        Array int64 com o número da parte de cada linha
+    """
+    Y = np.asarray(labels).astype(bool)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    n, num_labels = Y.shape
+    proportions = np.asarray(proportions, dtype=float)
+    proportions = proportions / proportions.sum()
+    num_parts = len(proportions)
+
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(n)
+    unassigned = np.ones(n, dtype=bool)
+    parts = np.full(n, -1, dtype=np.int64)
+
+    remaining = Y.sum(axis=0).astype(np.int64)
+    desired = np.outer(remaining, proportions)
+    desired_size = proportions * n
+
+    while (remaining > 0).any():
+        candidates = np.flatnonzero(remaining > 0)
+        label = candidates[np.argmin(remaining[candidates])]
+        rows = order[unassigned[order] & Y[order, label]]
+
+        # Demanda do rótulo; empates desfeitos pelo tamanho restante da parte
+        weights = np.clip(desired[label], 0, None) + 1e-9 * np.clip(desired_size, 0, None)
+        counts = _largest_remainder(len(rows), weights, at_least_one=True)
+        row_parts = np.repeat(np.arange(num_parts), counts)
+
+        parts[rows] = row_parts
+        unassigned[rows] = False
+        assigned = Y[rows]
+        for part in range(num_parts):
+            desired[:, part] -= assigned[row_parts == part].sum(axis=0)
+        desired_size -= counts
+        remaining -= assigned.sum(axis=0)
+
+    # Linhas sem rótulo completam os tamanhos desejados
+    rest = order[unassigned[order]]
+    parts[rest] = np.repeat(np.arange(num_parts), _largest_remainder(len(rest), desired_size))
+    return parts
+
+
+def _grouped_stratification(
+    targets: np.ndarray,
+    proportions: Sequence[float],
+    random_state: int,
+    groups: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """iterative_stratification sobre grupos (rótulos unidos por OR), expandida às linhas"""
+    if groups is None:
+        return iterative_stratification(targets, proportions, random_state)
+    _, row_group = np.unique(np.asarray(groups), return_inverse=True)
+    group_targets = np.zeros((row_group.max() + 1, targets.shape[1]), dtype=bool)
+    np.logical_or.at(group_targets, row_group, targets)
+    return iterative_stratification(group_targets, proportions, random_state)[row_group]
+
+
+def _multilabel_targets(
+    df: pd.DataFrame,
+    label_cols: Sequence[str],
+    stratify_by: Optional[str] = None
+) -> np.ndarray:
+    """Matriz de rótulos, opcionalmente com a década/coluna em one-hot"""
+    present = [col for col in label_cols if col in df.columns]
+    if len(present) < len(label_cols):
+        missing = sorted(set(label_cols) - set(present))
+        warnings.warn(f"Colunas de rótulo não encontradas: {missing}")
+    targets = df[present].fillna(0).to_numpy(dtype=bool)
+
+    key = stratification_key(df, stratify_by) if stratify_by else None
+    if key is not None:
+        one_hot = np.zeros((len(key), int(key.max()) + 1), dtype=bool)
+        valid = key >= 0
+        one_hot[np.flatnonzero(valid), key[valid]] = True
+        targets = np.hstack([targets, one_hot])
+    return targets
+
+
+def create_multilabel_split_indices(
+    df: pd.DataFrame,
+    label_cols: Sequence[str],
+    test_size: float = 0.2,
+    val_size: float = 0.1,
+    stratify_by: Optional[str] = None,
+    random_state: int = 42,
+    groups: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Divisão treino/validação/teste estratificada pelos rótulos sensíveis
+
+    Com ``groups``, a estratificação é feita sobre grupos (rótulos unidos por
+    OR) e cada grupo inteiro vai para uma única divisão.
+
+    Args:
+        df: DataFrame com colunas binárias de rótulos
+        label_cols: Colunas de rótulos (ex.: config['labels'])
+        test_size: Proporção para teste
+        val_size: Proporção para validação
+        stratify_by: Coluna estratificada em conjunto com os rótulos (ex.: 'decade')
+        random_state: Seed para reprodutibilidade
+        groups: Rótulo de grupo por linha; linhas do mesmo grupo ficam juntas
+
+    Returns:
+        Dict com arrays de posições ordenadas para 'train', 'val' e 'test'
+    """
+    targets = _multilabel_targets(df, label_cols, stratify_by)
+    proportions = [1 - test_size - val_size, val_size, test_size]
+    return _parts_to_indices(_grouped_stratification(targets, proportions, random_state, groups))
+
+
+def multilabel_kfold(
+    df: pd.DataFrame,
+    label_cols: Sequence[str],
+    n_splits: int = 5,
+    stratify_by: Optional[str] = None,
+    random_state: int = 42,
+    groups: Optional[np.ndarray] = None
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    K-fold multirrótulo que gera os índices sob demanda
+
+    A atribuição de folds é calculada uma vez (O(n · rótulos)); os arrays de
+    cada fold só são criados quando o fold é consumido.
+
+    Args:
+        df: DataFrame com colunas binárias de rótulos
+        label_cols: Colunas de rótulos
+        n_splits: Número de folds
+        stratify_by: Coluna estratificada em conjunto com os rótulos
+        random_state: Seed para reprodutibilidade
+        groups: Rótulo de grupo por linha; linhas do mesmo grupo ficam no mesmo fold
+
+    Yields:
+        Tuple com (posições de treino, posições de validação)
+    """
+    if n_splits < 2:
+        raise ValueError(f"n_splits deve ser >= 2, recebido {n_splits}")
+    targets = _multilabel_targets(df, label_cols, stratify_by)
+    folds = _grouped_stratification(targets, np.full(n_splits, 1 / n_splits), random_state, groups)
+    for fold in range(n_splits):
+        in_fold = folds == fold
+        yield np.flatnonzero(~in_fold), np.flatnonzero(in_fold)
+
+
+def create_stratified_split(
+    df: pd.DataFrame,
+    test_size: float = 0.2,
+    val_size: float = 0.1,
+    stratify_by: str = 'decade',
+    random_state: int = 42
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Cria divisão estratificada dos dados musicais
+
+    Conveniência sobre create_split_indices que materializa os DataFrames.
+
+    Args:
+        df: DataFrame com dados musicais
+        test_size: Proporção para teste (0.2 = 20%)
+        val_size: Proporção para validação (0.1 = 10%)
+        stratify_by: Coluna para estratificação ('decade', 'year', 'genre')
+        random_state: Seed para reprodutibilidade
+
+    Returns:
+        Tuple com (train_df, val_df, test_df)
+    """
+    key, strata = _stratification_codes(df, stratify_by)
+    splits = create_split_indices(df, test_size, val_size, random_state=random_state, key=key)
+    summary = summarize_split(splits, key, strata)
+
     print(f"✅ Divisão dos dados criada:")
-    print(f"   📚 Treino: {len(train_df)} músicas ({len(train_df)/len(df)*100:.1f}%)")
-    print(f"   🔍 Validação: {len(val_df)} músicas ({len(val_df)/len(df)*100:.1f}%)")
-    print(f"   🧪 Teste: {len(test_df)} músicas ({len(test_df)/len(df)*100:.1f}%)")
-    
-    if stratify_by in df.columns:
+    for label, name in [("📚 Treino", 'train'), ("🔍 Validação", 'val'), ("🧪 Teste", 'test')]:
+        print(f"   {label}: {summary.loc[name, 'count']} músicas ({summary.loc[name, 'fraction']*100:.1f}%)")
+
+    if key is not None:
         print(f"\n📊 Distribuição por {stratify_by}:")
-        for name, data in [("Treino", train_df), ("Validação", val_df), ("Teste", test_df)]:
-            dist = data[stratify_by].value_counts().sort_index()
-            print(f"   {name}: {dict(dist)}")
-    
-    return train_df, val_df, test_df
+        for label, name in [("Treino", 'train'), ("Validação", 'val'), ("Teste", 'test')]:
+            counts = summary.loc[name].drop(['count', 'fraction']).astype(int)
+            print(f"   {label}: {counts[counts > 0].to_dict()}")
+
+    return tuple(take_split(df, splits[name]) for name in SPLIT_NAMES)
+
+
+def _mix64(keys: np.ndarray, seed: int) -> np.ndarray:
+    """Mistura splitmix64 de chaves uint64 com a seed (vetorizada)"""
+    with np.errstate(over='ignore'):
+        z = keys.astype(np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def hash_split_assignment(
+    keys: np.ndarray,
+    proportions: Sequence[float] = (0.7, 0.1, 0.2),
+    random_state: int = 42
+) -> np.ndarray:
+    """
+    Atribui cada música a uma divisão apenas pelo hash da sua chave
+
+    A atribuição não depende da ordem das linhas nem das outras músicas.
+
+    Args:
+        keys: Chaves uint64 (ver song_split_keys)
+        proportions: Proporção de cada divisão (train, val, test)
+        random_state: Seed misturada ao hash
+
+    Returns:
+        Array int8 com o número da divisão de cada chave
+    """
+    proportions = np.asarray(proportions, dtype=float)
+    bounds = np.cumsum(proportions / proportions.sum())[:-1]
+    # 53 bits de mantissa: uniforme em [0, 1)
+    uniform = (_mix64(keys, random_state) >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+    return np.searchsorted(bounds, uniform, side='right').astype(np.int8)
+
+
+def song_split_keys(df: pd.DataFrame, key_columns: Sequence[str] = SONG_IDENTITY_COLUMNS) -> np.ndarray:
+    """
+    Chave estável da identidade de cada música
+
+    Por padrão usa (title, artist): a mesma música em anos diferentes do
+    Billboard cai sempre na mesma divisão.
+
+    Args:
+        df: DataFrame com dados musicais
+        key_columns: Colunas que identificam a música
+
+    Returns:
+        Array uint64 com uma chave por linha
+    """
+    missing = [col for col in key_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas de identidade ausentes: {missing}")
+    return stable_row_hashes(df, key_columns)
+
+
+class SplitManifest:
+    """
+    Registro persistente de qual divisão contém cada música
+
+    Músicas já registradas nunca mudam de divisão; músicas novas são
+    atribuídas ao serem vistas pela primeira vez, o que mantém válidos os
+    caches de features e permite retreinos incrementais. O arquivo .npz
+    guarda as chaves (uint64), as divisões (int8) e os metadados em JSON.
+    """
+
+    def __init__(
+        self,
+        keys: Optional[np.ndarray] = None,
+        splits: Optional[np.ndarray] = None,
+        proportions: Sequence[float] = (0.7, 0.1, 0.2),
+        random_state: int = 42,
+        key_columns: Sequence[str] = SONG_IDENTITY_COLUMNS
+    ):
+        self.keys = np.empty(0, dtype=np.uint64) if keys is None else np.asarray(keys, dtype=np.uint64)
+        self.splits = np.empty(0, dtype=np.int8) if splits is None else np.asarray(splits, dtype=np.int8)
+        self.proportions = [float(p) for p in proportions]
+        self.random_state = int(random_state)
+        self.key_columns = list(key_columns)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def assign(
+        self,
+        df: pd.DataFrame,
+        stratify_by: Optional[str] = None,
+        groups: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Retorna a divisão de cada linha, registrando músicas novas
+
+        Sem estratificação, músicas novas são atribuídas pelo hash. Com
+        ``stratify_by``, as novas músicas de cada estrato completam as
+        divisões que estão abaixo da proporção desejada naquele estrato
+        (em ordem de hash), sem mover as já registradas. Com ``groups``, uma
+        música nova herda a divisão de um membro já registrado do seu grupo
+        (ou do primeiro membro novo), mantendo quase-duplicatas juntas.
+
+        Args:
+            df: DataFrame com as colunas de key_columns
+            stratify_by: Coluna para estratificação (ex.: 'decade')
+            groups: Rótulo de grupo por linha (ex.: near_duplicate_clusters)
+
+        Returns:
+            Array int8 com o número da divisão de cada linha
+        """
+        keys = song_split_keys(df, self.key_columns)
+        position = pd.Index(self.keys).get_indexer(keys)
+        row_splits = np.full(len(df), -1, dtype=np.int8)
+        known = position >= 0
+        row_splits[known] = self.splits[position[known]]
+
+        # Cada música nova (chave única) é atribuída uma vez
+        new_keys, first_row = np.unique(keys[~known], return_index=True)
+        if len(new_keys):
+            first_row = np.flatnonzero(~known)[first_row]
+            key = stratification_key(df, stratify_by) if stratify_by else None
+            if key is None:
+                new_splits = hash_split_assignment(new_keys, self.proportions, self.random_state)
+            else:
+                new_splits = self._fill_strata(new_keys, key[first_row], key, row_splits)
+            if groups is not None:
+                new_splits = self._inherit_group_splits(new_keys, new_splits, keys, known, row_splits, groups)
 
+            self.keys = np.concatenate([self.keys, new_keys])
+            self.splits = np.concatenate([self.splits, new_splits])
+            row_splits[~known] = new_splits[np.searchsorted(new_keys, keys[~known])]
+        return row_splits
 
-def balance_dataset(df: pd.DataFrame, target_cols: list, method: str = 'undersample') -> pd.DataFrame:
+    def _fill_strata(
+        self,
+        new_keys: np.ndarray,
+        new_strata: np.ndarray,
+        key: np.ndarray,
+        row_splits: np.ndarray
+    ) -> np.ndarray:
+        """Distribui músicas novas pelos déficits de cada estrato"""
+        proportions = np.asarray(self.proportions) / sum(self.proportions)
+        new_splits = np.empty(len(new_keys), dtype=np.int8)
+        order_value = _mix64(new_keys, self.random_state)
+
+        for stratum in np.unique(new_strata):
+            members = np.flatnonzero(new_strata == stratum)
+            members = members[np.argsort(order_value[members], kind='stable')]
+            existing = row_splits[(key == stratum) & (row_splits >= 0)]
+            current = np.bincount(existing, minlength=len(proportions))
+            target = (len(existing) + len(members)) * proportions
+            counts = _largest_remainder(len(members), np.clip(target - current, 0, None))
+            new_splits[members] = np.repeat(np.arange(len(proportions)), counts)
+        return new_splits
+
+    @staticmethod
+    def _inherit_group_splits(
+        new_keys: np.ndarray,
+        new_splits: np.ndarray,
+        keys: np.ndarray,
+        known: np.ndarray,
+        row_splits: np.ndarray,
+        groups: np.ndarray
+    ) -> np.ndarray:
+        """Alinha a divisão das músicas novas com a do seu grupo"""
+        row_group, _ = pd.factorize(np.asarray(groups))
+        new_rows = np.flatnonzero(~known)
+        new_row_splits = new_splits[np.searchsorted(new_keys, keys[new_rows])]
+
+        group_split = np.full(row_group.max() + 1, -1, dtype=np.int8)
+        # Primeiro membro novo define o grupo; membros já registrados têm prioridade
+        group_split[row_group[new_rows][::-1]] = new_row_splits[::-1]
+        group_split[row_group[known]] = row_splits[known]
+
+        aligned = new_splits.copy()
+        aligned[np.searchsorted(new_keys, keys[new_rows])] = group_split[row_group[new_rows]]
+        return aligned
+
+    def split_indices(
+        self,
+        df: pd.DataFrame,
+        stratify_by: Optional[str] = None,
+        groups: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Posições de cada divisão (mesmo formato de create_split_indices)
+
+        Args:
+            df: DataFrame com dados musicais
+            stratify_by: Coluna para estratificação das músicas novas
+            groups: Rótulo de grupo por linha
+
+        Returns:
+            Dict com arrays de posições para 'train', 'val' e 'test'
+        """
+        return _parts_to_indices(self.assign(df, stratify_by, groups))
+
+    def save(self, path: str) -> Path:
+        """Salva o manifesto em .npz (escrita atômica)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'proportions': self.proportions,
+            'random_state': self.random_state,
+            'key_columns': self.key_columns,
+            'split_names': list(SPLIT_NAMES),
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=self.keys, splits=self.splits, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SplitManifest":
+        """Carrega um manifesto salvo por save"""
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(
+                data['keys'],
+                data['splits'],
+                proportions=meta['proportions'],
+                random_state=meta['random_state'],
+                key_columns=meta['key_columns']
+            )
+
+
+def _label_matrix(df: pd.DataFrame, target_cols: Sequence[str]) -> np.ndarray:
+    """Matriz booleana (n x rótulos) com as colunas presentes no DataFrame"""
+    present = [col for col in target_cols if col in df.columns]
+    return df[present].fillna(0).to_numpy(dtype=bool)
+
+
+def compute_sample_weights(df: pd.DataFrame, target_cols: Sequence[str]) -> np.ndarray:
+    """
+    Calcula pesos por linha que equilibram as classes de cada rótulo
+
+    Para cada rótulo, a classe positiva pesa n / (2 · positivos) e a
+    negativa n / (2 · negativos); cada linha recebe o maior peso entre seus
+    rótulos, de modo que exemplos de rótulos raros dominam. Os pesos são
+    normalizados para média 1.
+
+    Args:
+        df: DataFrame com colunas binárias de rótulos
+        target_cols: Lista de colunas de rótulos
+
+    Returns:
+        Array float64 com um peso por linha
+    """
+    Y = _label_matrix(df, target_cols)
+    n = len(Y)
+    if n == 0 or Y.shape[1] == 0:
+        return np.ones(n)
+
+    positives = Y.sum(axis=0)
+    negatives = n - positives
+    with np.errstate(divide='ignore'):
+        pos_weight = np.where(positives > 0, n / (2 * positives), 0.0)
+        neg_weight = np.where(negatives > 0, n / (2 * negatives), 0.0)
+
+    weights = np.where(Y, pos_weight, neg_weight).max(axis=1)
+    return weights / weights.mean()
+
+
+def make_weighted_sampler(
+    weights: np.ndarray,
+    num_samples: Optional[int] = None,
+    replacement: bool = True,
+    random_state: int = 42
+):
+    """
+    Cria um WeightedRandomSampler do PyTorch a partir dos pesos por linha
+
+    Substitui o oversampling: o trainer sorteia linhas com reposição em vez
+    de duplicá-las na memória.
+
+    Args:
+        weights: Pesos de compute_sample_weights
+        num_samples: Amostras por época (padrão: número de linhas)
+        replacement: Sorteio com reposição
+        random_state: Seed do gerador
+
+    Returns:
+        torch.utils.data.WeightedRandomSampler
+    """
+    import torch
+    from torch.utils.data import WeightedRandomSampler
+
+    generator = torch.Generator().manual_seed(random_state)
+    return WeightedRandomSampler(
+        torch.as_tensor(weights, dtype=torch.double),
+        num_samples=len(weights) if num_samples is None else num_samples,
+        replacement=replacement,
+        generator=generator
+    )
+
+
+def resample_indices(
+    df: pd.DataFrame,
+    target_cols: Sequence[str],
+    method: str = 'undersample',
+    random_state: int = 42
+) -> np.ndarray:
+    """
+    Calcula as posições do dataset balanceado sem copiar linhas
+
+    - undersample: para cada rótulo, sorteia ``min_count`` positivos e
+      ``min_count`` negativos (min_count = menor número de positivos entre os
+      rótulos presentes) e devolve a união
+    - oversample: repete cada linha da classe minoritária de cada rótulo
+      ``maioria // minoria`` vezes, além da cópia original
+
+    Args:
+        df: DataFrame com colunas binárias de rótulos
+        target_cols: Lista de colunas de rótulos
+        method: 'undersample' ou 'oversample'
+        random_state: Seed para reprodutibilidade
+
+    Returns:
+        Array int64 de posições (ordenado)
+    """
+    Y = _label_matrix(df, target_cols)
+    n = len(Y)
+    positives = Y.sum(axis=0)
+
+    if method == 'undersample':
+        present = positives > 0
+        if not present.any():
+            return np.arange(n)
+        Y = Y[:, present]
+        min_count = int(positives[present].min())
+
+        # Prioridade aleatória por (linha, rótulo); as min_count menores de cada classe vencem
+        priority = np.random.default_rng(random_state).random(Y.shape)
+        selected = np.zeros(n, dtype=bool)
+        for cls_mask in (Y, ~Y):
+            masked = np.where(cls_mask, priority, np.inf)
+            threshold = np.partition(masked, min_count - 1, axis=0)[min_count - 1]
+            selected |= (cls_mask & (masked <= threshold)).any(axis=1)
+        return np.flatnonzero(selected)
+
+    if method == 'oversample':
+        negatives = n - positives
+        minority_is_positive = positives < negatives
+        minority = np.where(minority_is_positive, positives, negatives)
+        majority = np.where(minority_is_positive, negatives, positives)
+        multiplier = np.where((minority > 0) & (minority != majority), majority // np.maximum(minority, 1), 0)
+        in_minority = Y == minority_is_positive
+        repeats = 1 + (in_minority * multiplier).sum(axis=1)
+        return np.repeat(np.arange(n), repeats)
+
+    raise ValueError(f"Método desconhecido: {method}. Use 'undersample' ou 'oversample'.")
+
+
+def balance_dataset(
+    df: pd.DataFrame,
+    target_cols: list,
+    method: str = 'undersample',
+    random_state: int = 42
+) -> pd.DataFrame:
     """
     Balanceia dataset para classificação de múltiplos rótulos
-    
+
+    Para treino, prefira ``compute_sample_weights`` + ``make_weighted_sampler``,
+    que não duplicam linhas.
+
     Args:
         df: DataFrame com dados
         target_cols: Lista de colunas de rótulos
         method: 'undersample' ou 'oversample'
-        
+        random_state: Seed para reprodutibilidade
+
     Returns:
         DataFrame balanceado
     """
-    
-    if method == 'undersample':
-        # Encontra classe minoritária
-        min_count = float('inf')
-        for col in target_cols:
-            if col in df.columns:
-                positive_count = df[col].sum()
-                min_count = min(min_count, positive_count)
-        
-        # Subamostra cada classe
-        balanced_dfs = []
-        for col in target_cols:
-            if col in df.columns:
-                positive_samples = df[df[col] == 1].sample(min_count)
-                negative_samples = df[df[col] == 0].sample(min_count)
-                balanced_dfs.extend([positive_samples, negative_samples])
-        
-        # Combina e remove duplicatas
-        balanced_df = pd.concat(balanced_dfs).drop_duplicates()
-        
-    else:  # oversample
-        # Implementação simples de oversampling
-        # Para implementação mais sofisticada, usar SMOTE
-        balanced_df = df.copy()
-        
-        for col in target_cols:
-            if col in df.columns:
-                positive_samples = df[df[col] == 1]
-                negative_samples = df[df[col] == 0]
-                
-                # Duplica classe minoritária
-                if len(positive_samples) < len(negative_samples):
-                    multiplier = len(negative_samples) // len(positive_samples)
-                    balanced_df = pd.concat([balanced_df] + [positive_samples] * multiplier)
-                elif len(negative_samples) < len(positive_samples):
-                    multiplier = len(positive_samples) // len(negative_samples)
-                    balanced_df = pd.concat([balanced_df] + [negative_samples] * multiplier)
-    
-    return balanced_df.reset_index(drop=True)
\ No newline at end of file
+    indices = resample_indices(df, target_cols, method, random_state)
+    return df.iloc[indices].reset_index(drop=True)
@@ -5,4 +5,549 @@ Handles creation and management of word embeddings for music lyrics:
 - Word2Vec, GloVe, FastText
 - Custom music domain embeddings
 - Document-level embeddings
-"""
\ No newline at end of file
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import torch
+from torch import nn
+
+from ..data.preprocessor import DOC_SEPARATOR, LyricsPreprocessor, Vocabulary
+from ..utils.helpers import stable_row_hashes
+
+try:
+    from transformers import AutoModel, AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+
+DTYPES = {'float32': np.float32, 'float16': np.float16}
+
+# Word tokens (as in TOKEN_PATTERN, without punctuation) plus song boundaries
+WORD_OR_SEPARATOR = re.compile(r"[\w']+|" + re.escape(DOC_SEPARATOR))
+
+# FNV-1a (32-bit), as used by fastText to hash character n-grams
+FNV_OFFSET = 2166136261
+FNV_PRIME = 16777619
+
+
+def subword_buckets(word: str, min_n: int = 3, max_n: int = 6, buckets: int = 2 ** 15) -> List[int]:
+    """
+    fastText-style hashed character n-grams of ``<word>``
+
+    Args:
+        word: Token
+        min_n: Shortest n-gram
+        max_n: Longest n-gram
+        buckets: Number of hash buckets
+
+    Returns:
+        Bucket id of every n-gram
+    """
+    data = f"<{word}>".encode("utf-8")
+    ids = []
+    for n in range(min_n, max_n + 1):
+        for start in range(0, len(data) - n + 1):
+            h = FNV_OFFSET
+            for byte in data[start:start + n]:
+                h = ((h ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+            ids.append(h % buckets)
+    return ids
+
+
+def iter_text_vectors(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Stream ``word v1 v2 ...`` lines from a GloVe / word2vec / fastText .vec file
+
+    A word2vec-style ``<count> <dim>`` header line is skipped. Vector values
+    are returned unparsed so callers only parse the words they keep.
+
+    Args:
+        path: Text vectors file
+
+    Yields:
+        Tuple of (word, space-separated values)
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        first = f.readline().rstrip("\n")
+        parts = first.split(" ")
+        if not (len(parts) == 2 and all(part.isdigit() for part in parts)):
+            word, _, values = first.partition(" ")
+            yield word, values
+        for line in f:
+            word, _, values = line.rstrip("\n").partition(" ")
+            yield word, values
+
+
+class EmbeddingStore:
+    """
+    Pretrained word vectors aligned to the project vocabulary, memory-mapped
+
+    ``convert`` parses a text vectors file once and writes, in ``path``:
+
+        vectors.<dtype>   raw matrix (len(vocab) x dim); row i = vocab id i
+        subwords.<dtype>  raw matrix (buckets x dim) of hashed character n-grams
+        vocab.txt         the vocabulary the rows are aligned to
+        meta.json         dim, dtype, counts and n-gram settings
+
+    ``open`` only maps the files, so loading takes milliseconds. Vocabulary
+    words missing from the pretrained file get the mean of their n-gram
+    bucket vectors (fastText-style), which are estimated from the words
+    that were found.
+    """
+
+    VECTORS_FILE = "vectors.{dtype}"
+    SUBWORDS_FILE = "subwords.{dtype}"
+    VOCAB_FILE = "vocab.txt"
+    META_FILE = "meta.json"
+
+    def __init__(
+        self,
+        path: Path,
+        vectors: np.memmap,
+        subwords: np.memmap,
+        vocabulary: Vocabulary,
+        meta: Dict[str, Any]
+    ):
+        self.path = Path(path)
+        self.vectors = vectors
+        self.subwords = subwords
+        self.vocabulary = vocabulary
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    @classmethod
+    def convert(
+        cls,
+        source_path: str,
+        vocabulary: Vocabulary,
+        output_dir: str,
+        dtype: str = 'float32',
+        buckets: int = 2 ** 15,
+        min_n: int = 3,
+        max_n: int = 6,
+        seed: int = 42
+    ) -> "EmbeddingStore":
+        """
+        Convert a pretrained text vectors file into an aligned memory-mapped store
+
+        Args:
+            source_path: GloVe / word2vec / fastText .vec text file
+            vocabulary: Project vocabulary (row order of the output)
+            output_dir: Store directory
+            dtype: 'float32' or 'float16'
+            buckets: Hash buckets for character n-grams
+            min_n: Shortest character n-gram
+            max_n: Longest character n-gram
+            seed: Seed for rows with no usable n-grams
+
+        Returns:
+            EmbeddingStore opened read-only
+        """
+        logger = logging.getLogger(__name__)
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}', expected one of {list(DTYPES)}")
+
+        stoi = vocabulary.stoi
+        vectors = None
+        found = np.zeros(len(vocabulary), dtype=bool)
+        for word, values in iter_text_vectors(source_path):
+            row = stoi.get(word)
+            if row is None or row < 2 or found[row]:
+                continue
+            vector = np.array(values.split(), dtype=np.float32)
+            if vectors is None:
+                vectors = np.zeros((len(vocabulary), len(vector)), dtype=np.float32)
+            if len(vector) != vectors.shape[1]:
+                continue
+            vectors[row] = vector
+            found[row] = True
+        if vectors is None:
+            raise ValueError(f"No vocabulary word found in {source_path}")
+
+        # Subword table: each bucket averages the found words containing its n-grams
+        subwords = np.zeros((buckets, vectors.shape[1]), dtype=np.float32)
+        bucket_counts = np.zeros(buckets, dtype=np.int64)
+        found_rows = np.flatnonzero(found)
+        ngram_ids = [subword_buckets(vocabulary.itos[row], min_n, max_n, buckets) for row in found_rows]
+        owners = np.repeat(found_rows, [len(ids) for ids in ngram_ids])
+        flat_ids = np.fromiter((i for ids in ngram_ids for i in ids), dtype=np.int64, count=len(owners))
+        np.add.at(subwords, flat_ids, vectors[owners])
+        np.add.at(bucket_counts, flat_ids, 1)
+        subwords[bucket_counts > 0] /= bucket_counts[bucket_counts > 0, None]
+
+        # Fill OOV rows from their n-grams; fall back to small random vectors
+        rng = np.random.default_rng(seed)
+        scale = vectors[found_rows].std() if len(found_rows) else 0.1
+        oov_rows = np.flatnonzero(~found)
+        oov_rows = oov_rows[oov_rows >= 2]
+        filled = 0
+        for row in oov_rows:
+            ids = [i for i in subword_buckets(vocabulary.itos[row], min_n, max_n, buckets) if bucket_counts[i]]
+            if ids:
+                vectors[row] = subwords[ids].mean(axis=0)
+                filled += 1
+            else:
+                vectors[row] = rng.normal(0, scale, vectors.shape[1])
+        vectors[vocabulary.pad_id] = 0
+        vectors[vocabulary.unk_id] = vectors[found_rows].mean(axis=0) if len(found_rows) else 0
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        np_dtype = DTYPES[dtype]
+        vectors.astype(np_dtype).tofile(output_dir / cls.VECTORS_FILE.format(dtype=dtype))
+        subwords.astype(np_dtype).tofile(output_dir / cls.SUBWORDS_FILE.format(dtype=dtype))
+        vocabulary.save(output_dir / cls.VOCAB_FILE)
+        meta = {
+            "dim": int(vectors.shape[1]),
+            "dtype": dtype,
+            "num_words": len(vocabulary),
+            "found": int(found.sum()),
+            "oov_subword_filled": filled,
+            "buckets": buckets,
+            "min_n": min_n,
+            "max_n": max_n,
+            "source": str(source_path),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(output_dir / cls.META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        logger.info(
+            f"Embeddings converted: {meta['found']}/{len(vocabulary)} found, "
+            f"{filled} OOV filled from subwords -> {output_dir}"
+        )
+        return cls.open(output_dir)
+
+    @classmethod
+    def open(cls, path: str) -> "EmbeddingStore":
+        """
+        Map an existing store read-only
+
+        Args:
+            path: Store directory
+
+        Returns:
+            EmbeddingStore
+        """
+        path = Path(path)
+        with open(path / cls.META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        dtype = meta["dtype"]
+        vectors = np.memmap(
+            path / cls.VECTORS_FILE.format(dtype=dtype), dtype=DTYPES[dtype], mode="r",
+            shape=(meta["num_words"], meta["dim"])
+        )
+        subwords = np.memmap(
+            path / cls.SUBWORDS_FILE.format(dtype=dtype), dtype=DTYPES[dtype], mode="r",
+            shape=(meta["buckets"], meta["dim"])
+        )
+        return cls(path, vectors, subwords, Vocabulary.load(path / cls.VOCAB_FILE), meta)
+
+    def vector(self, word: str) -> np.ndarray:
+        """
+        Vector of any word: its row if in the vocabulary, else its n-gram average
+
+        Args:
+            word: Token
+
+        Returns:
+            float32 vector
+        """
+        row = self.vocabulary.stoi.get(word)
+        if row is not None:
+            return np.asarray(self.vectors[row], dtype=np.float32)
+        ids = subword_buckets(word, self.meta["min_n"], self.meta["max_n"], self.meta["buckets"])
+        return np.asarray(self.subwords[ids], dtype=np.float32).mean(axis=0)
+
+    def embedding_weight(self) -> torch.Tensor:
+        """float32 weight matrix for nn.Embedding (rows follow vocabulary ids)"""
+        return torch.from_numpy(np.asarray(self.vectors, dtype=np.float32))
+
+    def to_embedding(self, freeze: bool = False) -> nn.Embedding:
+        """
+        Build an nn.Embedding initialized with the stored vectors
+
+        Args:
+            freeze: Keep the vectors fixed during training
+
+        Returns:
+            nn.Embedding with padding_idx = vocabulary.pad_id
+        """
+        return nn.Embedding.from_pretrained(
+            self.embedding_weight(), freeze=freeze, padding_idx=self.vocabulary.pad_id
+        )
+
+
+class VectorCache:
+    """
+    Append-only memory-mapped store of vectors keyed by uint64 hashes
+
+    Files in ``path``: ``keys.uint64`` and ``vectors.float32`` (raw, one row
+    per key) plus ``meta.json`` with the committed row count, which is
+    rewritten last so an interrupted append is ignored.
+    """
+
+    KEYS_FILE = "keys.uint64"
+    VECTORS_FILE = "vectors.float32"
+    META_FILE = "meta.json"
+
+    def __init__(self, path: str, dim: int):
+        self.path = Path(path)
+        self.dim = dim
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._index: Optional[pd.Index] = None
+        meta_path = self.path / self.META_FILE
+        if meta_path.exists():
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["dim"] != dim:
+                raise ValueError(f"Cache at {self.path} has dim {meta['dim']}, expected {dim}")
+            self.num_rows = meta["num_rows"]
+        else:
+            self.num_rows = 0
+            self._write_meta()
+        self._map()
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def _map(self) -> None:
+        if self.num_rows:
+            self.keys = np.memmap(self.path / self.KEYS_FILE, dtype=np.uint64, mode="r", shape=(self.num_rows,))
+            self.vectors = np.memmap(
+                self.path / self.VECTORS_FILE, dtype=np.float32, mode="r", shape=(self.num_rows, self.dim)
+            )
+        else:
+            self.keys = np.empty(0, dtype=np.uint64)
+            self.vectors = np.empty((0, self.dim), dtype=np.float32)
+        self._index = None
+
+    def _write_meta(self) -> None:
+        tmp_path = self.path / (self.META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"num_rows": self.num_rows, "dim": self.dim}, f)
+        os.replace(tmp_path, self.path / self.META_FILE)
+
+    def positions(self, keys: np.ndarray) -> np.ndarray:
+        """Row of each key in the cache (-1 if missing)"""
+        if self._index is None:
+            self._index = pd.Index(np.asarray(self.keys))
+        return self._index.get_indexer(keys)
+
+    def append(self, keys: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Append new rows
+
+        Args:
+            keys: uint64 keys not yet in the cache
+            vectors: float32 matrix (len(keys) x dim)
+        """
+        for name, array, row_bytes in [
+            (self.KEYS_FILE, np.ascontiguousarray(keys, dtype=np.uint64), 8),
+            (self.VECTORS_FILE, np.ascontiguousarray(vectors, dtype=np.float32), 4 * self.dim),
+        ]:
+            with open(self.path / name, "ab") as f:
+                f.truncate(self.num_rows * row_bytes)
+                f.write(array.tobytes())
+        self.num_rows += len(keys)
+        self._write_meta()
+        self._map()
+
+
+class DocumentEmbedder:
+    """
+    Song-level embeddings with an on-disk cache keyed by lyric hash
+
+    Backends:
+        mean         mean of EmbeddingStore word vectors, punctuation ignored
+                     (OOV words use their subword vectors); pure NumPy, one
+                     gather per batch
+        transformer  mean-pooled last hidden state of a Hugging Face model;
+                     lyrics longer than ``chunk_tokens`` are split into chunks
+                     whose vectors are averaged, weighted by chunk length
+
+    Songs are embedded in length-sorted batches on a thread pool. With
+    ``cache_dir``, vectors are stored in a VectorCache under a subdirectory
+    named after the embedder settings, so reruns only embed new lyrics.
+    """
+
+    BACKENDS = ('mean', 'transformer')
+
+    def __init__(
+        self,
+        store: Optional[EmbeddingStore] = None,
+        backend: str = 'mean',
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        preprocessor: Optional[LyricsPreprocessor] = None,
+        cache_dir: Optional[str] = None,
+        batch_size: int = 64,
+        chunk_tokens: int = 256,
+        num_threads: Optional[int] = None,
+        normalize: bool = True
+    ):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.BACKENDS}")
+        if backend == 'mean' and store is None:
+            raise ValueError("The mean backend needs an EmbeddingStore")
+        if backend == 'transformer' and not TRANSFORMERS_AVAILABLE:
+            raise ImportError("transformers is required for the transformer backend: pip install transformers")
+
+        self.store = store
+        self.backend = backend
+        self.model_name = model_name
+        self.preprocessor = preprocessor or LyricsPreprocessor()
+        self.batch_size = batch_size
+        self.chunk_tokens = chunk_tokens
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self.normalize = normalize
+        self.logger = logging.getLogger(__name__)
+        self._tokenizer = None
+        self._model = None
+
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = VectorCache(Path(cache_dir) / self.fingerprint, self.dim)
+
+    @property
+    def dim(self) -> int:
+        """Embedding dimension"""
+        if self.backend == 'mean':
+            return self.store.dim
+        return self._load_transformer()[1].config.hidden_size
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of the settings that change the vectors"""
+        if self.backend == 'mean':
+            source = {'store': str(self.store.path.resolve()), 'created_at': self.store.meta.get('created_at')}
+        else:
+            source = {'model': self.model_name, 'chunk_tokens': self.chunk_tokens}
+        settings = dict(source, backend=self.backend, normalize=self.normalize, lowercase=self.preprocessor.lowercase)
+        digest = hashlib.blake2b(json.dumps(settings, sort_keys=True).encode("utf-8"), digest_size=6).hexdigest()
+        return f"{self.backend}_{digest}"
+
+    def _load_transformer(self):
+        if self._model is None:
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self._model = AutoModel.from_pretrained(self.model_name).eval()
+        return self._tokenizer, self._model
+
+    def _mean_batch(self, texts: Sequence[Optional[str]]) -> np.ndarray:
+        """Mean word vector of each song: one lookup and one reduceat per batch"""
+        tokens = WORD_OR_SEPARATOR.findall(self.preprocessor.clean_batch(texts))
+        vocabulary = self.store.vocabulary
+        ids = vocabulary.lookup(tokens)
+
+        is_separator = ids == vocabulary.separator_id
+        doc_of_token = np.cumsum(is_separator)
+        keep = ~is_separator
+        ids, doc_of_token = ids[keep], doc_of_token[keep]
+        vectors = np.asarray(self.store.vectors[np.minimum(ids, len(vocabulary) - 1)], dtype=np.float32)
+
+        # Words outside the vocabulary get their subword vector instead of <unk>
+        unknown = np.flatnonzero(ids == vocabulary.unk_id)
+        if len(unknown):
+            words = np.asarray(tokens, dtype=object)[keep][unknown]
+            oov = {word: self.store.vector(word) for word in set(words)}
+            vectors[unknown] = np.stack([oov[word] for word in words])
+
+        # Tokens are grouped by song, so each song is one contiguous segment
+        counts = np.bincount(doc_of_token, minlength=len(texts))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.zeros((len(texts), self.dim), dtype=np.float32)
+        nonempty = counts > 0
+        if nonempty.any():
+            sums[nonempty] = np.add.reduceat(vectors, starts[nonempty], axis=0)
+        return sums / np.maximum(counts, 1)[:, None]
+
+    def _transformer_batch(self, texts: Sequence[Optional[str]]) -> np.ndarray:
+        """Chunked, mean-pooled transformer vectors for one batch of songs"""
+        tokenizer, model = self._load_transformer()
+        cleaned = [self.preprocessor.clean_text(text) for text in texts]
+        encoded = tokenizer(cleaned, add_special_tokens=False, truncation=False)["input_ids"]
+
+        chunks, owners = [], []
+        for doc, ids in enumerate(encoded):
+            for start in range(0, max(len(ids), 1), self.chunk_tokens):
+                chunks.append(ids[start:start + self.chunk_tokens])
+                owners.append(doc)
+        lengths = np.array([max(len(chunk), 1) for chunk in chunks], dtype=np.float32)
+
+        chunk_vectors = np.zeros((len(chunks), model.config.hidden_size), dtype=np.float32)
+        order = np.argsort(lengths, kind='stable')
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            batch = tokenizer.pad(
+                {"input_ids": [tokenizer.build_inputs_with_special_tokens(chunks[i]) for i in idx]},
+                return_tensors="pt"
+            )
+            with torch.inference_mode():
+                hidden = model(**batch).last_hidden_state
+            mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            chunk_vectors[idx] = ((hidden * mask).sum(1) / mask.sum(1).clamp(min=1)).numpy()
+
+        sums = np.zeros((len(texts), chunk_vectors.shape[1]), dtype=np.float32)
+        np.add.at(sums, np.array(owners), chunk_vectors * lengths[:, None])
+        totals = np.bincount(owners, weights=lengths, minlength=len(texts))
+        return sums / np.maximum(totals, 1)[:, None].astype(np.float32)
+
+    def _compute(self, texts: List[Optional[str]]) -> np.ndarray:
+        """Embed songs in length-sorted batches on the thread pool"""
+        lengths = np.array([len(text) if isinstance(text, str) else 0 for text in texts])
+        order = np.argsort(lengths, kind='stable')
+        batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+        embed_batch = self._mean_batch if self.backend == 'mean' else self._transformer_batch
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            results = executor.map(lambda idx: embed_batch([texts[i] for i in idx]), batches)
+            for idx, batch_vectors in zip(batches, results):
+                vectors[idx] = batch_vectors
+
+        if self.normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.maximum(norms, 1e-12)
+        return vectors
+
+    def embed(self, texts: Sequence[Optional[str]]) -> np.ndarray:
+        """
+        Song vectors, computing only lyrics that are not cached
+
+        Args:
+            texts: Raw lyrics
+
+        Returns:
+            float32 matrix (len(texts) x dim)
+        """
+        texts = list(texts)
+        if self.cache is None:
+            return self._compute(texts)
+
+        keys = stable_row_hashes(pd.DataFrame({'lyrics': texts}), ['lyrics'])
+        position = self.cache.positions(keys)
+        missing = position < 0
+        if missing.any():
+            new_keys, first = np.unique(keys[missing], return_index=True)
+            rows = np.flatnonzero(missing)[first]
+            self.cache.append(new_keys, self._compute([texts[i] for i in rows]))
+            self.logger.info(f"Document embeddings: {len(rows)} computed, {int((~missing).sum())} cached")
+            position = self.cache.positions(keys)
+        return np.asarray(self.cache.vectors[position], dtype=np.float32)
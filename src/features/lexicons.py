@@ -0,0 +1,138 @@
+"""
+Lexicon Matching
+
+Compiles word and phrase lexicons (profanity, gendered terms, sentiment
+words, ...) into a single token-level Aho-Corasick automaton, so every
+lexicon is matched in one left-to-right pass over a lyric regardless of
+how many lexicons or entries there are.
+"""
+
+import yaml
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+# Small built-in lexicons; extend or replace them with load_lexicons()
+DEFAULT_LEXICONS: Dict[str, List[str]] = {
+    'profanity': [
+        "fuck", "fucking", "fucked", "motherfucker", "shit", "bullshit", "bitch", "bitches",
+        "damn", "goddamn", "ass", "asshole", "bastard", "crap", "dick", "pussy", "hoe", "hoes",
+    ],
+    'gendered_female': [
+        "she", "her", "hers", "herself", "girl", "girls", "woman", "women", "lady", "ladies",
+        "baby girl", "mama", "wife", "sister", "daughter", "queen",
+    ],
+    'gendered_male': [
+        "he", "him", "his", "himself", "boy", "boys", "man", "men", "guy", "guys",
+        "daddy", "husband", "brother", "son", "king",
+    ],
+    'positive': [
+        "love", "loved", "loving", "happy", "happiness", "joy", "smile", "smiling", "good",
+        "beautiful", "sweet", "heaven", "dream", "dreams", "free", "shine", "sunshine", "kiss",
+        "dance", "dancing", "hope", "together", "forever", "laugh", "best",
+    ],
+    'negative': [
+        "hate", "hurt", "pain", "cry", "crying", "tears", "sad", "lonely", "alone", "broken",
+        "die", "dead", "death", "kill", "killed", "fear", "afraid", "lost", "sorry", "bad",
+        "cold", "dark", "darkness", "wrong", "goodbye",
+    ],
+    'violence': [
+        "kill", "killed", "killing", "murder", "gun", "guns", "shoot", "shot", "blood",
+        "knife", "fight", "beat", "war", "bullet", "bullets", "pull the trigger",
+    ],
+    'self_harm': [
+        "suicide", "kill myself", "end my life", "want to die", "wanna die", "cut myself",
+        "no reason to live", "end it all",
+    ],
+}
+
+
+def load_lexicons(path: str) -> Dict[str, List[str]]:
+    """
+    Load lexicons from a YAML file mapping lexicon name -> list of entries
+
+    Args:
+        path: YAML file
+
+    Returns:
+        Dict of lexicons
+    """
+    with open(Path(path), "r", encoding="utf-8") as f:
+        lexicons = yaml.safe_load(f) or {}
+    return {name: list(entries) for name, entries in lexicons.items()}
+
+
+class LexiconMatcher:
+    """
+    Token-level Aho-Corasick automaton over several lexicons
+
+    Entries are lowercased and split on whitespace, so multi-word phrases
+    ("kill myself") match as token sequences and single words never match
+    inside longer words ("ass" does not match "class"). Matching is a single
+    pass over the tokens with O(1) work per token plus one step per match.
+    """
+
+    def __init__(self, lexicons: Dict[str, Iterable[str]]):
+        self.names: List[str] = list(lexicons)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        node_outputs: List[set] = [set()]
+        for lexicon_id, name in enumerate(self.names):
+            for entry in lexicons[name]:
+                tokens = entry.lower().split()
+                if not tokens:
+                    continue
+                node = 0
+                for token in tokens:
+                    nxt = self._goto[node].get(token)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[node][token] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        node_outputs.append(set())
+                    node = nxt
+                node_outputs[node].add(lexicon_id)
+
+        # Breadth-first failure links; outputs inherit from their failure node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                node_outputs[child] |= node_outputs[self._fail[child]]
+        self._output = [tuple(sorted(outputs)) for outputs in node_outputs]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def count(self, tokens: Sequence[str]) -> List[int]:
+        """
+        Count matches of every lexicon in a token sequence
+
+        A lexicon is counted at most once per token position, even when
+        several of its entries end there ("kill myself" and "myself").
+
+        Args:
+            tokens: Lowercased word tokens
+
+        Returns:
+            List with one match count per lexicon (in ``names`` order)
+        """
+        counts = [0] * len(self.names)
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for token in tokens:
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for lexicon_id in output[node]:
+                counts[lexicon_id] += 1
+        return counts
@@ -0,0 +1,428 @@
+"""
+Lyric Similarity Search
+
+Approximate nearest-neighbour search over song embeddings with an
+inverted-file (IVF) index in pure NumPy: vectors are bucketed by their
+nearest k-means centroid and a query only scans the ``n_probe`` closest
+buckets. Used to find songs similar to a flagged one while labeling and to
+screen near-duplicates at catalog scale.
+"""
+
+import json
+import logging
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+METRICS = ('cosine', 'ip')
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k largest scores of every row, best first"""
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(part, order, axis=1)
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    n_clusters: int,
+    n_iter: int = 20,
+    random_state: int = 42
+) -> np.ndarray:
+    """
+    k-means on the unit sphere (assignment by largest inner product)
+
+    Args:
+        vectors: float32 matrix (n x dim), n >= n_clusters
+        n_clusters: Number of centroids
+        n_iter: Lloyd iterations
+        random_state: Seed for initialization and empty-cluster reseeding
+
+    Returns:
+        Unit-norm centroids (n_clusters x dim)
+    """
+    rng = np.random.default_rng(random_state)
+    data = _normalize_rows(vectors.astype(np.float32, copy=False))
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignment = np.argmax(data @ centroids.T, axis=1)
+        members = sp.csr_matrix(
+            (np.ones(len(data), dtype=np.float32), (assignment, np.arange(len(data)))),
+            shape=(n_clusters, len(data))
+        )
+        sums = np.asarray(members @ data)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+class _IdLocations:
+    """
+    Map ids to their (list, row) slot with amortized O(log n) inserts
+
+    Ids live in levels of geometrically decreasing size, each with its own
+    hash index; inserting a block adds a level and merges the newest levels
+    while they are comparable in size, so no insert rehashes the catalog.
+    """
+
+    def __init__(self):
+        self._levels: List[Tuple[pd.Index, np.ndarray]] = []
+
+    def add(self, ids: np.ndarray, locations: np.ndarray) -> None:
+        self._levels.append((pd.Index(ids, dtype=np.int64), locations))
+        while len(self._levels) > 1 and len(self._levels[-2][0]) <= 2 * len(self._levels[-1][0]):
+            (older, older_locations), (newer, newer_locations) = self._levels[-2:]
+            self._levels[-2:] = [(older.append(newer), np.concatenate([older_locations, newer_locations]))]
+
+    def locate(self, ids: np.ndarray) -> np.ndarray:
+        """(list, row) of every id as an int64 (n x 2) array; -1 where missing"""
+        locations = np.full((len(ids), 2), -1, dtype=np.int64)
+        pending = np.arange(len(ids))
+        for index, level_locations in self._levels:
+            if not len(pending):
+                break
+            positions = index.get_indexer(ids[pending])
+            found = positions >= 0
+            locations[pending[found]] = level_locations[positions[found]]
+            pending = pending[~found]
+        return locations
+
+
+class IVFIndex:
+    """
+    Inverted-file index for top-k inner-product / cosine search
+
+    Each inverted list keeps its vectors and ids contiguous, so a batch of
+    queries is answered list by list: one matrix product per probed list,
+    covering every query that probes it. ``add`` appends to the lists
+    without retraining; retrain (``train`` + re-add) when the catalog has
+    grown several-fold and lists become unbalanced.
+
+    ``save`` writes plain .npy files plus ``meta.json``; ``load`` maps them
+    read-only, so opening a large index costs no copy.
+    """
+
+    CENTROIDS_FILE = "centroids.npy"
+    VECTORS_FILE = "vectors.npy"
+    IDS_FILE = "ids.npy"
+    OFFSETS_FILE = "offsets.npy"
+    META_FILE = "meta.json"
+
+    def __init__(
+        self,
+        dim: int,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        metric: str = 'cosine',
+        random_state: int = 42
+    ):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}")
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.metric = metric
+        self.random_state = random_state
+        self.logger = logging.getLogger(__name__)
+
+        self.centroids: Optional[np.ndarray] = None
+        self._list_vectors: List[np.ndarray] = []
+        self._list_ids: List[np.ndarray] = []
+        # Growable storage behind each list: _list_vectors/_list_ids are views of it
+        self._buffers: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._id_locations: Optional[_IdLocations] = None
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._list_ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dim {self.dim}, got {vectors.shape[1]}")
+        return _normalize_rows(vectors) if self.metric == 'cosine' else vectors
+
+    def train(self, vectors: np.ndarray, max_train_size: Optional[int] = None) -> "IVFIndex":
+        """
+        Fit the coarse centroids
+
+        Args:
+            vectors: Training vectors (typically the catalog itself)
+            max_train_size: Subsample size (default 256 per list)
+
+        Returns:
+            self
+        """
+        vectors = self._prepare(vectors)
+        if self.n_lists is None:
+            self.n_lists = int(np.clip(4 * np.sqrt(len(vectors)), 1, 65536))
+        self.n_lists = min(self.n_lists, len(vectors))
+
+        max_train_size = max_train_size or 256 * self.n_lists
+        if len(vectors) > max_train_size:
+            rng = np.random.default_rng(self.random_state)
+            vectors = vectors[rng.choice(len(vectors), max_train_size, replace=False)]
+
+        self.centroids = spherical_kmeans(vectors, self.n_lists, random_state=self.random_state)
+        self._list_vectors = [np.empty((0, self.dim), dtype=np.float32) for _ in range(self.n_lists)]
+        self._list_ids = [np.empty(0, dtype=np.int64) for _ in range(self.n_lists)]
+        self._buffers = {}
+        self._id_locations = None
+        self.logger.info(f"Trained IVF index with {self.n_lists} lists on {len(vectors)} vectors")
+        return self
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Insert vectors; trains on this first batch if the index is untrained
+
+        Lists grow geometrically, so many small inserts cost amortized
+        constant time per vector.
+
+        Args:
+            vectors: float matrix (n x dim)
+            ids: Unique int64 ids not yet in the index (default: consecutive,
+                continuing from len(self))
+
+        Returns:
+            The ids of the inserted vectors
+        """
+        vectors = self._prepare(vectors)
+        if ids is None:
+            ids = np.arange(len(self), len(self) + len(vectors), dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("ids must be unique")
+        if not self.is_trained:
+            self.train(vectors)
+        existing = self.contains(ids)
+        if existing.any():
+            raise ValueError(f"Ids already in index: {ids[existing][:10].tolist()}")
+
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        lists, starts = np.unique(assignment[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        locations = np.empty((len(ids), 2), dtype=np.int64)
+        for list_id, start, end in zip(lists, starts, ends):
+            rows = order[start:end]
+            first_row = self._append(list_id, vectors[rows], ids[rows])
+            locations[rows, 0] = list_id
+            locations[rows, 1] = np.arange(first_row, first_row + len(rows))
+        self._locations().add(ids, locations)
+        return ids
+
+    def _append(self, list_id: int, vectors: np.ndarray, ids: np.ndarray) -> int:
+        """Append rows to one list, growing its buffer geometrically; returns the first new row"""
+        size = len(self._list_ids[list_id])
+        needed = size + len(ids)
+        vector_buffer, id_buffer = self._buffers.get(list_id, (None, None))
+        if vector_buffer is None or len(vector_buffer) < needed:
+            capacity = max(needed, 2 * size, 16)
+            vector_buffer = np.empty((capacity, self.dim), dtype=np.float32)
+            id_buffer = np.empty(capacity, dtype=np.int64)
+            vector_buffer[:size] = self._list_vectors[list_id]
+            id_buffer[:size] = self._list_ids[list_id]
+            self._buffers[list_id] = (vector_buffer, id_buffer)
+        vector_buffer[size:needed] = vectors
+        id_buffer[size:needed] = ids
+        self._list_vectors[list_id] = vector_buffer[:needed]
+        self._list_ids[list_id] = id_buffer[:needed]
+        return size
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        n_probe: Optional[int] = None,
+        batch_size: int = 1024
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batched approximate top-k search
+
+        Args:
+            queries: float matrix (n x dim) or a single vector
+            k: Neighbours per query
+            n_probe: Lists scanned per query (n_lists gives exact search)
+            batch_size: Queries processed together
+
+        Returns:
+            Tuple of (scores float32 (n x k), ids int64 (n x k)), best first;
+            missing neighbours have id -1 and score -inf
+        """
+        if not self.is_trained:
+            raise ValueError("Index is empty; call add() first")
+        queries = self._prepare(queries)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for start in range(0, len(queries), batch_size):
+            block = slice(start, start + batch_size)
+            scores[block], ids[block] = self._search_block(queries[block], k, n_probe)
+        return scores, ids
+
+    def _search_block(self, queries: np.ndarray, k: int, n_probe: int) -> Tuple[np.ndarray, np.ndarray]:
+        probes = _top_k(queries @ self.centroids.T, n_probe)
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_ids = np.full((len(queries), k), -1, dtype=np.int64)
+
+        # Visit each probed list once, scoring every query that probes it
+        flat_lists = probes.ravel()
+        flat_queries = np.repeat(np.arange(len(queries)), n_probe)
+        order = np.argsort(flat_lists, kind='stable')
+        lists, starts = np.unique(flat_lists[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        for list_id, start, end in zip(lists, starts, ends):
+            list_ids = self._list_ids[list_id]
+            if not len(list_ids):
+                continue
+            rows = flat_queries[order[start:end]]
+            candidate_scores = queries[rows] @ np.asarray(self._list_vectors[list_id]).T
+            top = _top_k(candidate_scores, k)
+            merged_scores = np.concatenate(
+                [best_scores[rows], np.take_along_axis(candidate_scores, top, axis=1)], axis=1
+            )
+            merged_ids = np.concatenate([best_ids[rows], list_ids[top]], axis=1)
+            keep = _top_k(merged_scores, k)
+            best_scores[rows] = np.take_along_axis(merged_scores, keep, axis=1)
+            best_ids[rows] = np.take_along_axis(merged_ids, keep, axis=1)
+        return best_scores, best_ids
+
+    def _locations(self) -> _IdLocations:
+        if self._id_locations is None:
+            self._id_locations = _IdLocations()
+            for list_id, list_ids in enumerate(self._list_ids):
+                if len(list_ids):
+                    rows = np.arange(len(list_ids), dtype=np.int64)
+                    self._id_locations.add(
+                        np.asarray(list_ids), np.stack([np.full_like(rows, list_id), rows], axis=1)
+                    )
+        return self._id_locations
+
+    def contains(self, ids: np.ndarray) -> np.ndarray:
+        """Boolean mask of the ids already in the index"""
+        return self._locations().locate(np.asarray(ids, dtype=np.int64))[:, 0] >= 0
+
+    def reconstruct(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Stored vectors of the given ids
+
+        Args:
+            ids: Ids passed to add()
+
+        Returns:
+            float32 matrix (len(ids) x dim)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        locations = self._locations().locate(ids)
+        missing = locations[:, 0] < 0
+        if missing.any():
+            raise KeyError(f"Ids not in index: {ids[missing].tolist()}")
+
+        # Gather list by list, touching only the requested rows
+        vectors = np.empty((len(ids), self.dim), dtype=np.float32)
+        order = np.argsort(locations[:, 0], kind='stable')
+        lists, starts = np.unique(locations[order, 0], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        for list_id, start, end in zip(lists, starts, ends):
+            rows = order[start:end]
+            vectors[rows] = self._list_vectors[list_id][locations[rows, 1]]
+        return vectors
+
+    def similar_to(self, ids: np.ndarray, k: int = 10, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Neighbours of songs already in the index, excluding the song itself
+
+        Args:
+            ids: Ids of the query songs
+            k: Neighbours per song
+            n_probe: Lists scanned per query
+
+        Returns:
+            Tuple of (scores, ids) as in search()
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        scores, neighbours = self.search(self.reconstruct(ids), k + 1, n_probe)
+        is_self = neighbours == ids[:, None]
+        # Drop the query itself, or the last neighbour if it was not returned
+        drop = np.where(is_self.any(axis=1), is_self.argmax(axis=1), k)
+        keep = np.ones_like(is_self)
+        keep[np.arange(len(ids)), drop] = False
+        return scores[keep].reshape(len(ids), k), neighbours[keep].reshape(len(ids), k)
+
+    def save(self, path: str) -> None:
+        """
+        Save the index as .npy files plus meta.json
+
+        Args:
+            path: Index directory
+        """
+        if not self.is_trained:
+            raise ValueError("Cannot save an untrained index")
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        offsets = np.concatenate([[0], np.cumsum([len(ids) for ids in self._list_ids])]).astype(np.int64)
+        np.save(path / self.CENTROIDS_FILE, self.centroids)
+        np.save(path / self.VECTORS_FILE, np.concatenate(self._list_vectors))
+        np.save(path / self.IDS_FILE, np.concatenate(self._list_ids))
+        np.save(path / self.OFFSETS_FILE, offsets)
+        meta = {
+            'dim': self.dim,
+            'n_lists': self.n_lists,
+            'n_probe': self.n_probe,
+            'metric': self.metric,
+            'random_state': self.random_state,
+            'num_vectors': int(offsets[-1]),
+        }
+        with open(path / self.META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        self.logger.info(f"Saved IVF index with {offsets[-1]} vectors to {path}")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "IVFIndex":
+        """
+        Load an index written by save()
+
+        Args:
+            path: Index directory
+            mmap: Map vectors read-only instead of reading them into memory
+
+        Returns:
+            IVFIndex
+        """
+        path = Path(path)
+        with open(path / cls.META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        mmap_mode = 'r' if mmap else None
+
+        index = cls(meta['dim'], meta['n_lists'], meta['n_probe'], meta['metric'], meta['random_state'])
+        index.centroids = np.load(path / cls.CENTROIDS_FILE)
+        vectors = np.load(path / cls.VECTORS_FILE, mmap_mode=mmap_mode)
+        ids = np.load(path / cls.IDS_FILE)
+        offsets = np.load(path / cls.OFFSETS_FILE)
+        index._list_vectors = [vectors[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+        index._list_ids = [ids[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+        return index
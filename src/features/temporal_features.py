@@ -5,4 +5,391 @@ Extracts time-based features from music data:
 - Decade/year effects
 - Temporal trends in content
 - Era-specific language patterns
-"""
\ No newline at end of file
+"""
+
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+from ..data.preprocessor import DOC_SEPARATOR, SONG_KEY_COLUMNS, LyricsPreprocessor
+from ..data.schema import LyricsBuffer
+from ..utils.helpers import compute_decade, stable_row_hashes
+from .text_features import WORD_TOKEN_PATTERN
+
+
+def log_odds_z_scores(counts: np.ndarray, prior_scale: float = 500.0) -> np.ndarray:
+    """
+    Log-odds ratio with informative Dirichlet prior (Monroe et al., 2008)
+
+    Compares each group's term frequencies against all other groups; the
+    prior (global term frequencies scaled to ``prior_scale`` pseudo-counts)
+    shrinks rare terms towards zero.
+
+    Args:
+        counts: Term counts per group (groups x terms)
+        prior_scale: Total pseudo-count of the prior
+
+    Returns:
+        z-scores (groups x terms); positive = over-used by the group
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=0)
+    alpha = prior_scale * totals / max(totals.sum(), 1.0) + 1e-3
+    alpha0 = alpha.sum()
+
+    group_size = counts.sum(axis=1, keepdims=True)
+    rest = totals - counts
+    rest_size = totals.sum() - group_size
+
+    delta = (
+        np.log(counts + alpha) - np.log(group_size + alpha0 - counts - alpha)
+        - np.log(rest + alpha) + np.log(rest_size + alpha0 - rest - alpha)
+    )
+    variance = 1.0 / (counts + alpha) + 1.0 / (rest + alpha)
+    return delta / np.sqrt(variance)
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Centered moving sum (window clipped at the edges, same length as values)"""
+    cumulative = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+    positions = np.arange(len(values))
+    low = np.clip(positions - window // 2, 0, len(values))
+    high = np.clip(positions + (window - 1) // 2 + 1, 0, len(values))
+    return cumulative[high] - cumulative[low]
+
+
+class TemporalFeatureExtractor:
+    """
+    Decade/era encodings, lexical drift and rolling-window song statistics
+
+    ``fit`` learns, over the training catalog:
+
+        - the decades and year range present
+        - per-decade log-odds z-scores of every term vs. the other decades
+        - per-year lyric length statistics smoothed over ``rolling_window`` years
+
+    ``transform`` then gives one float32 row per song: normalized year,
+    decade and era one-hots, the song's mean term z-score for every decade
+    (``lexical_drift_<decade>``: how much its wording resembles each decade)
+    and its length relative to songs from the surrounding years. Everything
+    is one sparse product plus array indexing, so the full catalog takes
+    seconds.
+
+    With ``cache_dir``, the fitted state and the training features are saved
+    per corpus version (hash of the song keys and settings); refitting the
+    same corpus loads them instead.
+    """
+
+    def __init__(
+        self,
+        era_boundaries: Sequence[int] = (1970, 1985, 2000),
+        rolling_window: int = 5,
+        max_features: Optional[int] = 20000,
+        min_df: int = 5,
+        prior_scale: float = 500.0,
+        cache_dir: Optional[str] = None,
+        preprocessor: Optional[LyricsPreprocessor] = None
+    ):
+        self.era_boundaries = [int(year) for year in era_boundaries]
+        self.rolling_window = rolling_window
+        self.max_features = max_features
+        self.min_df = min_df
+        self.prior_scale = prior_scale
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.preprocessor = preprocessor or LyricsPreprocessor()
+        self.logger = logging.getLogger(__name__)
+
+        self.is_fitted = False
+        self.decades_: np.ndarray = np.empty(0, dtype=np.int64)
+        self.terms_: List[str] = []
+        self.drift_: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self.yearly_stats_: Optional[pd.DataFrame] = None
+        self._fit_version: Optional[str] = None
+        self._fit_digest: Optional[str] = None
+        self._fit_features: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TemporalFeatureExtractor":
+        """
+        Create an extractor from the ``features.temporal`` config section
+
+        Args:
+            config: Loaded configuration
+
+        Returns:
+            TemporalFeatureExtractor
+        """
+        params = config.get("features", {}).get("temporal", {})
+        return cls(preprocessor=LyricsPreprocessor.from_config(config), **params)
+
+    @property
+    def era_names(self) -> List[str]:
+        """Era labels, e.g. ['<1970', '1970-1984', '1985-1999', '>=2000']"""
+        bounds = self.era_boundaries
+        if not bounds:
+            return ['all']
+        names = [f"<{bounds[0]}"]
+        names += [f"{start}-{end - 1}" for start, end in zip(bounds[:-1], bounds[1:])]
+        return names + [f">={bounds[-1]}"]
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Output columns of transform"""
+        return (
+            ['year_norm', 'year_missing']
+            + [f"decade_{decade}" for decade in self.decades_]
+            + [f"era_{name}" for name in self.era_names]
+            + [f"lexical_drift_{decade}" for decade in self.decades_]
+            + ['log_length', 'length_rolling_z']
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of the settings that change the features"""
+        settings = {
+            'era_boundaries': self.era_boundaries,
+            'rolling_window': self.rolling_window,
+            'max_features': self.max_features,
+            'min_df': self.min_df,
+            'prior_scale': self.prior_scale,
+            'lowercase': self.preprocessor.lowercase,
+        }
+        return hashlib.blake2b(json.dumps(settings, sort_keys=True).encode("utf-8"), digest_size=6).hexdigest()
+
+    def corpus_version(self, df: pd.DataFrame) -> str:
+        """Hash of the songs (in order) and the extractor settings"""
+        columns = [col for col in SONG_KEY_COLUMNS if col in df.columns]
+        keys = stable_row_hashes(df, columns)
+        digest = hashlib.blake2b(keys.tobytes(), digest_size=8)
+        digest.update(self.fingerprint.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _frame_digest(self, df: pd.DataFrame) -> str:
+        """
+        Fast in-memory fingerprint of the songs (vectorized hashing)
+
+        Only compared within a process, so unlike corpus_version it does not
+        need to be stable across pandas versions.
+        """
+        columns = [col for col in SONG_KEY_COLUMNS if col in df.columns]
+        hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+        return hashlib.blake2b(hashes.tobytes(), digest_size=8).hexdigest()
+
+    def _cache_path(self, version: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"temporal_{version}.npz"
+
+    def _counts(self, texts: Sequence[Optional[str]], vectorizer: CountVectorizer, fit: bool) -> sp.csr_matrix:
+        buffer = LyricsBuffer.maybe_from(texts)
+        cleaned = self.preprocessor.clean_batch(buffer if buffer is not None else list(texts)).split(DOC_SEPARATOR)
+        counts = vectorizer.fit_transform(cleaned) if fit else vectorizer.transform(cleaned)
+        return counts.tocsr()
+
+    def _vectorizer(self, vocabulary: Optional[List[str]] = None) -> CountVectorizer:
+        return CountVectorizer(
+            token_pattern=WORD_TOKEN_PATTERN,
+            lowercase=False,
+            max_features=self.max_features,
+            min_df=self.min_df,
+            vocabulary=vocabulary,
+            dtype=np.float32
+        )
+
+    def fit(self, df: pd.DataFrame) -> "TemporalFeatureExtractor":
+        """
+        Fit decades, lexical drift and yearly statistics
+
+        Args:
+            df: Songs with ``year`` and ``lyrics`` columns
+
+        Returns:
+            self
+        """
+        self.fit_transform(df)
+        return self
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fit on a catalog and return its features, tokenizing it once
+
+        Args:
+            df: Songs with ``year`` and ``lyrics`` columns
+
+        Returns:
+            DataFrame with ``feature_names`` columns and the index of ``df``
+        """
+        # The stable per-row version is only needed to key the on-disk cache
+        version = self.corpus_version(df) if self.cache_dir is not None else None
+        cache_path = self._cache_path(version) if version is not None else None
+        if cache_path is not None and cache_path.exists():
+            self._load(cache_path)
+            self._fit_digest = self._frame_digest(df)
+            self.logger.info(f"Temporal features loaded from cache {cache_path}")
+            return pd.DataFrame(self._fit_features, columns=self.feature_names, index=df.index)
+
+        year_values = pd.to_numeric(df['year'], errors='coerce').to_numpy(dtype=np.float64)
+        known = ~np.isnan(year_values)
+        decades = compute_decade(year_values).to_numpy(dtype=np.float64, na_value=np.nan)
+
+        vectorizer = self._vectorizer()
+        counts = self._counts(df['lyrics'], vectorizer, fit=True)
+        self.terms_ = vectorizer.get_feature_names_out().tolist()
+
+        # Term counts per decade: one sparse product with the decade indicator
+        self.decades_ = np.unique(decades[known]).astype(np.int64)
+        codes = np.searchsorted(self.decades_, decades[known])
+        indicator = sp.csr_matrix(
+            (np.ones(len(codes), dtype=np.float32), (codes, np.flatnonzero(known))),
+            shape=(len(self.decades_), len(df))
+        )
+        decade_counts = np.asarray((indicator @ counts).todense())
+        self.drift_ = log_odds_z_scores(decade_counts, self.prior_scale).astype(np.float32)
+
+        # Lyric length per year, smoothed over the rolling window
+        lengths = np.asarray(counts.sum(axis=1)).ravel()
+        first_year, last_year = int(year_values[known].min()), int(year_values[known].max())
+        year_offset = year_values[known].astype(np.int64) - first_year
+        n_years = last_year - first_year + 1
+        songs = np.bincount(year_offset, minlength=n_years).astype(np.float64)
+        total = np.bincount(year_offset, weights=lengths[known], minlength=n_years)
+        total_sq = np.bincount(year_offset, weights=lengths[known] ** 2, minlength=n_years)
+        window_songs = _rolling_sum(songs, self.rolling_window)
+        rolling_mean = _rolling_sum(total, self.rolling_window) / np.maximum(window_songs, 1)
+        rolling_var = _rolling_sum(total_sq, self.rolling_window) / np.maximum(window_songs, 1) - rolling_mean ** 2
+        self.yearly_stats_ = pd.DataFrame({
+            'year': np.arange(first_year, last_year + 1),
+            'songs': songs.astype(np.int64),
+            'mean_length': total / np.maximum(songs, 1),
+            'rolling_songs': window_songs,
+            'rolling_mean_length': rolling_mean,
+            'rolling_std_length': np.sqrt(np.maximum(rolling_var, 0)),
+        })
+
+        self.is_fitted = True
+        features = self._features(year_values, counts)
+        self._fit_version, self._fit_features = version, features
+        self._fit_digest = self._frame_digest(df)
+        self.logger.info(
+            f"Temporal features fitted: {len(df)} songs, {len(self.decades_)} decades, {len(self.terms_)} terms"
+        )
+        if cache_path is not None:
+            self._save(cache_path)
+        return pd.DataFrame(features, columns=self.feature_names, index=df.index)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Features for new songs using the fitted statistics
+
+        Args:
+            df: Songs with ``year`` and ``lyrics`` columns
+
+        Returns:
+            DataFrame with ``feature_names`` columns and the index of ``df``
+        """
+        if not self.is_fitted:
+            raise ValueError("TemporalFeatureExtractor is not fitted; call fit first")
+        if (
+            self._fit_features is not None
+            and len(df) == len(self._fit_features)
+            and self._frame_digest(df) == self._fit_digest
+        ):
+            return pd.DataFrame(self._fit_features, columns=self.feature_names, index=df.index)
+
+        counts = self._counts(df['lyrics'], self._vectorizer(self.terms_), fit=False)
+        year_values = pd.to_numeric(df['year'], errors='coerce').to_numpy(dtype=np.float64)
+        features = self._features(year_values, counts)
+        return pd.DataFrame(features, columns=self.feature_names, index=df.index)
+
+    def _features(self, year_values: np.ndarray, counts: sp.csr_matrix) -> np.ndarray:
+        """Feature matrix from years and term counts"""
+        n = len(year_values)
+        known = ~np.isnan(year_values)
+        years = np.where(known, year_values, 0).astype(np.int64)
+        stats = self.yearly_stats_
+        first_year, last_year = int(stats['year'].iloc[0]), int(stats['year'].iloc[-1])
+
+        year_norm = np.where(known, (years - first_year) / max(last_year - first_year, 1), 0.5)
+
+        # Decades not seen during fit get no one-hot column
+        decades = compute_decade(year_values).to_numpy(dtype=np.float64, na_value=np.nan)
+        decade_one_hot = np.zeros((n, len(self.decades_)), dtype=np.float32)
+        decade_pos = np.minimum(np.searchsorted(self.decades_, decades), max(len(self.decades_) - 1, 0))
+        seen = known & (self.decades_[decade_pos] == decades)
+        decade_one_hot[np.flatnonzero(seen), decade_pos[seen]] = 1
+
+        era_one_hot = np.zeros((n, len(self.era_names)), dtype=np.float32)
+        era_one_hot[np.flatnonzero(known), np.searchsorted(self.era_boundaries, years[known], side='right')] = 1
+
+        # Mean term z-score per decade, weighted by the song's term frequencies
+        lengths = np.asarray(counts.sum(axis=1)).ravel()
+        frequencies = sp.diags(1.0 / np.maximum(lengths, 1)) @ counts
+        drift = np.asarray(frequencies @ self.drift_.T)
+
+        year_pos = np.clip(years - first_year, 0, len(stats) - 1)
+        rolling_mean = stats['rolling_mean_length'].to_numpy()[year_pos]
+        rolling_std = stats['rolling_std_length'].to_numpy()[year_pos]
+        length_z = np.where(known, (lengths - rolling_mean) / np.maximum(rolling_std, 1.0), 0.0)
+
+        return np.hstack([
+            year_norm[:, None],
+            (~known)[:, None],
+            decade_one_hot,
+            era_one_hot,
+            drift,
+            np.log1p(lengths)[:, None],
+            length_z[:, None],
+        ]).astype(np.float32)
+
+    def top_terms(self, decade: int, n: int = 20) -> pd.DataFrame:
+        """
+        Terms most over-used by a decade relative to the others
+
+        Args:
+            decade: Decade, e.g. 1980
+            n: Number of terms
+
+        Returns:
+            DataFrame with ``term`` and ``z_score`` columns, highest first
+        """
+        if not self.is_fitted:
+            raise ValueError("TemporalFeatureExtractor is not fitted; call fit first")
+        position = np.flatnonzero(self.decades_ == decade)
+        if not len(position):
+            raise KeyError(f"Decade {decade} not seen during fit")
+        scores = self.drift_[position[0]]
+        top = np.argsort(-scores, kind='stable')[:n]
+        return pd.DataFrame({'term': np.asarray(self.terms_, dtype=object)[top], 'z_score': scores[top]})
+
+    def _save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                decades=self.decades_,
+                terms=np.array(self.terms_, dtype=str),
+                drift=self.drift_,
+                yearly_stats=self.yearly_stats_.to_records(index=False),
+                features=self._fit_features,
+                version=np.array(self._fit_version)
+            )
+        os.replace(tmp_path, path)
+
+    def _load(self, path: Path) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            self.decades_ = data['decades']
+            self.terms_ = data['terms'].tolist()
+            self.drift_ = data['drift']
+            self.yearly_stats_ = pd.DataFrame.from_records(data['yearly_stats'])
+            self._fit_features = data['features']
+            self._fit_version = str(data['version'])
+        self.is_fitted = True
@@ -3,7 +3,443 @@ Text Feature Engineering Module
 
 Extracts various text-based features from music lyrics including:
 - TF-IDF features
-- N-gram features  
+- N-gram features
 - Sentiment features
 - Linguistic features specific to music content
-"""
\ No newline at end of file
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer
+
+from ..data.preprocessor import DOC_SEPARATOR, SECTION_PATTERN, LyricsPreprocessor
+from ..data.schema import LyricsBuffer
+from ..utils.helpers import stable_row_hashes
+from .lexicons import DEFAULT_LEXICONS, LexiconMatcher
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    SPACY_AVAILABLE = False
+
+
+# Words (with apostrophes, as in "don't"); punctuation is not a feature
+WORD_TOKEN_PATTERN = r"[\w']+"
+WORD_PATTERN = re.compile(WORD_TOKEN_PATTERN)
+CHORUS_MARKER_PATTERN = re.compile(r"\b(?:chorus|hook|refrain)\b", re.IGNORECASE)
+
+# spaCy components that the part-of-speech features do not need
+SPACY_DISABLED_COMPONENTS = ["parser", "ner", "lemmatizer", "textcat", "senter"]
+SPACY_POS_TAGS = ["NOUN", "VERB", "ADJ", "PRON"]
+
+
+class TextFeatureExtractor:
+    """
+    Sparse TF-IDF / n-gram features for a linear baseline
+
+    Two modes:
+        tfidf    CountVectorizer vocabulary pruned by min_df/max_df/max_features
+        hashing  HashingVectorizer into ``n_features`` columns, no vocabulary
+                 dict is kept; only document frequencies are fitted
+
+    Lyrics are cleaned with ``LyricsPreprocessor.clean_batch`` (section headers
+    and repetition markers removed) and ``transform`` runs in worker processes
+    over chunks of songs. Outputs are float32 CSR matrices, L2-normalized rows.
+    """
+
+    MODES = ('tfidf', 'hashing')
+
+    def __init__(
+        self,
+        mode: str = 'tfidf',
+        ngram_range: Tuple[int, int] = (1, 2),
+        max_features: Optional[int] = 50000,
+        min_df: int = 2,
+        max_df: float = 0.95,
+        n_features: int = 2 ** 20,
+        sublinear_tf: bool = True,
+        preprocessor: Optional[LyricsPreprocessor] = None
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {self.MODES}")
+        self.mode = mode
+        self.ngram_range = tuple(ngram_range)
+        self.max_features = max_features
+        self.min_df = min_df
+        self.max_df = max_df
+        self.n_features = n_features
+        self.preprocessor = preprocessor or LyricsPreprocessor()
+        self.logger = logging.getLogger(__name__)
+
+        if mode == 'hashing':
+            self.vectorizer = HashingVectorizer(
+                token_pattern=WORD_TOKEN_PATTERN,
+                ngram_range=self.ngram_range,
+                n_features=n_features,
+                alternate_sign=False,
+                norm=None,
+                lowercase=False,
+                dtype=np.float32
+            )
+        else:
+            self.vectorizer = CountVectorizer(
+                token_pattern=WORD_TOKEN_PATTERN,
+                ngram_range=self.ngram_range,
+                max_features=max_features,
+                min_df=min_df,
+                max_df=max_df,
+                lowercase=False,
+                dtype=np.float32
+            )
+        self.tfidf = TfidfTransformer(sublinear_tf=sublinear_tf)
+        self.is_fitted = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TextFeatureExtractor":
+        """
+        Create an extractor from the ``features.text`` config section
+
+        Args:
+            config: Loaded configuration
+
+        Returns:
+            TextFeatureExtractor
+        """
+        params = dict(config.get("features", {}).get("text", {}))
+        if "ngram_range" in params:
+            params["ngram_range"] = tuple(params["ngram_range"])
+        return cls(preprocessor=LyricsPreprocessor.from_config(config), **params)
+
+    @property
+    def num_features(self) -> int:
+        """Number of output columns"""
+        if self.mode == 'hashing':
+            return self.n_features
+        return len(self.vectorizer.vocabulary_) if self.is_fitted else 0
+
+    def get_feature_names(self) -> List[str]:
+        """Feature names (tfidf mode only; hashed columns have no names)"""
+        if self.mode == 'hashing':
+            raise ValueError("Hashed features have no names")
+        return self.vectorizer.get_feature_names_out().tolist()
+
+    def _clean(self, texts: Sequence[Optional[str]]) -> List[str]:
+        return self.preprocessor.clean_batch(texts).split(DOC_SEPARATOR)
+
+    def _counts(self, texts: Sequence[Optional[str]], n_jobs: Optional[int], chunk_size: int) -> sp.csr_matrix:
+        """Raw term counts, fitting the vocabulary first in tfidf mode"""
+        # Arrow-backed lyrics stay in one buffer; chunks are zero-copy slices
+        buffer = LyricsBuffer.maybe_from(texts)
+        texts = buffer if buffer is not None else list(texts)
+        if self.mode == 'tfidf' and not self.is_fitted:
+            # The vocabulary needs global document frequencies: one serial pass
+            return self.vectorizer.fit_transform(self._clean(texts)).tocsr()
+
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        if n_jobs == 1 or len(chunks) <= 1:
+            partials = [_count_chunk(self, chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                partials = list(executor.map(_count_chunk, [self] * len(chunks), chunks))
+        if not partials:
+            return sp.csr_matrix((0, self.num_features), dtype=np.float32)
+        return sp.vstack(partials, format='csr')
+
+    def fit(self, texts: Sequence[Optional[str]], n_jobs: Optional[int] = None, chunk_size: int = 10000):
+        """
+        Fit the vocabulary (tfidf mode) and the IDF weights
+
+        Args:
+            texts: Raw lyrics
+            n_jobs: Worker processes for hashed counting
+            chunk_size: Songs per worker task
+
+        Returns:
+            self
+        """
+        self.fit_transform(texts, n_jobs=n_jobs, chunk_size=chunk_size)
+        return self
+
+    def fit_transform(
+        self,
+        texts: Sequence[Optional[str]],
+        n_jobs: Optional[int] = None,
+        chunk_size: int = 10000
+    ) -> sp.csr_matrix:
+        """
+        Fit and return the TF-IDF matrix, tokenizing the corpus once
+
+        Args:
+            texts: Raw lyrics
+            n_jobs: Worker processes for hashed counting
+            chunk_size: Songs per worker task
+
+        Returns:
+            scipy.sparse.csr_matrix (songs x features), float32
+        """
+        self.is_fitted = False
+        counts = self._counts(texts, n_jobs, chunk_size)
+        features = self.tfidf.fit_transform(counts)
+        self.is_fitted = True
+        self.logger.info(f"Text features fitted: {counts.shape[0]} songs, {self.num_features} features")
+        return features.astype(np.float32).tocsr()
+
+    def transform(
+        self,
+        texts: Sequence[Optional[str]],
+        n_jobs: Optional[int] = None,
+        chunk_size: int = 10000
+    ) -> sp.csr_matrix:
+        """
+        Transform lyrics into TF-IDF features, in parallel over chunks
+
+        Args:
+            texts: Raw lyrics
+            n_jobs: Worker processes (None = one per CPU, 1 = in-process)
+            chunk_size: Songs per worker task
+
+        Returns:
+            scipy.sparse.csr_matrix (songs x features), float32
+        """
+        if not self.is_fitted:
+            raise ValueError("TextFeatureExtractor is not fitted; call fit first")
+        counts = self._counts(texts, n_jobs, chunk_size)
+        return self.tfidf.transform(counts).astype(np.float32).tocsr()
+
+
+def _count_chunk(extractor: TextFeatureExtractor, texts: Sequence[Optional[str]]) -> sp.csr_matrix:
+    """Worker for TextFeatureExtractor: term counts of one chunk"""
+    return extractor.vectorizer.transform(extractor._clean(texts)).tocsr()
+
+
+def save_features(features: sp.spmatrix, path: str) -> Path:
+    """
+    Save a sparse feature matrix as .npz (see docs/data_format.md)
+
+    Args:
+        features: Sparse matrix
+        path: Output path, e.g. data/processed/processed_features_YYYY_MM_DD.npz
+
+    Returns:
+        Path written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sp.save_npz(path, sp.csr_matrix(features), compressed=False)
+    return path
+
+
+def load_features(path: str) -> sp.csr_matrix:
+    """
+    Load a sparse feature matrix saved with save_features
+
+    Args:
+        path: .npz path
+
+    Returns:
+        scipy.sparse.csr_matrix
+    """
+    return sp.load_npz(path).tocsr()
+
+
+class LinguisticFeatureExtractor:
+    """
+    Lexicon, repetition and vocabulary-richness features per song
+
+    All lexicons are compiled into one LexiconMatcher, and every feature is
+    computed in a single pass over each lyric:
+
+        num_tokens, num_lines, type_token_ratio
+        repeated_line_ratio   share of lines that repeat an earlier line
+        chorus_token_ratio    share of tokens in lines occurring 2+ times
+        section_markers, chorus_markers  [Verse]/[Chorus] style headers
+        <lexicon>_count, <lexicon>_ratio  for each lexicon
+        sentiment_score       (positive - negative) / (positive + negative)
+
+    Results are cached per lyric hash (in memory and, with ``cache_path``, in
+    an .npz file), so unchanged songs are never recomputed. spaCy part-of-
+    speech ratios are optional and run through ``nlp.pipe`` with the unused
+    pipeline components disabled.
+    """
+
+    def __init__(
+        self,
+        lexicons: Optional[Dict[str, Iterable[str]]] = None,
+        cache_path: Optional[str] = None,
+        use_spacy: bool = False,
+        spacy_model: str = "en_core_web_sm",
+        spacy_batch_size: int = 256,
+        spacy_n_process: int = 1
+    ):
+        self.lexicons = {name: list(entries) for name, entries in (lexicons or DEFAULT_LEXICONS).items()}
+        self.matcher = LexiconMatcher(self.lexicons)
+        self.use_spacy = use_spacy
+        self.spacy_model = spacy_model
+        self.spacy_batch_size = spacy_batch_size
+        self.spacy_n_process = spacy_n_process
+        self.logger = logging.getLogger(__name__)
+        self._nlp = None
+
+        if use_spacy and not SPACY_AVAILABLE:
+            raise ImportError("spaCy is required for use_spacy=True: pip install spacy")
+
+        self.feature_names = [
+            'num_tokens', 'num_lines', 'type_token_ratio', 'repeated_line_ratio',
+            'chorus_token_ratio', 'section_markers', 'chorus_markers',
+        ]
+        for name in self.matcher.names:
+            self.feature_names += [f"{name}_count", f"{name}_ratio"]
+        self._has_sentiment = 'positive' in self.lexicons and 'negative' in self.lexicons
+        if self._has_sentiment:
+            self.feature_names.append('sentiment_score')
+        if use_spacy:
+            self.feature_names += [f"{tag.lower()}_ratio" for tag in SPACY_POS_TAGS]
+
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._cache_keys = np.empty(0, dtype=np.uint64)
+        self._cache_values = np.empty((0, len(self.feature_names)), dtype=np.float32)
+        if self.cache_path is not None and self.cache_path.exists():
+            self._load_cache()
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the feature definition; caches built with another one are ignored"""
+        definition = json.dumps(
+            {'features': self.feature_names, 'lexicons': self.lexicons, 'spacy': self.use_spacy and self.spacy_model},
+            sort_keys=True
+        )
+        return hashlib.blake2b(definition.encode("utf-8"), digest_size=8).hexdigest()
+
+    def song_features(self, text: Optional[str]) -> List[float]:
+        """
+        Compute the lexicon and repetition features of one lyric
+
+        Args:
+            text: Raw lyric
+
+        Returns:
+            List of values in ``feature_names`` order (without spaCy ratios)
+        """
+        text = text if isinstance(text, str) else ""
+        markers = SECTION_PATTERN.findall(text)
+        chorus_markers = sum(1 for marker in markers if CHORUS_MARKER_PATTERN.search(marker))
+
+        tokens: List[str] = []
+        line_counts: Counter = Counter()
+        line_lengths: Dict[str, int] = {}
+        for line in SECTION_PATTERN.sub(" ", text).lower().splitlines():
+            line_tokens = WORD_PATTERN.findall(line)
+            if not line_tokens:
+                continue
+            tokens.extend(line_tokens)
+            key = " ".join(line_tokens)
+            line_counts[key] += 1
+            line_lengths[key] = len(line_tokens)
+
+        num_tokens = len(tokens)
+        num_lines = sum(line_counts.values())
+        denominator = max(num_tokens, 1)
+        repeated_tokens = sum(line_lengths[key] * count for key, count in line_counts.items() if count > 1)
+
+        values = [
+            num_tokens,
+            num_lines,
+            len(set(tokens)) / denominator,
+            1 - len(line_counts) / num_lines if num_lines else 0.0,
+            repeated_tokens / denominator,
+            len(markers),
+            chorus_markers,
+        ]
+        counts = self.matcher.count(tokens)
+        for count in counts:
+            values += [count, count / denominator]
+        if self._has_sentiment:
+            positive = counts[self.matcher.names.index('positive')]
+            negative = counts[self.matcher.names.index('negative')]
+            values.append((positive - negative) / (positive + negative) if positive + negative else 0.0)
+        return values
+
+    def _spacy_features(self, texts: List[str]) -> np.ndarray:
+        """Part-of-speech ratios with batched nlp.pipe"""
+        if self._nlp is None:
+            self._nlp = spacy.load(self.spacy_model, disable=SPACY_DISABLED_COMPONENTS)
+        ratios = np.zeros((len(texts), len(SPACY_POS_TAGS)), dtype=np.float32)
+        docs = self._nlp.pipe(texts, batch_size=self.spacy_batch_size, n_process=self.spacy_n_process)
+        for i, doc in enumerate(docs):
+            pos_counts = Counter(token.pos_ for token in doc if not token.is_space)
+            total = max(sum(pos_counts.values()), 1)
+            ratios[i] = [pos_counts[tag] / total for tag in SPACY_POS_TAGS]
+        return ratios
+
+    def _compute(self, texts: List[Optional[str]]) -> np.ndarray:
+        values = np.array([self.song_features(text) for text in texts], dtype=np.float32)
+        values = values.reshape(len(texts), -1)
+        if self.use_spacy:
+            cleaned = [SECTION_PATTERN.sub(" ", text) if isinstance(text, str) else "" for text in texts]
+            values = np.hstack([values, self._spacy_features(cleaned)])
+        return values
+
+    def transform(self, texts: Sequence[Optional[str]]) -> pd.DataFrame:
+        """
+        Compute features for many lyrics, reusing cached songs
+
+        Args:
+            texts: Raw lyrics (a Series keeps its index in the output)
+
+        Returns:
+            DataFrame with one row per lyric and ``feature_names`` columns
+        """
+        index = texts.index if isinstance(texts, pd.Series) else None
+        texts = list(texts)
+        keys = stable_row_hashes(pd.DataFrame({'lyrics': texts}), ['lyrics'])
+
+        position = pd.Index(self._cache_keys).get_indexer(keys)
+        missing = position < 0
+        if missing.any():
+            new_keys, first = np.unique(keys[missing], return_index=True)
+            rows = np.flatnonzero(missing)[first]
+            new_values = self._compute([texts[i] for i in rows])
+            self._cache_keys = np.concatenate([self._cache_keys, new_keys])
+            self._cache_values = np.vstack([self._cache_values, new_values])
+            self.logger.info(f"Linguistic features: {len(rows)} computed, {int((~missing).sum())} cached")
+            if self.cache_path is not None:
+                self.save_cache()
+            position = pd.Index(self._cache_keys).get_indexer(keys)
+
+        return pd.DataFrame(self._cache_values[position], columns=self.feature_names, index=index)
+
+    def save_cache(self) -> Path:
+        """Write the feature cache to ``cache_path`` (atomic replace)"""
+        if self.cache_path is None:
+            raise ValueError("No cache_path configured")
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                keys=self._cache_keys,
+                values=self._cache_values,
+                fingerprint=np.array(self.fingerprint)
+            )
+        os.replace(tmp_path, self.cache_path)
+        return self.cache_path
+
+    def _load_cache(self) -> None:
+        with np.load(self.cache_path) as data:
+            if str(data['fingerprint']) != self.fingerprint:
+                self.logger.warning(f"Ignoring feature cache {self.cache_path}: built with other lexicons/features")
+                return
+            self._cache_keys = data['keys']
+            self._cache_values = data['values']
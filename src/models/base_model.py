@@ -3,4 +3,350 @@ Base Model Class
 
 Abstract base class for all neural network models providing common interface
 for training, evaluation, and prediction across different architectures.
-"""
\ No newline at end of file
+"""
+
+import os
+import copy
+import logging
+import numpy as np
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type, Union
+
+import torch
+from torch import nn
+
+from ..data.preprocessor import LyricsPreprocessor, Vocabulary
+from .quantization import quantization_spec, quantize_model
+
+
+# Concrete models by class name, filled by BaseModel.__init_subclass__
+MODEL_REGISTRY: Dict[str, Type["BaseModel"]] = {}
+
+INFERENCE_BACKENDS = ('eager', 'compile')
+
+ArrayLike = Union[np.ndarray, torch.Tensor]
+
+
+class BaseModel(nn.Module, ABC):
+    """
+    Common inference and persistence surface for lyrics classifiers
+
+    Subclasses implement ``forward(token_ids, lengths, metadata)`` returning
+    logits and ``get_config`` returning their constructor arguments. The
+    base class then provides:
+
+        predict_batch   probabilities for an encoded batch, trimmed to its
+                        longest song
+        predict_stream  generator over raw lyrics; the next batch is
+                        tokenized on a worker thread while the current one
+                        runs through the model
+        save / load     one checkpoint with config, weights, labels and the
+                        attached preprocessor (settings + vocabulary);
+                        ``load(..., backend='compile')`` wraps the model with
+                        ``torch.compile`` for inference
+
+    Labels are independent (multi-label), so probabilities are sigmoids.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        MODEL_REGISTRY[cls.__name__] = cls
+
+    def __init__(self):
+        super().__init__()
+        self.labels: Optional[List[str]] = None
+        self.preprocessor: Optional[LyricsPreprocessor] = None
+        self.backend = 'eager'
+        self.quantization: Optional[Dict[str, Optional[str]]] = None
+        # Kept out of the module tree so it is not part of state_dict()
+        object.__setattr__(self, '_inference_module', None)
+
+    @abstractmethod
+    def forward(
+        self,
+        token_ids: torch.Tensor,
+        lengths: Optional[torch.Tensor] = None,
+        metadata: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        """Class logits (batch x num_classes)"""
+
+    @abstractmethod
+    def get_config(self) -> Dict[str, Any]:
+        """Constructor arguments needed to rebuild the model (including num_classes)"""
+
+    def attach_preprocessor(self, preprocessor: LyricsPreprocessor) -> "BaseModel":
+        """
+        Attach the fitted preprocessor used to encode raw lyrics
+
+        Args:
+            preprocessor: LyricsPreprocessor with a built vocabulary
+
+        Returns:
+            self
+        """
+        if preprocessor.vocabulary is None:
+            raise ValueError("Preprocessor has no vocabulary; call fit() first")
+        self.preprocessor = preprocessor
+        return self
+
+    def optimize_for_inference(self, backend: str = 'compile') -> "BaseModel":
+        """
+        Select the forward implementation used by predict_batch
+
+        Args:
+            backend: 'eager' (plain module) or 'compile' (torch.compile with
+                dynamic shapes; the first batches of each new shape pay the
+                compilation cost)
+
+        Returns:
+            self
+        """
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {INFERENCE_BACKENDS}")
+        self.eval()
+        module = torch.compile(self, dynamic=True) if backend == 'compile' else None
+        object.__setattr__(self, '_inference_module', module)
+        self.backend = backend
+        return self
+
+    def quantize(self, linear: bool = True, embedding_dtype: Optional[str] = 'int8') -> "BaseModel":
+        """
+        Quantized copy for CPU inference (this model is left unchanged)
+
+        Compare it with the original using ModelEvaluator.compare before
+        shipping it.
+
+        Args:
+            linear: Dynamic INT8 quantization of linear layers
+            embedding_dtype: 'float16', 'int8' or None
+
+        Returns:
+            Quantized model in eval mode, saved and loaded like any other
+        """
+        compiled = self._inference_module
+        object.__setattr__(self, '_inference_module', None)
+        try:
+            model = copy.deepcopy(self)
+        finally:
+            object.__setattr__(self, '_inference_module', compiled)
+        model.backend = 'eager'
+        quantize_model(model, linear=linear, embedding_dtype=embedding_dtype)
+        model.quantization = quantization_spec(linear, embedding_dtype)
+        return model
+
+    def predict_batch(
+        self,
+        token_ids: ArrayLike,
+        lengths: Optional[ArrayLike] = None,
+        metadata: Optional[ArrayLike] = None
+    ) -> np.ndarray:
+        """
+        Label probabilities for an encoded batch
+
+        Args:
+            token_ids: Padded token ids (batch x max_length)
+            lengths: Unpadded lengths; columns past the longest are dropped
+            metadata: Extra features for models that use them
+
+        Returns:
+            float32 array (batch x num_classes)
+        """
+        token_ids = torch.as_tensor(token_ids, dtype=torch.long)
+        if lengths is not None:
+            lengths = torch.as_tensor(lengths, dtype=torch.long)
+            token_ids = token_ids[:, :max(int(lengths.max()), 1)] if len(lengths) else token_ids
+        if metadata is not None:
+            metadata = torch.as_tensor(metadata, dtype=torch.float32)
+
+        tensor = next(self.parameters(), None)
+        if tensor is None:
+            tensor = next(self.buffers(), None)
+        device = tensor.device if tensor is not None else torch.device('cpu')
+        # Not `or`: truthiness of the compiled wrapper calls len() on the model
+        module = self._inference_module if self._inference_module is not None else self
+        was_training = self.training
+        self.eval()
+        try:
+            with torch.inference_mode():
+                logits = module(
+                    token_ids.to(device),
+                    None if lengths is None else lengths.to(device),
+                    None if metadata is None else metadata.to(device)
+                )
+        finally:
+            self.train(was_training)
+        return torch.sigmoid(logits.float()).cpu().numpy()
+
+    def predict_stream(
+        self,
+        lyrics: Iterable[Optional[str]],
+        batch_size: int = 64,
+        preprocessor: Optional[LyricsPreprocessor] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        Stream probabilities over raw lyrics, overlapping tokenization and inference
+
+        Args:
+            lyrics: Any iterable of lyrics (read lazily, batch by batch)
+            batch_size: Songs per batch
+            preprocessor: Encoder (default: the attached preprocessor)
+
+        Yields:
+            float32 array (songs in the batch x num_classes), in input order
+        """
+        preprocessor = preprocessor or self.preprocessor
+        if preprocessor is None or preprocessor.vocabulary is None:
+            raise ValueError("No fitted preprocessor; pass one or call attach_preprocessor()")
+
+        iterator = iter(lyrics)
+
+        def encode_next():
+            batch = list(islice(iterator, batch_size))
+            return preprocessor.encode(batch) if batch else None
+
+        # Tokenization is mostly regex/NumPy work and overlaps with torch ops
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(encode_next)
+            while True:
+                encoded = pending.result()
+                if encoded is None:
+                    return
+                pending = executor.submit(encode_next)
+                yield self.predict_batch(*encoded)
+
+    def predict_proba(
+        self,
+        lyrics: Iterable[Optional[str]],
+        batch_size: int = 64,
+        preprocessor: Optional[LyricsPreprocessor] = None
+    ) -> np.ndarray:
+        """
+        Label probabilities for raw lyrics
+
+        Args:
+            lyrics: Lyrics
+            batch_size: Songs per batch
+            preprocessor: Encoder (default: the attached preprocessor)
+
+        Returns:
+            float32 array (songs x num_classes)
+        """
+        batches = list(self.predict_stream(lyrics, batch_size, preprocessor))
+        if not batches:
+            return np.zeros((0, self.get_config()['num_classes']), dtype=np.float32)
+        return np.vstack(batches)
+
+    def predict(
+        self,
+        lyrics: Iterable[Optional[str]],
+        threshold: float = 0.5,
+        batch_size: int = 64,
+        preprocessor: Optional[LyricsPreprocessor] = None
+    ) -> np.ndarray:
+        """
+        Binary label predictions for raw lyrics
+
+        Args:
+            lyrics: Lyrics
+            threshold: Probability threshold per label
+            batch_size: Songs per batch
+            preprocessor: Encoder (default: the attached preprocessor)
+
+        Returns:
+            int array (songs x num_classes)
+        """
+        return (self.predict_proba(lyrics, batch_size, preprocessor) >= threshold).astype(np.int64)
+
+    def _checkpoint(self) -> Dict[str, Any]:
+        """Everything save() writes, as a plain dict"""
+        checkpoint = {
+            'model_class': type(self).__name__,
+            'config': self.get_config(),
+            'state_dict': self.state_dict(),
+            'labels': self.labels,
+            'quantization': self.quantization,
+            'preprocessor': None,
+        }
+        if self.preprocessor is not None:
+            preprocessor = self.preprocessor
+            checkpoint['preprocessor'] = {
+                'max_sequence_length': preprocessor.max_sequence_length,
+                'vocab_size': preprocessor.vocab_size,
+                'min_word_freq': preprocessor.min_word_freq,
+                'lowercase': preprocessor.lowercase,
+                'remove_punctuation': preprocessor.remove_punctuation,
+                'vocabulary': list(preprocessor.vocabulary.itos),
+            }
+        return checkpoint
+
+    def save(self, path: str) -> Path:
+        """
+        Save a self-contained checkpoint (atomic replace)
+
+        Args:
+            path: Output .pt path
+
+        Returns:
+            Path written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        torch.save(self._checkpoint(), tmp_path)
+        os.replace(tmp_path, path)
+        logging.getLogger(__name__).info(f"Saved {type(self).__name__} to {path}")
+        return path
+
+    @classmethod
+    def _restore(cls, checkpoint: Dict[str, Any]) -> "BaseModel":
+        """Build a model from a loaded checkpoint dict"""
+        model_class = cls
+        if cls is BaseModel or cls.__name__ != checkpoint['model_class']:
+            model_class = MODEL_REGISTRY.get(checkpoint['model_class'])
+            if model_class is None:
+                raise ValueError(f"Unknown model class '{checkpoint['model_class']}'")
+            if not issubclass(model_class, cls):
+                raise TypeError(f"Checkpoint holds a {model_class.__name__}, not a {cls.__name__}")
+
+        model = model_class(**checkpoint['config'])
+        quantization = checkpoint.get('quantization')
+        if quantization:
+            # Rebuild the quantized modules so the packed weights fit
+            quantize_model(
+                model,
+                linear=quantization['linear'] is not None,
+                embedding_dtype=quantization['embedding']
+            )
+            model.quantization = quantization
+        model.load_state_dict(checkpoint['state_dict'])
+        model.labels = checkpoint.get('labels')
+
+        settings = checkpoint.get('preprocessor')
+        if settings is not None:
+            settings = dict(settings)
+            vocabulary = Vocabulary(settings.pop('vocabulary'))
+            model.preprocessor = LyricsPreprocessor(**settings)
+            model.preprocessor.vocabulary = vocabulary
+        return model.eval()
+
+    @classmethod
+    def load(cls, path: str, backend: str = 'eager', map_location: Union[str, torch.device] = 'cpu') -> "BaseModel":
+        """
+        Load a checkpoint written by save()
+
+        Args:
+            path: Checkpoint path
+            backend: Inference backend, see optimize_for_inference
+            map_location: Device for the weights
+
+        Returns:
+            Model in eval mode (``BaseModel.load`` returns the saved subclass)
+        """
+        checkpoint = torch.load(path, map_location=map_location, weights_only=True)
+        model = cls._restore(checkpoint)
+        if backend != 'eager':
+            model.optimize_for_inference(backend)
+        return model
@@ -0,0 +1,50 @@
+"""
+CNN Lyrics Classifier
+
+TextCNN bound to the project labels and a fitted preprocessor, so raw
+lyrics go in and per-label probabilities come out.
+"""
+
+from typing import Any, Dict, Optional
+
+from ..data.preprocessor import LyricsPreprocessor
+from .cnn_models import TextCNN
+
+
+class CNNClassifier(TextCNN):
+    """
+    TextCNN built from config with ``num_classes = len(config['labels'])``
+
+    The vocabulary size comes from the preprocessor, which is attached to
+    the model and saved in its checkpoint, so ``CNNClassifier.load(path)``
+    is enough to call ``predict`` / ``predict_proba`` on raw lyrics.
+    """
+
+    @classmethod
+    def build(
+        cls,
+        config: Dict[str, Any],
+        preprocessor: LyricsPreprocessor,
+        variant: Optional[str] = None,
+        **kwargs
+    ) -> "CNNClassifier":
+        """
+        Build an untrained classifier
+
+        Args:
+            config: Loaded configuration (``model`` and ``labels`` sections)
+            preprocessor: Fitted LyricsPreprocessor
+            variant: Key of ``cnn_variants`` in model_configs.yml
+            **kwargs: Extra TextCNN arguments (embedding, num_metadata_features, ...)
+
+        Returns:
+            CNNClassifier
+        """
+        if preprocessor.vocabulary is None:
+            raise ValueError("Preprocessor has no vocabulary; call fit() first")
+        labels = list(config.get("labels", []))
+        if labels:
+            kwargs.setdefault('num_classes', len(labels))
+        model = cls.from_config(config, len(preprocessor.vocabulary), variant=variant, **kwargs)
+        model.labels = labels or None
+        return model.attach_preprocessor(preprocessor)
@@ -3,4 +3,284 @@ Convolutional Neural Network Models
 
 CNN architectures for text classification using different filter sizes
 and pooling strategies optimized for music lyrics analysis.
-"""
\ No newline at end of file
+"""
+
+from typing import Any, Dict, Optional, Sequence, Union
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+from ..utils.helpers import DEFAULT_CONFIG_PATH, load_config
+from .base_model import BaseModel
+
+
+DEFAULT_MODEL_CONFIGS_PATH = DEFAULT_CONFIG_PATH.parent / "model_configs.yml"
+CONV_MODES = ('fused', 'loop')
+
+
+def masked_max_pool(features: torch.Tensor, lengths: torch.Tensor, widths: torch.Tensor) -> torch.Tensor:
+    """
+    Max over the window positions that lie inside each song
+
+    A filter of width k has valid positions t <= length - k; songs shorter
+    than k keep position 0, whose window runs into the padding.
+
+    Args:
+        features: Convolution output (batch x positions x channels)
+        lengths: Unpadded length per song (batch,)
+        widths: Filter width of every channel (channels,)
+
+    Returns:
+        Pooled features (batch x channels)
+    """
+    last_valid = (lengths[:, None] - widths[None, :]).clamp(min=0)
+    positions = torch.arange(features.shape[1], device=features.device)
+    padding = positions[None, :, None] > last_valid[:, None, :]
+    return features.masked_fill(padding, float('-inf')).amax(dim=1)
+
+
+class TextCNN(BaseModel):
+    """
+    Kim-style CNN over word embeddings with several filter widths
+
+    Parameters are stored per filter width (``convs``), exactly as in a
+    per-width ``nn.Conv1d`` loop, but the default ``conv_mode='fused'``
+    computes all widths in one pass over the embedded sequence: the weights
+    of every filter tap are stacked into a single (embedding_dim x taps)
+    matrix, one matmul projects each position onto all taps, and each
+    filter's output is the sum of its taps shifted by their offsets. This
+    is the same arithmetic as the loop (no zero-padded taps), with one
+    large GEMM instead of one convolution per width. ``conv_mode='loop'``
+    is the naive reference; ``scripts/benchmark_cnn.py`` compares both.
+
+    Max-pooling is masked so windows over padding never win, which makes
+    the output independent of how much a batch is padded. Optional
+    metadata features (e.g. TemporalFeatureExtractor output) are
+    concatenated to the pooled features before the classifier.
+
+    Inference (predict_batch, predict_stream) and checkpoints come from
+    BaseModel.
+    """
+
+    # Song positions per fused block (about 14 MB of projected taps at the default sizes)
+    FUSED_BLOCK_ROWS = 2048
+
+    def __init__(
+        self,
+        vocab_size: int,
+        embedding_dim: int = 300,
+        num_classes: int = 7,
+        filter_sizes: Sequence[int] = (2, 3, 4, 5),
+        num_filters: Union[int, Sequence[int]] = 128,
+        dropout: float = 0.5,
+        padding_idx: int = 0,
+        num_metadata_features: int = 0,
+        conv_mode: str = 'fused',
+        embedding: Optional[nn.Embedding] = None
+    ):
+        super().__init__()
+        if conv_mode not in CONV_MODES:
+            raise ValueError(f"Unknown conv_mode '{conv_mode}', expected one of {CONV_MODES}")
+        if isinstance(num_filters, int):
+            num_filters = [num_filters] * len(filter_sizes)
+        if len(num_filters) != len(filter_sizes):
+            raise ValueError("num_filters must be an int or have one entry per filter size")
+
+        self.filter_sizes = [int(size) for size in filter_sizes]
+        self.num_filters = [int(count) for count in num_filters]
+        self.padding_idx = padding_idx
+        self.num_metadata_features = num_metadata_features
+        self.conv_mode = conv_mode
+
+        if embedding is not None:
+            vocab_size, embedding_dim = embedding.weight.shape
+        self.embedding = embedding or nn.Embedding(vocab_size, embedding_dim, padding_idx=padding_idx)
+        self.embedding_dim = embedding_dim
+        self.convs = nn.ModuleList(
+            nn.Conv1d(embedding_dim, count, size) for size, count in zip(self.filter_sizes, self.num_filters)
+        )
+        self.vocab_size = vocab_size
+        self.dropout = nn.Dropout(dropout)
+        self.fc = nn.Linear(sum(self.num_filters) + num_metadata_features, num_classes)
+
+        # Fused layout: widths sorted in decreasing order, so the filters using
+        # tap j (width > j) are a prefix of the channels
+        order = sorted(range(len(self.filter_sizes)), key=lambda i: -self.filter_sizes[i])
+        self._fused_order = order
+        widths = torch.cat([
+            torch.full((self.num_filters[i],), self.filter_sizes[i], dtype=torch.long) for i in order
+        ])
+        offsets = torch.cumsum(torch.tensor([0] + [self.num_filters[i] for i in order[:-1]]), 0)
+        restore = torch.cat([
+            torch.arange(self.num_filters[i]) + offsets[order.index(i)] for i in range(len(order))
+        ])
+        self.register_buffer('_fused_widths', widths, persistent=False)
+        self.register_buffer('_fused_restore', restore, persistent=False)
+
+        # Set by prepare_for_quantization: the stacked taps as an nn.Linear
+        self.tap_projection: Optional[nn.Linear] = None
+        self.register_buffer('fused_bias', None)
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        vocab_size: int,
+        variant: Optional[str] = None,
+        model_configs: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> "TextCNN":
+        """
+        Build from the ``model`` config section, optionally overridden by a variant
+
+        Args:
+            config: Loaded configuration
+            vocab_size: Vocabulary size
+            variant: Key of ``cnn_variants`` in model_configs.yml (e.g. 'deep_cnn')
+            model_configs: Loaded model_configs.yml (read from config/ if omitted)
+            **kwargs: Extra constructor arguments (embedding, conv_mode, ...)
+
+        Returns:
+            TextCNN
+        """
+        params = dict(config.get("model", {}))
+        if variant is not None:
+            model_configs = model_configs or load_config(DEFAULT_MODEL_CONFIGS_PATH)
+            variants = model_configs.get("cnn_variants", {})
+            if variant not in variants:
+                raise KeyError(f"Unknown CNN variant '{variant}', expected one of {list(variants)}")
+            params.update(variants[variant])
+
+        names = ['embedding_dim', 'num_classes', 'filter_sizes', 'num_filters', 'dropout']
+        arguments = {name: params[name] for name in names if name in params}
+        arguments.update(kwargs)
+        return cls(vocab_size, **arguments)
+
+    def get_config(self) -> Dict[str, Any]:
+        """Constructor arguments (the embedding is restored from the weights)"""
+        return {
+            'vocab_size': self.vocab_size,
+            'embedding_dim': self.embedding_dim,
+            'num_classes': self.fc.out_features,
+            'filter_sizes': list(self.filter_sizes),
+            'num_filters': list(self.num_filters),
+            'dropout': self.dropout.p,
+            'padding_idx': self.padding_idx,
+            'num_metadata_features': self.num_metadata_features,
+            'conv_mode': self.conv_mode,
+        }
+
+    def _fused_weight(self) -> torch.Tensor:
+        """Tap-stacked weights: (embedding_dim x sum over taps of the filters using it)"""
+        blocks = []
+        for tap in range(max(self.filter_sizes)):
+            for i in self._fused_order:
+                if self.filter_sizes[i] > tap:
+                    blocks.append(self.convs[i].weight[:, :, tap])
+        return torch.cat(blocks).t()
+
+    def prepare_for_quantization(self) -> None:
+        """
+        Move the stacked taps into an nn.Linear for dynamic INT8 quantization
+
+        The per-width convolutions are dropped (only the fused path remains),
+        so the checkpoint holds the tap weights once.
+        """
+        if self.tap_projection is not None:
+            return
+        weight = self._fused_weight().detach()
+        self.tap_projection = nn.Linear(weight.shape[0], weight.shape[1], bias=False)
+        self.tap_projection.weight.data.copy_(weight.t())
+        self.fused_bias = torch.cat([self.convs[i].bias.detach() for i in self._fused_order])
+        self.convs = None
+        self.conv_mode = 'fused'
+
+    def _conv_fused(self, embedded: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+        weight = self._fused_weight() if self.tap_projection is None else None
+        # Blocks of songs keep the projected taps cache-sized
+        block = max(1, self.FUSED_BLOCK_ROWS // max(embedded.shape[1], 1))
+        if embedded.shape[0] <= block:
+            return self._conv_fused_block(embedded, lengths, weight)
+        return torch.cat([
+            self._conv_fused_block(part, part_lengths, weight)
+            for part, part_lengths in zip(embedded.split(block), lengths.split(block))
+        ])
+
+    def _conv_fused_block(
+        self,
+        embedded: torch.Tensor,
+        lengths: torch.Tensor,
+        weight: Optional[torch.Tensor]
+    ) -> torch.Tensor:
+        order = self._fused_order
+        widths = [self.filter_sizes[i] for i in order]
+        min_width, max_width = widths[-1], widths[0]
+        positions = max(embedded.shape[1], min_width) - min_width + 1
+
+        # One projection of every position onto all taps
+        embedded = F.pad(embedded, (0, 0, 0, positions + max_width - 1 - embedded.shape[1]))
+        if weight is None:
+            projected = self.tap_projection(embedded)
+        else:
+            projected = torch.matmul(embedded, weight)
+
+        start = 0
+        output = None
+        for tap in range(max_width):
+            channels = sum(self.num_filters[i] for i in order if self.filter_sizes[i] > tap)
+            shifted = projected[:, tap:tap + positions, start:start + channels]
+            if output is None:
+                output = shifted.clone()
+            else:
+                output[:, :, :channels] += shifted
+            start += channels
+
+        if self.fused_bias is not None:
+            bias = self.fused_bias
+        else:
+            bias = torch.cat([self.convs[i].bias for i in order])
+        pooled = masked_max_pool(output, lengths, self._fused_widths) + bias
+        return pooled[:, self._fused_restore]
+
+    def _conv_loop(self, embedded: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+        if self.convs is None:
+            raise ValueError("Quantized TextCNN only supports conv_mode='fused'")
+        inputs = embedded.transpose(1, 2)
+        pooled = []
+        for conv, width in zip(self.convs, self.filter_sizes):
+            padded = F.pad(inputs, (0, max(width - inputs.shape[2], 0)))
+            features = conv(padded).transpose(1, 2)
+            widths = torch.full((conv.out_channels,), width, device=features.device)
+            pooled.append(masked_max_pool(features, lengths, widths))
+        return torch.cat(pooled, dim=1)
+
+    def forward(
+        self,
+        token_ids: torch.Tensor,
+        lengths: Optional[torch.Tensor] = None,
+        metadata: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        """
+        Class logits
+
+        Args:
+            token_ids: Padded token ids (batch x max_length)
+            lengths: Unpadded lengths (default: count of non-padding tokens)
+            metadata: Extra features (batch x num_metadata_features)
+
+        Returns:
+            Logits (batch x num_classes)
+        """
+        if lengths is None:
+            lengths = (token_ids != self.padding_idx).sum(dim=1)
+        lengths = lengths.to(token_ids.device)
+        embedded = self.embedding(token_ids)
+
+        conv = self._conv_fused if self.conv_mode == 'fused' else self._conv_loop
+        features = F.relu(conv(embedded, lengths))
+        if self.num_metadata_features:
+            if metadata is None:
+                raise ValueError(f"Model expects {self.num_metadata_features} metadata features")
+            features = torch.cat([features, metadata.to(features.dtype)], dim=1)
+        return self.fc(self.dropout(features))
@@ -3,4 +3,158 @@ Model Evaluation Module
 
 Comprehensive evaluation metrics and analysis tools for classification
 performance on sensitive music content detection.
-"""
\ No newline at end of file
+"""
+
+import time
+import logging
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score
+
+from .base_model import BaseModel
+from .quantization import checkpoint_size
+
+
+class ModelEvaluator:
+    """
+    Multi-label metrics, throughput and quantization acceptance reports
+
+    Models are evaluated over batches of ``(token_ids, lengths, labels)``
+    as produced by ``create_dataloader`` (use ``shuffle=False``). Labels are
+    a binary matrix (songs x classes) or class ids, which are one-hot
+    encoded.
+    """
+
+    def __init__(self, labels: Optional[List[str]] = None, threshold: float = 0.5):
+        self.labels = labels
+        self.threshold = threshold
+        self.logger = logging.getLogger(__name__)
+
+    def predict(self, model: BaseModel, batches: Iterable[Tuple]) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Run a model over labeled batches
+
+        Args:
+            model: Trained model
+            batches: Iterable of (token_ids, lengths, labels)
+
+        Returns:
+            Tuple of (probabilities, targets, seconds spent in the model)
+        """
+        probabilities, targets = [], []
+        seconds = 0.0
+        for token_ids, lengths, labels in batches:
+            start = time.perf_counter()
+            probabilities.append(model.predict_batch(token_ids, lengths))
+            seconds += time.perf_counter() - start
+            targets.append(np.asarray(labels))
+
+        probabilities = np.vstack(probabilities)
+        targets = np.concatenate(targets)
+        if targets.ndim == 1:
+            targets = np.eye(probabilities.shape[1], dtype=np.int64)[targets]
+        return probabilities, targets.astype(np.int64), seconds
+
+    def compute_metrics(self, targets: np.ndarray, probabilities: np.ndarray) -> Dict[str, Any]:
+        """
+        Threshold and ranking metrics
+
+        Args:
+            targets: Binary matrix (songs x classes)
+            probabilities: Predicted probabilities (songs x classes)
+
+        Returns:
+            Dict with f1_macro, f1_micro, precision_macro, recall_macro,
+            roc_auc_macro (over classes with both outcomes) and per_class_f1
+        """
+        predictions = (probabilities >= self.threshold).astype(np.int64)
+        labels = self.labels or [f"class_{i}" for i in range(targets.shape[1])]
+        per_class = f1_score(targets, predictions, average=None, zero_division=0)
+
+        scored = [i for i in range(targets.shape[1]) if 0 < targets[:, i].sum() < len(targets)]
+        roc_auc = (
+            float(np.mean([roc_auc_score(targets[:, i], probabilities[:, i]) for i in scored]))
+            if scored else float('nan')
+        )
+        return {
+            'f1_macro': float(f1_score(targets, predictions, average='macro', zero_division=0)),
+            'f1_micro': float(f1_score(targets, predictions, average='micro', zero_division=0)),
+            'precision_macro': float(precision_score(targets, predictions, average='macro', zero_division=0)),
+            'recall_macro': float(recall_score(targets, predictions, average='macro', zero_division=0)),
+            'roc_auc_macro': roc_auc,
+            'per_class_f1': {label: float(score) for label, score in zip(labels, per_class)},
+        }
+
+    def evaluate(self, model: BaseModel, batches: Iterable[Tuple]) -> Dict[str, Any]:
+        """
+        Metrics and throughput of a model
+
+        Args:
+            model: Trained model
+            batches: Iterable of (token_ids, lengths, labels)
+
+        Returns:
+            compute_metrics() output plus ``songs_per_second``
+        """
+        probabilities, targets, seconds = self.predict(model, batches)
+        metrics = self.compute_metrics(targets, probabilities)
+        metrics['songs_per_second'] = len(targets) / seconds if seconds > 0 else float('inf')
+        return metrics
+
+    def compare(
+        self,
+        reference: BaseModel,
+        candidate: BaseModel,
+        batches: Iterable[Tuple],
+        max_f1_drop: float = 0.01
+    ) -> Dict[str, Any]:
+        """
+        Accuracy delta, speedup and size ratio of a candidate (e.g. quantized) model
+
+        Args:
+            reference: Original model
+            candidate: Model to accept or reject
+            batches: Re-iterable batches (e.g. a DataLoader with shuffle=False)
+            max_f1_drop: Largest accepted drop in macro F1
+
+        Returns:
+            Report dict; ``accepted`` is True when the macro F1 drop is
+            within ``max_f1_drop``
+        """
+        ref_probs, targets, ref_seconds = self.predict(reference, batches)
+        cand_probs, cand_targets, cand_seconds = self.predict(candidate, batches)
+        if not np.array_equal(targets, cand_targets):
+            raise ValueError("Batches must be yielded in the same order for both models (use shuffle=False)")
+
+        ref_metrics = self.compute_metrics(targets, ref_probs)
+        cand_metrics = self.compute_metrics(targets, cand_probs)
+        ref_size, cand_size = checkpoint_size(reference), checkpoint_size(candidate)
+        f1_delta = cand_metrics['f1_macro'] - ref_metrics['f1_macro']
+
+        report = {
+            'reference': ref_metrics,
+            'candidate': cand_metrics,
+            'f1_macro_delta': f1_delta,
+            'per_class_f1_delta': {
+                label: cand_metrics['per_class_f1'][label] - score
+                for label, score in ref_metrics['per_class_f1'].items()
+            },
+            'prediction_agreement': float(
+                ((ref_probs >= self.threshold) == (cand_probs >= self.threshold)).mean()
+            ),
+            'max_probability_delta': float(np.abs(ref_probs - cand_probs).max()),
+            'reference_ms_per_song': 1000 * ref_seconds / len(targets),
+            'candidate_ms_per_song': 1000 * cand_seconds / len(targets),
+            'speedup': ref_seconds / cand_seconds if cand_seconds > 0 else float('inf'),
+            'reference_size_bytes': ref_size,
+            'candidate_size_bytes': cand_size,
+            'compression': ref_size / cand_size,
+            'max_f1_drop': max_f1_drop,
+            'accepted': bool(f1_delta >= -max_f1_drop),
+        }
+        self.logger.info(
+            f"Candidate F1 delta {f1_delta:+.4f}, speedup {report['speedup']:.2f}x, "
+            f"compression {report['compression']:.2f}x -> {'accepted' if report['accepted'] else 'rejected'}"
+        )
+        return report
@@ -0,0 +1,108 @@
+"""
+Post-Training Quantization
+
+Shrinks trained classifiers for CPU inference without retraining:
+- dynamic INT8 quantization of linear layers (weights stored as int8,
+  activations quantized on the fly per batch)
+- float16 or per-row int8 embedding tables
+"""
+
+import io
+from typing import Dict, Optional
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+
+EMBEDDING_DTYPES = ('float16', 'int8')
+
+
+class CompactEmbedding(nn.Module):
+    """
+    Read-only embedding table stored as float16 or per-row symmetric int8
+
+    int8 rows are ``round(row / scale)`` with ``scale = max|row| / 127``;
+    lookups gather the compact rows and rescale only the ones used, so the
+    full float32 table never exists in memory.
+    """
+
+    def __init__(self, num_embeddings: int, embedding_dim: int, dtype: str = 'int8'):
+        super().__init__()
+        if dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype '{dtype}', expected one of {EMBEDDING_DTYPES}")
+        self.dtype = dtype
+        storage = torch.int8 if dtype == 'int8' else torch.float16
+        self.register_buffer('weight', torch.zeros(num_embeddings, embedding_dim, dtype=storage))
+        self.register_buffer('scale', torch.ones(num_embeddings if dtype == 'int8' else 0))
+
+    @classmethod
+    def from_embedding(cls, embedding: nn.Embedding, dtype: str = 'int8') -> "CompactEmbedding":
+        """
+        Compress a trained nn.Embedding
+
+        Args:
+            embedding: Source table
+            dtype: 'float16' or 'int8'
+
+        Returns:
+            CompactEmbedding
+        """
+        weight = embedding.weight.detach().float()
+        compact = cls(weight.shape[0], weight.shape[1], dtype)
+        if dtype == 'int8':
+            scale = weight.abs().amax(dim=1).clamp(min=1e-8) / 127.0
+            compact.weight.copy_(torch.round(weight / scale[:, None]).to(torch.int8))
+            compact.scale.copy_(scale)
+        else:
+            compact.weight.copy_(weight.half())
+        return compact
+
+    def forward(self, token_ids: torch.Tensor) -> torch.Tensor:
+        rows = F.embedding(token_ids, self.weight).float()
+        if self.dtype == 'int8':
+            rows = rows * self.scale[token_ids].unsqueeze(-1)
+        return rows
+
+
+def quantize_model(model: nn.Module, linear: bool = True, embedding_dtype: Optional[str] = 'int8') -> nn.Module:
+    """
+    Quantize a model in place for CPU inference
+
+    Models may define ``prepare_for_quantization()`` to move compute into
+    nn.Linear layers first (TextCNN stacks its convolution taps into one).
+
+    Args:
+        model: Trained model (put in eval mode)
+        linear: Dynamic INT8 quantization of every nn.Linear
+        embedding_dtype: 'float16', 'int8' or None to keep float32 embeddings
+
+    Returns:
+        The same model, quantized
+    """
+    model.eval()
+    if hasattr(model, 'prepare_for_quantization'):
+        model.prepare_for_quantization()
+
+    if embedding_dtype is not None:
+        embeddings = [(name, module) for name, module in model.named_modules() if isinstance(module, nn.Embedding)]
+        for name, module in embeddings:
+            parent_name, _, attribute = name.rpartition('.')
+            parent = model.get_submodule(parent_name) if parent_name else model
+            setattr(parent, attribute, CompactEmbedding.from_embedding(module, embedding_dtype))
+
+    if linear:
+        torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def checkpoint_size(model: nn.Module) -> int:
+    """Serialized size of the model weights in bytes"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def quantization_spec(linear: bool, embedding_dtype: Optional[str]) -> Dict[str, Optional[str]]:
+    """How a model was quantized, as stored in its checkpoint"""
+    return {'linear': 'qint8' if linear else None, 'embedding': embedding_dtype}
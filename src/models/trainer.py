@@ -3,4 +3,266 @@ Model Training Module
 
 Unified training interface supporting different neural network architectures
 with experiment tracking, checkpointing, and hyperparameter optimization.
-"""
\ No newline at end of file
+"""
+
+import copy
+import time
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import torch
+from torch import nn
+
+from ..data.batching import TokenizedLyricsDataset, create_dataloader
+from ..data.preprocessor import LyricsPreprocessor, TokenizedCorpus
+from .base_model import BaseModel
+from .cnn_classifier import CNNClassifier
+from .evaluator import ModelEvaluator
+
+
+MIXED_PRECISION_MODES = ('bf16', 'none')
+
+
+class CNNTrainer:
+    """
+    Multi-label trainer for BaseModel classifiers over a tokenized corpus
+
+    Reads the ``training`` config section:
+
+        batch_size, epochs, learning_rate, weight_decay   AdamW schedule
+        patience                 epochs without a lower val_loss before stopping
+        gradient_accumulation_steps
+                                 optimizer step every N batches, so the
+                                 effective batch is batch_size * N
+        mixed_precision          'bf16' runs forward/backward under bfloat16
+                                 autocast (CPU or GPU); weights, optimizer
+                                 state and the loss stay float32, so no loss
+                                 scaling is needed
+        num_workers              DataLoader worker processes; each maps the
+                                 corpus itself and workers persist across
+                                 epochs
+        prefetch_factor          batches prepared ahead per worker
+        pin_memory               page-locked batches when training on a GPU
+        num_threads              torch.set_num_threads for the main process
+        max_grad_norm            gradient clipping (null disables)
+        checkpoint_dir           best model is saved there with BaseModel.save
+
+    Batches come from ``create_dataloader`` (length-bucketed, padded per
+    batch). ``sample_weights`` (one per training song, e.g.
+    ``compute_sample_weights`` over the training split) make each epoch draw
+    its songs with replacement in proportion to their weight. After training
+    the model holds the weights of its best epoch.
+    """
+
+    def __init__(
+        self,
+        model: BaseModel,
+        config: Dict[str, Any],
+        train_dataset: TokenizedLyricsDataset,
+        val_dataset: Optional[TokenizedLyricsDataset] = None,
+        device: Optional[Union[str, torch.device]] = None,
+        sample_weights: Optional[np.ndarray] = None
+    ):
+        if train_dataset.labels is None:
+            raise ValueError("Training dataset has no labels")
+        if sample_weights is not None and len(sample_weights) != len(train_dataset):
+            raise ValueError(f"Got {len(sample_weights)} sample weights for {len(train_dataset)} training songs")
+        if val_dataset is not None and (val_dataset.labels is None or len(val_dataset) == 0):
+            raise ValueError("Validation dataset must be labeled and non-empty (pass None to skip validation)")
+        params = config.get("training", {})
+        self.model = model
+        self.config = config
+        self.train_dataset = train_dataset
+        self.val_dataset = val_dataset
+        self.sample_weights = None if sample_weights is None else np.asarray(sample_weights, dtype=np.float64)
+        self.device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+
+        self.batch_size = params.get("batch_size", 32)
+        self.epochs = params.get("epochs", 50)
+        self.learning_rate = params.get("learning_rate", 0.001)
+        self.weight_decay = params.get("weight_decay", 0.0)
+        self.patience = params.get("patience", 10)
+        self.accumulation_steps = max(1, params.get("gradient_accumulation_steps", 1))
+        self.mixed_precision = params.get("mixed_precision", "bf16") or "none"
+        self.num_workers = params.get("num_workers", 0)
+        self.prefetch_factor = params.get("prefetch_factor", 2)
+        self.pin_memory = params.get("pin_memory", True) and self.device.type == 'cuda'
+        self.max_grad_norm = params.get("max_grad_norm")
+        self.seed = config.get("data", {}).get("random_state", 42)
+        checkpoint_dir = params.get("checkpoint_dir")
+        self.checkpoint_path = None
+        if checkpoint_dir:
+            name = config.get("experiment", {}).get("name", "model")
+            self.checkpoint_path = Path(checkpoint_dir) / f"{name}.pt"
+
+        if self.mixed_precision not in MIXED_PRECISION_MODES:
+            raise ValueError(
+                f"Unknown mixed_precision '{self.mixed_precision}', expected one of {MIXED_PRECISION_MODES}"
+            )
+        num_threads = params.get("num_threads")
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.evaluator = ModelEvaluator(labels=model.labels)
+        self.history: Dict[str, List[float]] = {}
+        self.best_epoch: Optional[int] = None
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_corpus(
+        cls,
+        config: Dict[str, Any],
+        preprocessor: LyricsPreprocessor,
+        corpus: Union[TokenizedCorpus, str, Path],
+        labels: np.ndarray,
+        train_indices: Sequence[int],
+        val_indices: Optional[Sequence[int]] = None,
+        variant: Optional[str] = None,
+        **kwargs
+    ) -> "CNNTrainer":
+        """
+        Trainer for a new CNNClassifier over corpus rows
+
+        Args:
+            config: Loaded configuration
+            preprocessor: Fitted preprocessor that wrote the corpus
+            corpus: TokenizedCorpus or its directory
+            labels: Binary label matrix aligned with the corpus rows
+            train_indices: Corpus rows used for training (e.g. from DataSplitter)
+            val_indices: Corpus rows used for validation
+            variant: Key of ``cnn_variants`` in model_configs.yml
+            **kwargs: Extra CNNTrainer arguments (device, sample_weights aligned
+                with train_indices)
+
+        Returns:
+            CNNTrainer
+        """
+        labels = np.asarray(labels, dtype=np.float32)
+        train_indices = np.asarray(train_indices, dtype=np.int64)
+        train_dataset = TokenizedLyricsDataset(corpus, labels[train_indices], train_indices)
+        val_dataset = None
+        if val_indices is not None:
+            val_indices = np.asarray(val_indices, dtype=np.int64)
+            val_dataset = TokenizedLyricsDataset(corpus, labels[val_indices], val_indices)
+
+        model = CNNClassifier.build(config, preprocessor, variant=variant)
+        return cls(model, config, train_dataset, val_dataset, **kwargs)
+
+    def _dataloader(
+        self,
+        dataset: TokenizedLyricsDataset,
+        shuffle: bool,
+        sample_weights: Optional[np.ndarray] = None
+    ):
+        loader_kwargs = {'num_workers': self.num_workers, 'pin_memory': self.pin_memory}
+        if self.num_workers > 0:
+            loader_kwargs.update(persistent_workers=True, prefetch_factor=self.prefetch_factor)
+        return create_dataloader(
+            dataset, self.batch_size, shuffle=shuffle, seed=self.seed, sample_weights=sample_weights, **loader_kwargs
+        )
+
+    def _autocast(self):
+        return torch.autocast(
+            device_type=self.device.type, dtype=torch.bfloat16, enabled=self.mixed_precision == 'bf16'
+        )
+
+    def _train_epoch(self, loader, optimizer: torch.optim.Optimizer, criterion: nn.Module) -> float:
+        self.model.train()
+        optimizer.zero_grad(set_to_none=True)
+        total_loss, total_songs = 0.0, 0
+        num_batches = len(loader)
+        for step, (token_ids, lengths, labels) in enumerate(loader):
+            token_ids = token_ids.to(self.device, non_blocking=True)
+            lengths = lengths.to(self.device, non_blocking=True)
+            labels = labels.to(self.device, dtype=torch.float32, non_blocking=True)
+
+            with self._autocast():
+                logits = self.model(token_ids, lengths)
+            loss = criterion(logits.float(), labels)
+
+            # The last group may be short; average over the batches it has
+            group_start = step - step % self.accumulation_steps
+            group_size = min(self.accumulation_steps, num_batches - group_start)
+            (loss / group_size).backward()
+            if step - group_start == group_size - 1:
+                if self.max_grad_norm:
+                    nn.utils.clip_grad_norm_(self.model.parameters(), self.max_grad_norm)
+                optimizer.step()
+                optimizer.zero_grad(set_to_none=True)
+
+            total_loss += loss.item() * len(labels)
+            total_songs += len(labels)
+        return total_loss / max(total_songs, 1)
+
+    def _validate(self, loader, criterion: nn.Module) -> Dict[str, float]:
+        self.model.eval()
+        probabilities, targets = [], []
+        total_loss = 0.0
+        with torch.inference_mode(), self._autocast():
+            for token_ids, lengths, labels in loader:
+                logits = self.model(token_ids.to(self.device), lengths.to(self.device)).float()
+                labels = labels.to(self.device, dtype=torch.float32)
+                total_loss += criterion(logits, labels).item() * len(labels)
+                probabilities.append(torch.sigmoid(logits).cpu().numpy())
+                targets.append(labels.cpu().numpy())
+
+        targets = np.concatenate(targets).astype(np.int64)
+        metrics = self.evaluator.compute_metrics(targets, np.vstack(probabilities))
+        return {'val_loss': total_loss / len(targets), 'val_f1': metrics['f1_macro']}
+
+    def train(self) -> Dict[str, List[float]]:
+        """
+        Train with early stopping on validation loss
+
+        Returns:
+            History with per-epoch ``train_loss``, ``val_loss``, ``val_f1``
+            (validation lists stay empty without a validation set) and
+            ``songs_per_second``
+        """
+        self.model.to(self.device)
+        torch.manual_seed(self.seed)
+        train_loader = self._dataloader(self.train_dataset, shuffle=True, sample_weights=self.sample_weights)
+        val_loader = self._dataloader(self.val_dataset, shuffle=False) if self.val_dataset is not None else None
+        optimizer = torch.optim.AdamW(
+            self.model.parameters(), lr=self.learning_rate, weight_decay=self.weight_decay
+        )
+        criterion = nn.BCEWithLogitsLoss()
+
+        self.history = {'train_loss': [], 'val_loss': [], 'val_f1': [], 'songs_per_second': []}
+        best_loss, best_state, stale_epochs = float('inf'), None, 0
+        self.best_epoch = None
+
+        for epoch in range(self.epochs):
+            train_loader.batch_sampler.set_epoch(epoch)
+            start = time.perf_counter()
+            train_loss = self._train_epoch(train_loader, optimizer, criterion)
+            self.history['train_loss'].append(train_loss)
+            self.history['songs_per_second'].append(len(self.train_dataset) / (time.perf_counter() - start))
+
+            message = f"Epoch {epoch + 1}/{self.epochs}: train_loss={train_loss:.4f}"
+            monitored = train_loss
+            if val_loader is not None:
+                metrics = self._validate(val_loader, criterion)
+                self.history['val_loss'].append(metrics['val_loss'])
+                self.history['val_f1'].append(metrics['val_f1'])
+                message += f", val_loss={metrics['val_loss']:.4f}, val_f1={metrics['val_f1']:.4f}"
+                monitored = metrics['val_loss']
+            self.logger.info(message)
+
+            if monitored < best_loss:
+                best_loss, stale_epochs, self.best_epoch = monitored, 0, epoch
+                best_state = copy.deepcopy(self.model.state_dict())
+                if self.checkpoint_path is not None:
+                    self.model.save(self.checkpoint_path)
+            else:
+                stale_epochs += 1
+                if val_loader is not None and stale_epochs >= self.patience:
+                    self.logger.info(f"Early stopping after epoch {epoch + 1} (best: {self.best_epoch + 1})")
+                    break
+
+        if best_state is not None:
+            self.model.load_state_dict(best_state)
+        self.model.eval()
+        return self.history
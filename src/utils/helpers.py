@@ -3,4 +3,82 @@ General Utility Functions
 
 Common helper functions used across the project for file handling,
 logging, configuration management, and data utilities.
-"""
\ No newline at end of file
+"""
+
+import hashlib
+import yaml
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "config.yml"
+
+
+def load_config(config_path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Load the project YAML configuration
+
+    Args:
+        config_path: Path to configuration file (defaults to config/config.yml)
+
+    Returns:
+        Dict with configuration values (empty if the file does not exist)
+    """
+    path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _canonical_strings(series: pd.Series) -> List[str]:
+    """String form of a column that is stable across dtypes (1990 == 1990.0, null == '')"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.dropna()
+        if len(values) == 0 or (values % 1 == 0).all():
+            series = series.astype("Int64")
+    return ["" if pd.isna(value) else str(value) for value in series]
+
+
+def stable_row_hashes(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """
+    Hash rows to 64-bit keys that are stable across runs, dtypes and versions
+
+    Unlike ``pd.util.hash_pandas_object``, the key only depends on the
+    string form of the values, so it can be persisted and compared later.
+
+    Args:
+        df: Input dataframe
+        columns: Columns identifying a row
+
+    Returns:
+        np.ndarray: uint64 key per row
+    """
+    parts = [_canonical_strings(df[col]) for col in columns]
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=8).digest(), "little")
+            for row in zip(*parts)
+        ),
+        dtype=np.uint64,
+        count=len(df)
+    )
+
+
+def compute_decade(years: Union[pd.Series, Sequence, np.ndarray]) -> pd.Series:
+    """
+    Decade of each year (1987 -> 1980)
+
+    Non-numeric or missing years stay missing, so the result is a nullable
+    Int16 series (keeping the index of a Series input).
+
+    Args:
+        years: Year values
+
+    Returns:
+        pd.Series: Decade per row
+    """
+    values = pd.to_numeric(pd.Series(years), errors='coerce')
+    return ((values // 10) * 10).astype('Int16')
@@ -0,0 +1,110 @@
+"""
+Testes da interface comum de inferência e persistência dos modelos
+"""
+
+import shutil
+import pytest
+import numpy as np
+import torch
+
+from src.data.preprocessor import LyricsPreprocessor
+from src.models.base_model import BaseModel
+from src.models.cnn_classifier import CNNClassifier
+
+
+LYRICS = ["love you baby", "kill the night", "la la la la", "", None, "baby baby love " * 40]
+
+
+@pytest.fixture
+def classifier(mock_config):
+    """Classificador pequeno com preprocessador ajustado"""
+    torch.manual_seed(0)
+    preprocessor = LyricsPreprocessor(max_sequence_length=64, min_word_freq=1)
+    preprocessor.fit(LYRICS, n_jobs=1)
+    config = dict(mock_config, labels=['violence', 'depression', 'clean'])
+    return CNNClassifier.build(config, preprocessor)
+
+
+class TestBaseModel:
+    """Testes de predict_batch, predict_stream e save/load"""
+
+    @pytest.mark.unit
+    def test_base_model_is_abstract(self):
+        """Testa que a classe base não é instanciável"""
+        with pytest.raises(TypeError):
+            BaseModel()
+
+    @pytest.mark.unit
+    def test_predict_batch_ignores_extra_padding(self, classifier):
+        """Testa se colunas além do maior comprimento não mudam o resultado"""
+        token_ids, lengths = classifier.preprocessor.encode(LYRICS)
+        probabilities = classifier.predict_batch(token_ids, lengths)
+
+        assert probabilities.shape == (len(LYRICS), 3)
+        assert ((probabilities > 0) & (probabilities < 1)).all()
+        np.testing.assert_allclose(probabilities[:2], classifier.predict_batch(token_ids[:2, :3], lengths[:2]))
+
+    @pytest.mark.unit
+    def test_predict_stream_is_lazy_and_ordered(self, classifier):
+        """Testa se o streaming lê a entrada por lotes e preserva a ordem"""
+        consumed = []
+
+        def lyrics():
+            for text in LYRICS * 3:
+                consumed.append(text)
+                yield text
+
+        stream = classifier.predict_stream(lyrics(), batch_size=4)
+        first = next(stream)
+        assert first.shape == (4, 3)
+        assert len(consumed) <= 12
+
+        batches = [first] + list(stream)
+        assert [len(batch) for batch in batches] == [4, 4, 4, 4, 2]
+        np.testing.assert_allclose(np.vstack(batches), classifier.predict_proba(LYRICS * 3, batch_size=5), rtol=1e-5)
+        assert classifier.predict(LYRICS).dtype == np.int64
+
+    @pytest.mark.unit
+    def test_save_load_round_trip(self, classifier, temp_dir):
+        """Testa se o checkpoint restaura classe, pesos, rótulos e preprocessador"""
+        path = classifier.save(temp_dir / "model.pt")
+        loaded = BaseModel.load(path)
+
+        assert isinstance(loaded, CNNClassifier)
+        assert loaded.labels == ['violence', 'depression', 'clean']
+        assert loaded.preprocessor.vocabulary.itos == classifier.preprocessor.vocabulary.itos
+        np.testing.assert_allclose(loaded.predict_proba(LYRICS), classifier.predict_proba(LYRICS))
+
+    @pytest.mark.unit
+    def test_compile_backend_selected_at_load(self, classifier, temp_dir, monkeypatch):
+        """Testa se backend='compile' usa o módulo compilado na inferência"""
+        calls = []
+
+        def fake_compile(module, **kwargs):
+            calls.append(kwargs)
+            return module
+
+        monkeypatch.setattr(torch, "compile", fake_compile)
+        loaded = CNNClassifier.load(classifier.save(temp_dir / "model.pt"), backend='compile')
+
+        assert calls == [{'dynamic': True}] and loaded.backend == 'compile'
+        assert list(loaded.state_dict()) == list(classifier.state_dict())
+        assert loaded.predict_proba(LYRICS).shape == (len(LYRICS), 3)
+        with pytest.raises(ValueError):
+            loaded.optimize_for_inference('tensorrt')
+
+    @pytest.mark.unit
+    @pytest.mark.slow
+    @pytest.mark.skipif(
+        not hasattr(torch, "compile") or shutil.which("cc") is None,
+        reason="torch.compile ou compilador C indisponível"
+    )
+    def test_real_compile_backend(self, classifier, temp_dir):
+        """Testa inferência com torch.compile real, em modelos float e quantizados"""
+        expected = classifier.predict_proba(LYRICS)
+        loaded = BaseModel.load(classifier.save(temp_dir / "model.pt"), backend='compile')
+        np.testing.assert_allclose(loaded.predict_proba(LYRICS), expected, rtol=1e-4, atol=1e-5)
+
+        quantized = classifier.quantize().optimize_for_inference('compile')
+        assert quantized.predict_proba(LYRICS).shape == expected.shape
+
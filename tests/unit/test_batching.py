@@ -0,0 +1,124 @@
+"""
+Testes do agrupamento de lotes por comprimento
+"""
+
+import pickle
+import pytest
+import numpy as np
+
+from src.data.batching import BucketBatchSampler, TokenizedLyricsDataset, create_dataloader, pad_collate
+from src.data.preprocessor import LyricsPreprocessor
+
+
+@pytest.fixture
+def variable_length_corpus(temp_dir):
+    """Corpus com letras de comprimentos variados"""
+    rng = np.random.default_rng(0)
+    texts = [" ".join(["la"] * int(n)) for n in rng.integers(1, 60, size=200)]
+    preprocessor = LyricsPreprocessor(max_sequence_length=64, min_word_freq=1)
+    return preprocessor.process_corpus(texts, str(temp_dir / "corpus"))
+
+
+class TestBucketBatchSampler:
+    """Testes do sampler por comprimento"""
+
+    @pytest.mark.unit
+    def test_every_song_is_sampled_once(self):
+        """Testa se cada música aparece exatamente uma vez por época"""
+        lengths = np.random.default_rng(1).integers(1, 500, size=1003)
+        for shuffle in (True, False):
+            sampler = BucketBatchSampler(lengths, batch_size=32, shuffle=shuffle, pool_factor=5)
+            batches = list(sampler)
+            assert len(batches) == len(sampler)
+            assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+    @pytest.mark.unit
+    def test_buckets_reduce_padding(self):
+        """Testa se os lotes agrupados têm bem menos preenchimento que lotes aleatórios"""
+        lengths = np.random.default_rng(2).integers(1, 512, size=4000)
+        sampler = BucketBatchSampler(lengths, batch_size=32, shuffle=True)
+
+        def padded_tokens(batches):
+            return sum(len(batch) * lengths[batch].max() for batch in batches)
+
+        bucketed = padded_tokens([np.array(batch) for batch in sampler])
+        random_batches = np.array_split(np.random.default_rng(3).permutation(len(lengths)), len(sampler))
+        assert bucketed < 0.6 * padded_tokens(random_batches)
+
+    @pytest.mark.unit
+    def test_shuffle_is_seeded_per_epoch(self):
+        """Testa reprodutibilidade do embaralhamento e variação entre épocas"""
+        lengths = np.arange(300) % 37
+        first = list(BucketBatchSampler(lengths, batch_size=16, seed=7))
+        assert first == list(BucketBatchSampler(lengths, batch_size=16, seed=7))
+
+        sampler = BucketBatchSampler(lengths, batch_size=16, seed=7)
+        sampler.set_epoch(1)
+        assert list(sampler) != first
+
+    @pytest.mark.unit
+    def test_drop_last_length(self):
+        """Testa o número de lotes com drop_last"""
+        lengths = np.ones(100, dtype=int)
+        sampler = BucketBatchSampler(lengths, batch_size=32, pool_factor=2, drop_last=True)
+        batches = list(sampler)
+        # Pools of 64 songs: 2 full batches from the first, 1 from the remaining 36
+        assert len(batches) == len(sampler) == 3
+        assert all(len(batch) == 32 for batch in batches)
+
+    @pytest.mark.unit
+    def test_weights_oversample_rare_songs(self):
+        """Testa se os pesos sorteiam músicas raras com mais frequência em cada época"""
+        lengths = np.random.default_rng(4).integers(1, 100, size=400)
+        rare = np.arange(400) < 20
+        weights = np.where(rare, 19.0, 1.0)
+        sampler = BucketBatchSampler(lengths, batch_size=16, seed=3, weights=weights)
+
+        drawn = np.concatenate([np.array(batch) for batch in sampler])
+        assert len(drawn) == len(lengths) and len(list(sampler)) == len(sampler)
+        assert 0.4 < rare[drawn].mean() < 0.6
+
+        with pytest.raises(ValueError):
+            BucketBatchSampler(lengths, batch_size=16, shuffle=False, weights=weights)
+        with pytest.raises(ValueError):
+            BucketBatchSampler(lengths, batch_size=16, weights=weights[:10])
+
+
+class TestPaddedBatches:
+    """Testes do preenchimento até o maior comprimento do lote"""
+
+    @pytest.mark.unit
+    def test_pad_collate_pads_to_batch_max(self):
+        """Testa preenchimento até o maior item do lote"""
+        batch = [(np.array([5, 6, 7]), np.array([1, 0])), (np.array([8]), np.array([0, 1]))]
+        token_ids, lengths, labels = pad_collate(batch, min_length=2)
+
+        assert token_ids.tolist() == [[5, 6, 7], [8, 0, 0]]
+        assert lengths.tolist() == [3, 1]
+        assert labels.tolist() == [[1, 0], [0, 1]]
+        assert pad_collate([(np.array([4]), None)], min_length=3)[0].tolist() == [[4, 0, 0]]
+
+    @pytest.mark.unit
+    def test_dataloader_over_memmap_corpus(self, variable_length_corpus):
+        """Testa o DataLoader sobre o corpus em memória mapeada"""
+        labels = np.arange(len(variable_length_corpus)) % 7
+        dataset = TokenizedLyricsDataset(variable_length_corpus, labels=labels)
+        loader = create_dataloader(dataset, batch_size=16, shuffle=False)
+
+        seen = 0
+        for token_ids, lengths, batch_labels in loader:
+            assert token_ids.shape[1] == lengths.max()
+            assert (token_ids[:, 0] != 0).all()
+            seen += len(batch_labels)
+        assert seen == len(variable_length_corpus)
+
+    @pytest.mark.unit
+    def test_dataset_pickles_without_data(self, variable_length_corpus):
+        """Testa se o dataset é serializado sem copiar o memmap"""
+        dataset = TokenizedLyricsDataset(variable_length_corpus, indices=np.arange(10, 20))
+        payload = pickle.dumps(dataset)
+        assert len(payload) < variable_length_corpus.tokens.nbytes
+
+        restored = pickle.loads(payload)
+        np.testing.assert_array_equal(restored[0][0], dataset[0][0])
+        np.testing.assert_array_equal(restored.lengths, variable_length_corpus.lengths[10:20])
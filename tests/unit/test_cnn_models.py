@@ -0,0 +1,79 @@
+"""
+Testes da CNN de texto
+"""
+
+import pytest
+import torch
+
+from src.models.cnn_models import TextCNN, masked_max_pool
+
+
+@pytest.fixture
+def padded_batch():
+    """Lote preenchido com comprimentos variados, inclusive menores que o filtro"""
+    torch.manual_seed(0)
+    lengths = torch.tensor([30, 12, 5, 1, 3, 2])
+    token_ids = torch.randint(1, 200, (len(lengths), 30))
+    token_ids[torch.arange(30)[None, :] >= lengths[:, None]] = 0
+    return token_ids, lengths
+
+
+class TestTextCNN:
+    """Testes da convolução fundida e do pooling mascarado"""
+
+    @pytest.mark.unit
+    def test_fused_matches_loop(self, padded_batch):
+        """Testa se a convolução fundida equivale ao laço por largura"""
+        token_ids, lengths = padded_batch
+        model = TextCNN(200, embedding_dim=16, filter_sizes=[2, 5, 3], num_filters=[4, 6, 8]).eval()
+        # Small blocks also exercise the blockwise path
+        model.FUSED_BLOCK_ROWS = 40
+
+        fused = model(token_ids, lengths)
+        model.conv_mode = 'loop'
+        loop = model(token_ids, lengths)
+        torch.testing.assert_close(fused, loop, rtol=1e-5, atol=1e-5)
+
+    @pytest.mark.unit
+    def test_fused_gradients_match_loop(self, padded_batch):
+        """Testa se os gradientes dos filtros são os mesmos nos dois modos"""
+        token_ids, lengths = padded_batch
+        model = TextCNN(200, embedding_dim=16, num_filters=4, dropout=0.0)
+
+        gradients = {}
+        for mode in ('fused', 'loop'):
+            model.zero_grad()
+            model.conv_mode = mode
+            model(token_ids, lengths).pow(2).sum().backward()
+            gradients[mode] = [conv.weight.grad.clone() for conv in model.convs]
+        for fused, loop in zip(gradients['fused'], gradients['loop']):
+            torch.testing.assert_close(fused, loop, rtol=1e-4, atol=1e-5)
+
+    @pytest.mark.unit
+    def test_extra_padding_does_not_change_output(self, padded_batch):
+        """Testa se o preenchimento extra é ignorado pelo pooling"""
+        token_ids, lengths = padded_batch
+        model = TextCNN(200, embedding_dim=16, num_filters=4).eval()
+        longer = torch.cat([token_ids, torch.zeros(len(lengths), 9, dtype=torch.long)], dim=1)
+
+        torch.testing.assert_close(model(token_ids), model(longer, lengths))
+
+    @pytest.mark.unit
+    def test_masked_max_pool(self):
+        """Testa se posições além do comprimento não vencem o máximo"""
+        features = torch.tensor([[[1.0], [2.0], [9.0]]])
+        assert masked_max_pool(features, torch.tensor([3]), torch.tensor([2])).item() == 2.0
+        assert masked_max_pool(features, torch.tensor([1]), torch.tensor([2])).item() == 1.0
+
+    @pytest.mark.unit
+    def test_variants_and_metadata(self, mock_config):
+        """Testa construção pelas variantes do model_configs.yml e features de metadados"""
+        deep = TextCNN.from_config(mock_config, 100, variant='deep_cnn', num_metadata_features=3)
+        assert deep.filter_sizes == [3, 4, 5] and deep.num_filters == [100, 150, 200]
+
+        logits = deep(torch.randint(1, 100, (2, 10)), metadata=torch.zeros(2, 3))
+        assert logits.shape == (2, deep.fc.out_features)
+        with pytest.raises(ValueError):
+            deep(torch.randint(1, 100, (2, 10)))
+        with pytest.raises(KeyError):
+            TextCNN.from_config(mock_config, 100, variant='wide_cnn')
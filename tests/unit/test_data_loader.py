@@ -0,0 +1,422 @@
+"""
+Testes do carregador de dados (MusicDataLoader)
+"""
+
+import json
+import shutil
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.data.data_loader import MusicDataLoader, PYARROW_AVAILABLE
+from src.data.profiling import HyperLogLog
+from src.data.schema import LyricsBuffer, optimize_schema
+
+
+@pytest.fixture
+def lyrics_csv(temp_dir, sample_lyrics_data):
+    """CSV de letras salvo em disco"""
+    path = temp_dir / "lyrics.csv"
+    sample_lyrics_data.to_csv(path, index=False)
+    return path
+
+
+class TestColumnarCache:
+    """Testes do cache colunar (Parquet)"""
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+    def test_cache_written_and_reused(self, temp_dir, lyrics_csv, sample_lyrics_data):
+        """Testa se o CSV é convertido uma vez e relido do cache"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+
+        df = loader.load_local_csv(str(lyrics_csv))
+        cache_path = loader.cache_path_for(lyrics_csv)
+        assert cache_path.exists()
+        assert df.shape == sample_lyrics_data.shape
+        assert isinstance(df['lyrics'].dtype, pd.StringDtype)
+
+        mtime = cache_path.stat().st_mtime_ns
+        df_cached = loader.load_local_csv(str(lyrics_csv))
+        assert cache_path.stat().st_mtime_ns == mtime
+        assert df_cached['title'].tolist() == sample_lyrics_data['title'].tolist()
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+    def test_column_projection(self, temp_dir, lyrics_csv):
+        """Testa se apenas as colunas pedidas são materializadas"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+
+        df = loader.load_local_csv(str(lyrics_csv), columns=['year', 'artist'])
+        assert list(df.columns) == ['year', 'artist']
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+    def test_cache_invalidated_on_content_change(self, temp_dir, lyrics_csv, sample_lyrics_data):
+        """Testa se alterar o conteúdo do CSV gera nova entrada de cache"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+        old_cache = loader.cache_path_for(lyrics_csv)
+        loader.load_local_csv(str(lyrics_csv))
+
+        sample_lyrics_data.head(2).to_csv(lyrics_csv, index=False)
+        assert loader.cache_path_for(lyrics_csv) != old_cache
+        assert len(loader.load_local_csv(str(lyrics_csv))) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+    def test_digest_skipped_for_unchanged_csv(self, temp_dir, lyrics_csv, monkeypatch):
+        """Testa se o CSV só é re-hasheado quando tamanho ou mtime mudam"""
+        import src.data.data_loader as data_loader
+
+        calls = []
+        digest = data_loader.file_digest
+        monkeypatch.setattr(data_loader, 'file_digest', lambda path: calls.append(path) or digest(path))
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+
+        loader.load_local_csv(str(lyrics_csv))
+        loader.load_local_csv(str(lyrics_csv))
+        assert len(calls) == 1
+
+        lyrics_csv.write_text(lyrics_csv.read_text() + "\n")
+        loader.load_local_csv(str(lyrics_csv))
+        assert len(calls) == 2
+
+    @pytest.mark.unit
+    def test_without_cache(self, temp_dir, lyrics_csv):
+        """Testa leitura direta do CSV sem cache"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+
+        df = loader.load_local_csv(str(lyrics_csv), columns=['year'], use_cache=False)
+        assert list(df.columns) == ['year']
+        assert not loader.cache_dir.exists()
+
+
+class TestKaggleManifest:
+    """Testes do manifesto de downloads do Kaggle"""
+
+    DATASET = "owner/lyrics-dataset"
+
+    @pytest.fixture
+    def kaggle_source(self, temp_dir, sample_lyrics_data):
+        """Diretório local que substitui o kagglehub"""
+        dataset_dir = temp_dir / "kaggle" / self.DATASET
+        dataset_dir.mkdir(parents=True)
+        sample_lyrics_data.to_csv(dataset_dir / "a_lyrics.csv", index=False)
+        sample_lyrics_data.head(1).to_csv(dataset_dir / "b_lyrics.csv", index=False)
+        return temp_dir / "kaggle"
+
+    @pytest.mark.unit
+    def test_repeated_load_skips_download(self, temp_dir, kaggle_source, monkeypatch):
+        """Testa se a segunda carga usa o manifesto sem novo download"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"), kaggle_source=str(kaggle_source))
+        df = loader.load_kaggle_dataset(self.DATASET)
+        assert len(df) == 3
+        assert loader.manifest_path.exists()
+
+        def fail_download(*args, **kwargs):
+            raise AssertionError("download não deveria ocorrer")
+
+        monkeypatch.setattr(loader, "_download_dataset", fail_download)
+        assert len(loader.load_kaggle_dataset(self.DATASET)) == 3
+
+    @pytest.mark.unit
+    def test_force_download_refreshes(self, temp_dir, kaggle_source, monkeypatch):
+        """Testa se force_download sempre dispara o download"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"), kaggle_source=str(kaggle_source))
+        loader.load_kaggle_dataset(self.DATASET)
+
+        calls = []
+        original = loader._download_dataset
+        monkeypatch.setattr(
+            loader, "_download_dataset",
+            lambda name, force: calls.append(force) or original(name, force)
+        )
+        loader.load_kaggle_dataset(self.DATASET, force_download=True)
+        assert calls == [True]
+
+    @pytest.mark.unit
+    def test_file_path_selects_file(self, temp_dir, kaggle_source):
+        """Testa se file_path escolhe o arquivo dentro do dataset"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"), kaggle_source=str(kaggle_source))
+
+        df = loader.load_kaggle_dataset(self.DATASET, file_path="b_lyrics.csv")
+        assert len(df) == 1
+        with pytest.raises(FileNotFoundError):
+            loader.load_kaggle_dataset(self.DATASET, file_path="missing.csv")
+
+    @pytest.mark.unit
+    def test_modified_file_triggers_redownload(self, temp_dir, kaggle_source):
+        """Testa se arquivo alterado invalida a entrada do manifesto"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"), kaggle_source=str(kaggle_source))
+        loader.load_kaggle_dataset(self.DATASET)
+
+        with open(kaggle_source / self.DATASET / "a_lyrics.csv", "a") as f:
+            f.write("Extra,Artist D,2015,More lyrics here\n")
+        assert loader._verified_manifest_entry(self.DATASET) is None
+
+
+class TestStreamingProfile:
+    """Testes do modo streaming (lotes com memória limitada)"""
+
+    @pytest.fixture
+    def corpus(self):
+        """Corpus sintético com duplicatas, nulos e vários artistas"""
+        rng = np.random.default_rng(0)
+        n = 500
+        df = pd.DataFrame({
+            'title': [f"Song {i % 450}" for i in range(n)],
+            'artist': [f"Artist {i % 450 % 120}" for i in range(n)],
+            'year': rng.integers(1959, 2020, n),
+            'lyrics': [("la " * int(k)).strip() for k in rng.integers(1, 80, n)],
+        })
+        df.loc[::50, 'lyrics'] = None
+        return df
+
+    @pytest.mark.unit
+    def test_iter_batches_csv_and_parquet(self, temp_dir, corpus):
+        """Testa se os lotes respeitam batch_size e a projeção de colunas"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+        csv_path = temp_dir / "corpus.csv"
+        corpus.to_csv(csv_path, index=False)
+        parquet_path = temp_dir / "corpus.parquet"
+        corpus.to_parquet(parquet_path, index=False)
+
+        for path in [csv_path, parquet_path]:
+            batches = list(loader.iter_batches(str(path), batch_size=128, columns=['year']))
+            assert [len(b) for b in batches] == [128, 128, 128, 116]
+            assert all(list(b.columns) == ['year'] for b in batches)
+
+    @pytest.mark.unit
+    def test_streaming_matches_in_memory(self, temp_dir, corpus):
+        """Testa se as estatísticas incrementais batem com o cálculo em memória"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+        csv_path = temp_dir / "corpus.csv"
+        corpus.to_csv(csv_path, index=False)
+        expected = loader.get_dataset_info(pd.read_csv(csv_path))
+
+        info = loader.get_dataset_info_streaming(str(csv_path), batch_size=64)
+        assert info['shape'] == expected['shape']
+        assert info['null_counts'] == expected['null_counts']
+        assert info['year_range'] == expected['year_range']
+        assert info['avg_lyrics_length'] == pytest.approx(expected['avg_lyrics_length'])
+        assert info['lyrics_length_std'] == pytest.approx(expected['lyrics_length_std'])
+        assert info['unique_artists'] == pytest.approx(expected['unique_artists'], rel=0.05)
+
+        assert loader.validate_dataset_streaming(str(csv_path), batch_size=64) == \
+            loader.validate_dataset(pd.read_csv(csv_path))
+
+    @pytest.mark.unit
+    def test_hyperloglog_estimate(self):
+        """Testa a estimativa de cardinalidade do HyperLogLog"""
+        sketch = HyperLogLog(precision=12)
+        hashes = pd.util.hash_array(np.arange(50_000))
+        sketch.add_hashes(hashes[:30_000])
+        sketch.add_hashes(hashes[20_000:])
+        assert sketch.count() == pytest.approx(50_000, rel=0.05)
+
+
+class TestSinglePassProfile:
+    """Testes do perfil em passagem única"""
+
+    @pytest.mark.unit
+    def test_profile_matches_reference(self, temp_dir):
+        """Testa se o perfil vetorizado reproduz as estatísticas do pandas"""
+        df = pd.DataFrame({
+            'title': ['A', 'B', 'A', 'C', None, 'A'],
+            'artist': ['X', 'Y', 'X', 'X', 'Z', None],
+            'year': [1990, 1990, 1991, 2001, 2001, 1990],
+            'lyrics': ['one two', None, 'three', 'four five six', '', 'seven'],
+        })
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+
+        info, is_valid, issues = loader.profile_dataset(df)
+        assert info['unique_artists'] == df['artist'].nunique()
+        assert info['top_artists'] == df['artist'].value_counts().head(10).to_dict()
+        assert info['year_distribution'] == df['year'].value_counts().head(10).to_dict()
+        assert info['year_range'] == (1990, 2001)
+        assert info['avg_lyrics_length'] == pytest.approx(df['lyrics'].str.len().mean())
+        assert info['lyrics_length_std'] == pytest.approx(df['lyrics'].str.len().std())
+        assert info['memory_usage'] == df.memory_usage(deep=True).sum()
+
+        duplicates = df.duplicated(subset=['title', 'artist']).sum()
+        assert not is_valid
+        assert f"Found {duplicates} duplicate songs (same title + artist)" in issues
+        assert "Found 1 songs with empty lyrics" in issues
+
+    @pytest.mark.unit
+    def test_approximate_memory(self, temp_dir):
+        """Testa se a estimativa de memória por amostragem é próxima da exata"""
+        df = pd.DataFrame({
+            'artist': [f"Artist {i % 37}" for i in range(5000)],
+            'lyrics': ["word " * (i % 50 + 1) for i in range(5000)],
+            'year': np.arange(5000) % 60 + 1959,
+        })
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+
+        approx = loader.get_dataset_info(df, approximate_memory=True)['memory_usage']
+        assert approx == pytest.approx(df.memory_usage(deep=True).sum(), rel=0.1)
+
+
+class TestCompactSchema:
+    """Testes da representação compacta em memória"""
+
+    @pytest.mark.unit
+    def test_loader_emits_compact_schema(self, temp_dir, lyrics_csv):
+        """Testa dtypes compactos e o relatório de memória antes/depois"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+        df = loader.load_local_csv(str(lyrics_csv))
+
+        # Three distinct titles/artists in three rows: categoricals would not pay off
+        assert not isinstance(df['artist'].dtype, pd.CategoricalDtype)
+        assert not isinstance(df['title'].dtype, pd.CategoricalDtype)
+        assert df['year'].dtype == np.int16
+
+        footprint = loader.get_dataset_info(df)['memory_footprint']
+        assert set(footprint) == {'before', 'after', 'reduction'}
+
+    @pytest.mark.unit
+    def test_compact_schema_reduces_memory(self):
+        """Testa se o esquema compacto reduz o uso de memória"""
+        df = pd.DataFrame({
+            'title': [f"Song {i % 300}" for i in range(3000)],
+            'artist': [f"Artist {i % 40}" for i in range(3000)],
+            'year': np.arange(3000) % 60 + 1959,
+            'lyrics': ["na na na hey hey"] * 3000,
+        })
+        compact = optimize_schema(df)
+        assert compact.attrs['memory_footprint']['after'] < compact.attrs['memory_footprint']['before']
+        assert compact['title'].tolist() == df['title'].tolist()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("years", [[1990, 40000], [1990.0, None, 1990.5], [1990, -40000]])
+    def test_invalid_years_are_kept_for_validation(self, years):
+        """Testa se anos fora do int16 ou fracionários não são convertidos"""
+        compact = optimize_schema(pd.DataFrame({'year': years}))
+        pd.testing.assert_series_equal(compact['year'], pd.Series(years, name='year'))
+
+    @pytest.mark.unit
+    def test_nullable_years_downcast(self):
+        """Testa conversão para Int16 com anos ausentes"""
+        compact = optimize_schema(pd.DataFrame({'year': [1990.0, None, 2005.0]}))
+        assert compact['year'].dtype == 'Int16'
+        assert compact['year'].tolist()[::2] == [1990, 2005]
+
+    @pytest.mark.unit
+    def test_footprint_counts_categories_and_skips_unique_titles(self):
+        """Testa se o relatório conta as categorias e se títulos únicos ficam como object"""
+        df = pd.DataFrame({
+            'title': [f"A fairly long unique song title {i}" for i in range(3000)],
+            'artist': [f"A fairly long artist name {i % 40}" for i in range(3000)],
+            'year': np.arange(3000) % 60 + 1959,
+        })
+        compact = optimize_schema(df)
+
+        assert compact['title'].dtype == object
+        assert isinstance(compact['artist'].dtype, pd.CategoricalDtype)
+        assert compact.attrs['memory_footprint']['after'] == pytest.approx(
+            compact.memory_usage(deep=True).sum(), rel=0.05
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+    def test_lyrics_buffer_zero_copy(self, sample_lyrics_data):
+        """Testa se o buffer de letras reaproveita a memória do Arrow"""
+        lyrics = pd.concat([sample_lyrics_data['lyrics'], pd.Series([None, "ça va"])], ignore_index=True)
+        compact = optimize_schema(pd.DataFrame({'lyrics': lyrics}))
+
+        buffer = LyricsBuffer.from_series(compact['lyrics'])
+        again = LyricsBuffer.from_series(compact['lyrics'])
+        assert np.shares_memory(buffer.data, again.data)
+        assert list(buffer) == [*sample_lyrics_data['lyrics'], None, "ça va"]
+        assert buffer.byte_lengths()[-1] == len("ça va".encode("utf-8"))
+
+    @pytest.mark.unit
+    def test_lyrics_buffer_from_object_column(self, sample_lyrics_data):
+        """Testa a construção do buffer a partir de strings Python"""
+        buffer = LyricsBuffer.from_series(sample_lyrics_data['lyrics'])
+        assert len(buffer) == 3
+        assert buffer[1] == sample_lyrics_data['lyrics'].iloc[1]
+
+
+class TestLoadMany:
+    """Testes da ingestão paralela de múltiplos arquivos"""
+
+    @pytest.fixture
+    def shards(self, temp_dir):
+        """Arquivos anuais com nomes de colunas do Kaggle e uma repetição"""
+        shard_dir = temp_dir / "shards"
+        shard_dir.mkdir()
+        for year in [1990, 1991, 1992]:
+            pd.DataFrame({
+                'Song Title': [f"Song {year}-{i}" for i in range(4)] + ["Evergreen"],
+                'Artist': [f"Artist {i}" for i in range(4)] + ["Classic Band"],
+                'Year': [year] * 4 + [1990],
+                'Lyrics': [f"lyrics {year} {i}" for i in range(4)] + ["forever and ever"],
+            }).to_csv(shard_dir / f"lyrics_{year}.csv", index=False)
+        return shard_dir
+
+    @pytest.mark.unit
+    def test_load_many_normalizes_and_dedups(self, temp_dir, shards):
+        """Testa renomeação via config e remoção de duplicatas entre arquivos"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+
+        df = loader.load_many(str(shards / "lyrics_*.csv"), max_workers=2)
+        assert {'title', 'artist', 'year', 'lyrics'} <= set(df.columns)
+        assert len(df) == 13
+        assert (df['title'] == "Evergreen").sum() == 1
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+    def test_load_many_digests_resolved_before_workers(self, temp_dir, shards):
+        """Testa se o índice de digests é gravado uma vez pelo processo principal"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+        index_path = loader.cache_dir / loader.DIGEST_INDEX_FILE
+        loader.cache_dir.mkdir(parents=True)
+        index_path.write_text('{"truncated": ')
+
+        loader.load_many(str(shards / "lyrics_*.csv"), max_workers=2)
+        index = json.loads(index_path.read_text())
+        assert len(index) == len(list(shards.glob("lyrics_*.csv")))
+        assert not list(loader.cache_dir.glob("*.tmp"))
+
+    @pytest.mark.unit
+    def test_load_many_projection_uses_canonical_names(self, temp_dir, shards):
+        """Testa projeção de colunas pelos nomes padronizados"""
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"))
+
+        df = loader.load_many([str(shards / "lyrics_1990.csv")], columns=['year', 'artist'], dedup_subset=None)
+        assert list(df.columns) == ['year', 'artist']
+        assert len(df) == 5
+
+    @pytest.mark.unit
+    def test_kaggle_dataset_reads_all_csvs(self, temp_dir, shards):
+        """Testa se o dataset do Kaggle com vários CSVs carrega todos os arquivos"""
+        source = temp_dir / "kaggle"
+        shutil.copytree(shards, source / "owner" / "yearly")
+        loader = MusicDataLoader(data_dir=str(temp_dir / "data"), kaggle_source=str(source))
+
+        df = loader.load_kaggle_dataset("owner/yearly")
+        assert len(df) == 13
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+    def test_lyrics_buffer_feeds_clean_batch(self):
+        """Testa se clean_batch consome o buffer e fatias sem perder músicas"""
+        from src.data.preprocessor import DOC_SEPARATOR, LyricsPreprocessor
+
+        lyrics = ["[Chorus] Olá amor (x2)", None, "", "a\x00b", "última"]
+        arrow = pd.Series(lyrics, dtype=pd.StringDtype("pyarrow"))
+        buffer = LyricsBuffer.from_series(arrow)
+        preprocessor = LyricsPreprocessor()
+
+        expected = preprocessor.clean_batch(lyrics)
+        assert preprocessor.clean_batch(buffer) == expected
+        assert preprocessor.clean_batch(arrow) == expected
+        assert buffer.joined().split(DOC_SEPARATOR) == ["[Chorus] Olá amor (x2)", "", "", "a b", "última"]
+
+        chunk = buffer[1:4]
+        assert np.shares_memory(chunk.data, buffer.data)
+        assert list(chunk) == [None, "", "a\x00b"]
+        assert preprocessor.clean_batch(chunk) == preprocessor.clean_batch(lyrics[1:4])
+        assert buffer[2:2].joined() == ""
+
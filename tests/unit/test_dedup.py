@@ -0,0 +1,105 @@
+"""
+Testes da detecção de letras quase duplicadas
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.data.data_loader import MusicDataLoader
+from src.data.dedup import MinHashLSH, count_near_duplicates, near_duplicate_clusters
+from src.data.splitter import SplitManifest, create_multilabel_split_indices, create_split_indices
+
+
+@pytest.fixture
+def lyrics_with_covers():
+    """Letras aleatórias seguidas de versões levemente alteradas das 50 primeiras"""
+    rng = np.random.default_rng(0)
+    vocab = [f"word{i}" for i in range(2000)]
+    originals = [" ".join(rng.choice(vocab, 120)) for _ in range(400)]
+    covers = [text.replace(text.split()[10], "remastered", 1) for text in originals[:50]]
+    return originals + covers
+
+
+class TestMinHashLSH:
+    """Testes do índice MinHash/LSH"""
+
+    @pytest.mark.unit
+    def test_clusters_group_covers_with_originals(self, lyrics_with_covers):
+        """Testa se versões quase idênticas caem no cluster do original"""
+        clusters = near_duplicate_clusters(lyrics_with_covers, threshold=0.8, n_jobs=1)
+
+        np.testing.assert_array_equal(clusters[400:], np.arange(50))
+        assert count_near_duplicates(clusters) == 50
+
+    @pytest.mark.unit
+    def test_parallel_signatures_match_serial(self, lyrics_with_covers):
+        """Testa se as assinaturas paralelas são idênticas às sequenciais"""
+        index = MinHashLSH()
+        serial = index.hasher.signatures(lyrics_with_covers, n_jobs=1)
+        parallel = index.hasher.signatures(lyrics_with_covers, n_jobs=2, chunk_size=100)
+        np.testing.assert_array_equal(serial, parallel)
+
+    @pytest.mark.unit
+    def test_incremental_add_and_query(self, lyrics_with_covers, temp_dir):
+        """Testa inserção incremental, consulta e persistência"""
+        index = MinHashLSH(threshold=0.8)
+        index.add(lyrics_with_covers[:400], n_jobs=1)
+        new_ids = index.add(lyrics_with_covers[400:], n_jobs=1)
+
+        np.testing.assert_array_equal(new_ids, np.arange(400, 450))
+        matches = [item_id for item_id, _ in index.query(lyrics_with_covers[3])]
+        assert matches[0] == 3 and 403 in matches
+
+        index.save(temp_dir / "lsh.npz")
+        reloaded = MinHashLSH.load(temp_dir / "lsh.npz")
+        np.testing.assert_array_equal(reloaded.clusters(), index.clusters())
+        assert {tuple(p) for p in index.duplicate_pairs()} >= {(i, 400 + i) for i in range(50)}
+
+    @pytest.mark.unit
+    def test_empty_lyrics_are_not_duplicates(self):
+        """Testa se letras vazias não são agrupadas entre si"""
+        clusters = near_duplicate_clusters([None, "", None, "la la la la la la"], n_jobs=1)
+        np.testing.assert_array_equal(clusters, [0, 1, 2, 3])
+
+
+class TestNearDuplicateIntegration:
+    """Testes da integração com validação e divisão"""
+
+    @pytest.mark.unit
+    def test_validate_dataset_flags_near_duplicates(self, lyrics_with_covers):
+        """Testa se validate_dataset reporta quase-duplicatas quando solicitado"""
+        df = pd.DataFrame({
+            'title': [f"Song {i}" for i in range(len(lyrics_with_covers))],
+            'artist': "Artist",
+            'year': 1990,
+            'lyrics': lyrics_with_covers,
+        })
+        loader = MusicDataLoader()
+
+        assert loader.validate_dataset(df)[0]
+        is_valid, issues = loader.validate_dataset(df, near_duplicate_threshold=0.8, n_jobs=1)
+        assert not is_valid
+        assert any("50 songs with near-duplicate lyrics" in issue for issue in issues)
+
+    @pytest.mark.unit
+    def test_splits_keep_clusters_together(self, lyrics_with_covers):
+        """Testa se cada cluster fica em uma única divisão"""
+        clusters = near_duplicate_clusters(lyrics_with_covers, n_jobs=1)
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({
+            'title': [f"Song {i}" for i in range(len(clusters))],
+            'artist': "Artist",
+            'year': rng.integers(1960, 2020, len(clusters)),
+            'violence': rng.random(len(clusters)) < 0.2,
+        })
+
+        for splits in (
+            create_split_indices(df, groups=clusters),
+            create_multilabel_split_indices(df, ['violence'], groups=clusters),
+            SplitManifest().split_indices(df, groups=clusters),
+        ):
+            row_part = np.empty(len(df), dtype=int)
+            for part, idx in enumerate(splits.values()):
+                row_part[idx] = part
+            np.testing.assert_array_equal(row_part[400:], row_part[:50])
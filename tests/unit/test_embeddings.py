@@ -0,0 +1,130 @@
+"""
+Testes do armazenamento de embeddings
+"""
+
+import pytest
+import numpy as np
+import torch
+
+from src.data.preprocessor import Vocabulary
+from src.features.embeddings import DocumentEmbedder, EmbeddingStore, iter_text_vectors
+
+
+WORDS = ["love", "loved", "lover", "lovely", "night", "nights", "day"]
+
+
+@pytest.fixture
+def glove_file(temp_dir):
+    """Arquivo de vetores no formato GloVe"""
+    rng = np.random.default_rng(0)
+    path = temp_dir / "glove.txt"
+    with open(path, "w", encoding="utf-8") as f:
+        for word in WORDS + [f"extra{i}" for i in range(50)]:
+            f.write(word + " " + " ".join(f"{v:.5f}" for v in rng.normal(size=16)) + "\n")
+    return path
+
+
+def cosine(a, b):
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestEmbeddingStore:
+    """Testes da conversão e leitura mapeada em memória"""
+
+    @pytest.mark.unit
+    def test_rows_aligned_to_vocabulary(self, glove_file, temp_dir):
+        """Testa se cada linha corresponde ao id do vocabulário"""
+        vocab = Vocabulary(["night", "love", "missingword"])
+        store = EmbeddingStore.convert(glove_file, vocab, temp_dir / "emb")
+        source = dict(iter_text_vectors(glove_file))
+
+        assert isinstance(store.vectors, np.memmap)
+        assert store.vectors.shape == (len(vocab), 16)
+        np.testing.assert_allclose(store.vectors[vocab.stoi["love"]], np.array(source["love"].split(), float), atol=1e-5)
+        assert not store.vectors[vocab.pad_id].any()
+        assert store.meta["found"] == 2
+
+    @pytest.mark.unit
+    def test_oov_filled_from_subwords(self, glove_file, temp_dir):
+        """Testa se palavras fora do arquivo recebem vetores de n-gramas"""
+        vocab = Vocabulary(WORDS + ["loving"])
+        store = EmbeddingStore.convert(glove_file, vocab, temp_dir / "emb")
+
+        loving = store.vectors[vocab.stoi["loving"]]
+        assert store.meta["oov_subword_filled"] == 1
+        assert cosine(loving, store.vector("love")) > cosine(loving, store.vector("day"))
+        assert cosine(store.vector("lovers"), store.vector("lover")) > 0
+
+    @pytest.mark.unit
+    def test_float16_store_and_embedding_weight(self, glove_file, temp_dir):
+        """Testa armazenamento float16 e a camada nn.Embedding"""
+        vocab = Vocabulary(WORDS)
+        EmbeddingStore.convert(glove_file, vocab, temp_dir / "emb", dtype="float16")
+        store = EmbeddingStore.open(temp_dir / "emb")
+
+        assert store.vectors.dtype == np.float16
+        embedding = store.to_embedding(freeze=True)
+        assert embedding.weight.dtype == torch.float32
+        assert embedding.weight.shape == (len(vocab), 16)
+        assert embedding.padding_idx == vocab.pad_id
+        assert not embedding.weight.requires_grad
+
+    @pytest.mark.unit
+    def test_word2vec_header_is_skipped(self, temp_dir):
+        """Testa leitura do formato word2vec com cabeçalho"""
+        path = temp_dir / "w2v.vec"
+        path.write_text("2 3\nlove 1 2 3\nday 4 5 6\n", encoding="utf-8")
+        assert [word for word, _ in iter_text_vectors(path)] == ["love", "day"]
+
+    @pytest.mark.unit
+    def test_unknown_dtype(self, glove_file, temp_dir):
+        """Testa erro para dtype não suportado"""
+        with pytest.raises(ValueError):
+            EmbeddingStore.convert(glove_file, Vocabulary(WORDS), temp_dir / "emb", dtype="int8")
+
+
+class TestDocumentEmbedder:
+    """Testes dos vetores de documento com cache em disco"""
+
+    @pytest.fixture
+    def store(self, glove_file, temp_dir):
+        return EmbeddingStore.convert(glove_file, Vocabulary(WORDS), temp_dir / "emb")
+
+    @pytest.mark.unit
+    def test_mean_of_word_vectors(self, store):
+        """Testa se o vetor da música é a média dos vetores das palavras, na ordem de entrada"""
+        texts = ["love night night", "Day!", "", "lovely lovers"]
+        vectors = DocumentEmbedder(store, batch_size=2, normalize=False).embed(texts)
+
+        assert vectors.shape == (4, store.dim)
+        expected = np.mean([store.vector(w) for w in ["love", "night", "night"]], axis=0)
+        np.testing.assert_allclose(vectors[0], expected, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(vectors[1], store.vector("day"), rtol=1e-5, atol=1e-6)
+        assert not vectors[2].any()
+        # "lovers" is out of vocabulary and uses its subword vector
+        expected = np.mean([store.vector("lovely"), store.vector("lovers")], axis=0)
+        np.testing.assert_allclose(vectors[3], expected, rtol=1e-5, atol=1e-6)
+
+    @pytest.mark.unit
+    def test_cache_only_embeds_new_lyrics(self, store, temp_dir, monkeypatch):
+        """Testa se a segunda execução só calcula as letras novas"""
+        cache_dir = temp_dir / "doc_cache"
+        first = DocumentEmbedder(store, cache_dir=cache_dir).embed(["love night", "day", "love night"])
+        assert len(DocumentEmbedder(store, cache_dir=cache_dir).cache) == 2
+
+        embedder = DocumentEmbedder(store, cache_dir=cache_dir)
+        computed = []
+        original = embedder._compute
+        monkeypatch.setattr(embedder, "_compute", lambda texts: computed.extend(texts) or original(texts))
+        second = embedder.embed(["day", "nights", "love night"])
+
+        assert computed == ["nights"]
+        np.testing.assert_allclose(second[0], first[1])
+        np.testing.assert_allclose(second[2], first[0])
+        np.testing.assert_allclose(np.linalg.norm(second, axis=1), 1, rtol=1e-5)
+
+    @pytest.mark.unit
+    def test_unknown_backend(self, store):
+        """Testa erro para backend desconhecido"""
+        with pytest.raises(ValueError):
+            DocumentEmbedder(store, backend="bert")
@@ -0,0 +1,178 @@
+"""
+Testes do preprocessamento de letras e do corpus tokenizado
+"""
+
+import pytest
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+from src.data.preprocessor import LyricsPreprocessor, TokenizedCorpus, Vocabulary, SONG_KEY_COLUMNS
+from src.utils.helpers import stable_row_hashes
+
+
+class TestLyricsPreprocessor:
+    """Testes de limpeza e tokenização"""
+
+    @pytest.mark.unit
+    def test_clean_text_removes_music_markup(self):
+        """Testa remoção de marcações de seção e repetição"""
+        preprocessor = LyricsPreprocessor()
+        text = "[Chorus]\nOh   Baby, baby (x2)\n[Verse 2: Someone] Yeah x3"
+        assert preprocessor.clean_text(text) == "oh baby, baby yeah"
+        assert preprocessor.clean_text(None) == ""
+
+    @pytest.mark.unit
+    def test_tokenize_respects_config(self, mock_config):
+        """Testa tokenização com e sem pontuação"""
+        preprocessor = LyricsPreprocessor.from_config(mock_config)
+        assert preprocessor.max_sequence_length == 100
+        assert preprocessor.tokenize("Don't stop, believin'!") == ["don't", "stop", ",", "believin'", "!"]
+
+        preprocessor.remove_punctuation = True
+        assert preprocessor.tokenize("Don't stop, believin'!") == ["don't", "stop", "believin'"]
+
+    @pytest.mark.unit
+    def test_vocabulary_limits(self):
+        """Testa poda do vocabulário por frequência e tamanho"""
+        vocab = Vocabulary.build([["a", "b", "a"], ["c", "a", "b"]], vocab_size=3, min_word_freq=2)
+        assert vocab.itos == ["<pad>", "<unk>", "a"]
+        assert vocab.encode(["a", "b"]) == [2, vocab.unk_id]
+
+
+class TestTokenizedCorpus:
+    """Testes do corpus em memória mapeada"""
+
+    @pytest.mark.unit
+    def test_process_corpus_roundtrip(self, temp_dir, sample_lyrics_data):
+        """Testa escrita e reabertura do corpus via np.memmap"""
+        preprocessor = LyricsPreprocessor(max_sequence_length=6, min_word_freq=1)
+        corpus = preprocessor.process_corpus(sample_lyrics_data['lyrics'], str(temp_dir / "corpus"), batch_size=2)
+
+        reopened = TokenizedCorpus.open(temp_dir / "corpus")
+        assert isinstance(reopened.tokens, np.memmap)
+        assert reopened.tokens.shape == (3, 6)
+        assert reopened.tokens.dtype == np.int32
+        np.testing.assert_array_equal(reopened.lengths, [6, 6, 6])
+        assert reopened.vocabulary.decode(reopened.tokens[0]) == ["this", "is", "a", "clean", "song", "about"]
+        np.testing.assert_array_equal(corpus.tokens, reopened.tokens)
+
+    @pytest.mark.unit
+    def test_short_lyrics_are_padded(self, temp_dir):
+        """Testa preenchimento com zeros de letras curtas"""
+        preprocessor = LyricsPreprocessor(max_sequence_length=5, min_word_freq=1)
+        corpus = preprocessor.process_corpus(["la la", None], str(temp_dir / "corpus"))
+
+        np.testing.assert_array_equal(corpus.lengths, [2, 0])
+        np.testing.assert_array_equal(corpus.tokens[0], [2, 2, 0, 0, 0])
+        np.testing.assert_array_equal(corpus.tokens[1], [0, 0, 0, 0, 0])
+
+
+class TestVectorizedVocabulary:
+    """Testes da contagem paralela e da codificação vetorizada"""
+
+    @pytest.fixture
+    def corpus_texts(self):
+        """Letras sintéticas com marcações e valores nulos"""
+        rng = np.random.default_rng(1)
+        words = [f"w{i}" for i in range(300)]
+        texts = [
+            "[Chorus] " + " ".join(rng.choice(words, size=int(rng.integers(0, 40)))) + ", yeah (x2)"
+            for _ in range(250)
+        ]
+        texts[10] = None
+        return texts
+
+    @pytest.mark.unit
+    def test_parallel_counts_match_serial(self, corpus_texts):
+        """Testa se a contagem em processos paralelos é igual à serial"""
+        preprocessor = LyricsPreprocessor()
+        expected = Counter()
+        for text in corpus_texts:
+            expected.update(preprocessor.tokenize(text))
+
+        assert preprocessor.count_tokens(corpus_texts, n_jobs=1) == expected
+        assert preprocessor.count_tokens(corpus_texts, n_jobs=2, chunk_size=60) == expected
+
+    @pytest.mark.unit
+    def test_batch_encode_matches_per_song(self, corpus_texts):
+        """Testa se a codificação em lote equivale à codificação música a música"""
+        preprocessor = LyricsPreprocessor(max_sequence_length=20, vocab_size=100, min_word_freq=2)
+        vocab = preprocessor.fit(corpus_texts, n_jobs=1)
+
+        token_ids, lengths = preprocessor.encode(corpus_texts)
+        for i, text in enumerate(corpus_texts):
+            ids = vocab.encode(preprocessor.tokenize(text))[:20]
+            assert lengths[i] == len(ids)
+            assert token_ids[i, :len(ids)].tolist() == ids
+            assert not token_ids[i, len(ids):].any()
+
+    @pytest.mark.unit
+    def test_vocabulary_persistence(self, temp_dir, corpus_texts):
+        """Testa salvar e recarregar o vocabulário"""
+        vocab = LyricsPreprocessor(min_word_freq=1).fit(corpus_texts, n_jobs=1)
+        vocab.save(temp_dir / "vocab.txt")
+
+        loaded = Vocabulary.load(temp_dir / "vocab.txt")
+        assert loaded.itos == vocab.itos
+        np.testing.assert_array_equal(loaded.lookup(["w1", "nope"]), [vocab.stoi["w1"], vocab.unk_id])
+
+
+class TestIncrementalCorpus:
+    """Testes para a atualização incremental do corpus"""
+
+    @pytest.mark.unit
+    def test_only_new_or_changed_songs_are_encoded(self, temp_dir, sample_lyrics_data):
+        """Testa se apenas músicas novas ou alteradas são reprocessadas"""
+        corpus_dir = temp_dir / "corpus"
+        preprocessor = LyricsPreprocessor(max_sequence_length=16, min_word_freq=1)
+        corpus, rows = preprocessor.update_corpus(sample_lyrics_data, corpus_dir)
+        assert len(corpus) == len(sample_lyrics_data)
+        np.testing.assert_array_equal(rows, np.arange(len(sample_lyrics_data)))
+        original = np.array(corpus.tokens)
+
+        updated = sample_lyrics_data.copy()
+        updated.loc[0, 'lyrics'] = "completely different words here"
+        updated = pd.concat([updated, sample_lyrics_data.iloc[[1]].assign(title="New Song")], ignore_index=True)
+
+        encoded = []
+        original_encode = preprocessor.encode
+        preprocessor.encode = lambda texts: encoded.append(list(texts)) or original_encode(texts)
+        corpus, rows = preprocessor.update_corpus(updated, corpus_dir)
+
+        assert sum(len(batch) for batch in encoded) == 2
+        assert len(corpus) == len(sample_lyrics_data) + 2
+        np.testing.assert_array_equal(np.array(corpus.tokens)[:len(original)], original)
+        assert rows[0] == len(sample_lyrics_data)
+        np.testing.assert_array_equal(rows[1:len(sample_lyrics_data)], np.arange(1, len(sample_lyrics_data)))
+
+        # Running again with the same data is a no-op
+        encoded.clear()
+        corpus, _ = preprocessor.update_corpus(updated, corpus_dir)
+        assert not encoded
+        assert len(corpus) == len(sample_lyrics_data) + 2
+
+    @pytest.mark.unit
+    def test_update_starts_from_empty_corpus(self, temp_dir, sample_lyrics_data):
+        """Testa atualização de um corpus criado a partir de um DataFrame vazio"""
+        corpus_dir = temp_dir / "corpus"
+        preprocessor = LyricsPreprocessor(max_sequence_length=16, min_word_freq=1)
+        preprocessor.fit(sample_lyrics_data['lyrics'], n_jobs=1)
+
+        corpus, rows = preprocessor.update_corpus(sample_lyrics_data.iloc[:0], corpus_dir)
+        assert len(corpus) == 0 and len(rows) == 0
+
+        corpus, rows = preprocessor.update_corpus(sample_lyrics_data, corpus_dir)
+        assert len(corpus) == len(sample_lyrics_data)
+        np.testing.assert_array_equal(rows, np.arange(len(sample_lyrics_data)))
+
+    @pytest.mark.unit
+    def test_song_keys_are_stable_across_dtypes(self, sample_lyrics_data):
+        """Testa se a chave da música não depende do dtype das colunas"""
+        keys = stable_row_hashes(sample_lyrics_data, SONG_KEY_COLUMNS)
+        converted = sample_lyrics_data.assign(
+            year=sample_lyrics_data['year'].astype(float),
+            title=sample_lyrics_data['title'].astype('category')
+        )
+        np.testing.assert_array_equal(stable_row_hashes(converted, SONG_KEY_COLUMNS), keys)
+        assert keys.dtype == np.uint64
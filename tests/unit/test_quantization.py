@@ -0,0 +1,105 @@
+"""
+Testes da quantização pós-treino e do relatório de aceitação
+"""
+
+import pytest
+import numpy as np
+import torch
+from torch import nn
+
+from src.models.base_model import BaseModel
+from src.models.cnn_models import TextCNN
+from src.models.evaluator import ModelEvaluator
+from src.models.quantization import CompactEmbedding, checkpoint_size
+
+
+@pytest.fixture
+def model():
+    """CNN pequena com pesos aleatórios"""
+    torch.manual_seed(0)
+    return TextCNN(2000, embedding_dim=64, num_classes=4, num_filters=32).eval()
+
+
+@pytest.fixture
+def batches():
+    """Lotes (token_ids, lengths, labels) fixos"""
+    generator = torch.Generator().manual_seed(1)
+    result = []
+    for _ in range(4):
+        lengths = torch.randint(3, 40, (16,), generator=generator)
+        token_ids = torch.randint(1, 2000, (16, 40), generator=generator)
+        token_ids[torch.arange(40)[None, :] >= lengths[:, None]] = 0
+        labels = torch.randint(0, 2, (16, 4), generator=generator)
+        result.append((token_ids, lengths, labels))
+    return result
+
+
+class TestQuantization:
+    """Testes das tabelas compactas e da quantização dinâmica"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("dtype, tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+    def test_compact_embedding(self, dtype, tolerance):
+        """Testa o erro de reconstrução das tabelas float16 e int8"""
+        embedding = nn.Embedding(100, 16)
+        compact = CompactEmbedding.from_embedding(embedding, dtype)
+        token_ids = torch.randint(0, 100, (4, 7))
+
+        expected = embedding(token_ids)
+        actual = compact(token_ids)
+        assert actual.dtype == torch.float32
+        assert (actual - expected).abs().max() <= tolerance * embedding.weight.abs().max()
+
+    @pytest.mark.unit
+    def test_quantized_copy_is_close_and_smaller(self, model, batches):
+        """Testa se a cópia quantizada mantém as predições e reduz o checkpoint"""
+        quantized = model.quantize()
+        token_ids, lengths, _ = batches[0]
+
+        assert isinstance(model.embedding, nn.Embedding) and model.convs is not None
+        np.testing.assert_allclose(
+            quantized.predict_batch(token_ids, lengths), model.predict_batch(token_ids, lengths), atol=0.02
+        )
+        assert checkpoint_size(quantized) * 3 < checkpoint_size(model)
+        with pytest.raises(ValueError):
+            quantized.conv_mode = 'loop'
+            quantized.predict_batch(token_ids, lengths)
+
+    @pytest.mark.unit
+    def test_quantized_checkpoint_round_trip(self, model, batches, temp_dir):
+        """Testa salvar e carregar um modelo quantizado"""
+        quantized = model.quantize(embedding_dtype='float16')
+        loaded = BaseModel.load(quantized.save(temp_dir / "quantized.pt"))
+        token_ids, lengths, _ = batches[1]
+
+        assert loaded.quantization == {'linear': 'qint8', 'embedding': 'float16'}
+        np.testing.assert_allclose(loaded.predict_batch(token_ids, lengths), quantized.predict_batch(token_ids, lengths))
+
+
+class TestModelEvaluator:
+    """Testes das métricas e do relatório de comparação"""
+
+    @pytest.mark.unit
+    def test_compute_metrics(self):
+        """Testa métricas em um caso conhecido"""
+        evaluator = ModelEvaluator(labels=['violence', 'clean'])
+        targets = np.array([[1, 0], [0, 1], [1, 1], [0, 0]])
+        probabilities = np.array([[0.9, 0.5], [0.1, 0.8], [0.7, 0.4], [0.2, 0.1]])
+        metrics = evaluator.compute_metrics(targets, probabilities)
+
+        assert metrics['per_class_f1']['violence'] == 1.0
+        assert metrics['per_class_f1']['clean'] == pytest.approx(0.5)
+        assert metrics['roc_auc_macro'] == pytest.approx(0.875)
+
+    @pytest.mark.unit
+    def test_compare_reports_quantization_delta(self, model, batches):
+        """Testa o relatório de aceitação do modelo quantizado"""
+        report = ModelEvaluator().compare(model, model.quantize(), batches, max_f1_drop=1.0)
+
+        assert report['accepted']
+        assert report['compression'] > 3
+        assert report['prediction_agreement'] > 0.9
+        assert set(report['per_class_f1_delta']) == set(report['reference']['per_class_f1'])
+
+        strict = ModelEvaluator().compare(model, TextCNN(2000, 64, 4, num_filters=32).eval(), batches, max_f1_drop=-1)
+        assert not strict['accepted']
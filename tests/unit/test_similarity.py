@@ -0,0 +1,107 @@
+"""
+Testes do índice de similaridade aproximada
+"""
+
+import pytest
+import numpy as np
+
+from src.features.similarity import IVFIndex
+
+
+@pytest.fixture
+def clustered_vectors():
+    """Vetores agrupados em torno de 20 centros"""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 16))
+    return (centers[rng.integers(0, 20, 2000)] + 0.3 * rng.normal(size=(2000, 16))).astype(np.float32)
+
+
+def exact_top_k(vectors, queries, k):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+
+class TestIVFIndex:
+    """Testes do índice IVF"""
+
+    @pytest.mark.unit
+    def test_full_probe_is_exact(self, clustered_vectors):
+        """Testa se sondar todas as listas equivale à busca exata"""
+        index = IVFIndex(16, n_lists=10)
+        index.add(clustered_vectors)
+        queries = clustered_vectors[:50] + 0.01
+        scores, ids = index.search(queries, k=5, n_probe=10)
+
+        np.testing.assert_array_equal(ids, exact_top_k(clustered_vectors, queries, 5))
+        assert (np.diff(scores, axis=1) <= 0).all()
+
+    @pytest.mark.unit
+    def test_recall_with_few_probes(self, clustered_vectors):
+        """Testa a revocação da busca aproximada"""
+        index = IVFIndex(16, n_lists=40, n_probe=4)
+        index.add(clustered_vectors)
+        queries = clustered_vectors[:200]
+        _, ids = index.search(queries, k=10, batch_size=64)
+        exact = exact_top_k(clustered_vectors, queries, 10)
+
+        recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(ids, exact)])
+        assert recall > 0.9
+
+    @pytest.mark.unit
+    def test_incremental_add_and_similar_to(self, clustered_vectors):
+        """Testa inserção incremental com ids próprios e vizinhos excluindo a própria música"""
+        index = IVFIndex(16, n_lists=8)
+        index.add(clustered_vectors[:1000])
+        index.add(clustered_vectors[1000:], ids=np.arange(1000, 2000) + 10_000)
+        assert len(index) == 2000
+
+        _, ids = index.search(clustered_vectors[1500], k=1, n_probe=8)
+        assert ids[0, 0] == 11_500
+
+        _, neighbours = index.similar_to([3, 11_500], k=4)
+        assert neighbours.shape == (2, 4)
+        assert 3 not in neighbours[0] and 11_500 not in neighbours[1]
+
+    @pytest.mark.unit
+    def test_few_vectors_pad_results(self):
+        """Testa preenchimento com -1 quando há menos vizinhos que k"""
+        index = IVFIndex(4, n_lists=2)
+        index.add(np.eye(4, dtype=np.float32)[:3])
+        scores, ids = index.search(np.eye(4, dtype=np.float32)[0], k=5, n_probe=2)
+        assert ids[0, 0] == 0
+        assert (ids[0, 3:] == -1).all() and np.isinf(scores[0, 3:]).all()
+
+    @pytest.mark.unit
+    def test_save_load_round_trip(self, clustered_vectors, temp_dir):
+        """Testa persistência e inserção após carregar o índice mapeado"""
+        index = IVFIndex(16, n_lists=12)
+        index.add(clustered_vectors)
+        index.save(temp_dir / "index")
+
+        loaded = IVFIndex.load(temp_dir / "index")
+        queries = clustered_vectors[:20]
+        for expected, actual in zip(index.search(queries, k=5), loaded.search(queries, k=5)):
+            np.testing.assert_array_equal(expected, actual)
+
+        loaded.add(clustered_vectors[:5])
+        assert len(loaded) == 2005
+
+    @pytest.mark.unit
+    def test_small_inserts_and_duplicate_ids(self, clustered_vectors):
+        """Testa inserções unitárias repetidas e rejeição de ids repetidos"""
+        index = IVFIndex(16, n_lists=8)
+        index.add(clustered_vectors[:500])
+        for i in range(500, 700):
+            index.add(clustered_vectors[i:i + 1], ids=[i])
+
+        assert len(index) == 700
+        np.testing.assert_allclose(
+            index.reconstruct([699, 3, 650]), clustered_vectors[[699, 3, 650]] / np.linalg.norm(clustered_vectors[[699, 3, 650]], axis=1, keepdims=True), rtol=1e-6
+        )
+        with pytest.raises(ValueError):
+            index.add(clustered_vectors[:2], ids=[10_000, 650])
+        with pytest.raises(ValueError):
+            index.add(clustered_vectors[:2], ids=[10_001, 10_001])
+        assert len(index) == 700 and not index.contains([10_000, 10_001]).any()
+
@@ -0,0 +1,269 @@
+"""
+Testes da divisão treino/validação/teste
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.data.splitter import (
+    balance_dataset,
+    compute_sample_weights,
+    create_multilabel_split_indices,
+    create_split_indices,
+    create_stratified_split,
+    hash_split_assignment,
+    iterative_stratification,
+    load_split_indices,
+    make_weighted_sampler,
+    multilabel_kfold,
+    resample_indices,
+    song_split_keys,
+    SplitManifest,
+    save_split_indices,
+    stratification_key,
+    summarize_split,
+    take_split,
+)
+
+
+@pytest.fixture
+def catalog():
+    """Catálogo sintético com anos de 1960 a 2019"""
+    rng = np.random.default_rng(0)
+    n = 2000
+    return pd.DataFrame({
+        'title': [f"Song {i}" for i in range(n)],
+        'artist': [f"Artist {i % 300}" for i in range(n)],
+        'year': rng.integers(1960, 2020, size=n),
+        'lyrics': [f"lyrics {i}" for i in range(n)],
+    })
+
+
+class TestSplitIndices:
+    """Testes da divisão baseada em índices"""
+
+    @pytest.mark.unit
+    def test_indices_partition_rows(self, catalog):
+        """Testa se as divisões formam uma partição com as proporções pedidas"""
+        splits = create_split_indices(catalog, test_size=0.2, val_size=0.1)
+
+        combined = np.concatenate(list(splits.values()))
+        assert np.array_equal(np.sort(combined), np.arange(len(catalog)))
+        assert len(splits['test']) == 400
+        assert len(splits['val']) == 200
+        assert all(np.all(np.diff(idx) > 0) for idx in splits.values())
+
+    @pytest.mark.unit
+    def test_decade_key_is_stratified(self, catalog):
+        """Testa estratificação por década derivada do ano, sem criar coluna"""
+        key = stratification_key(catalog, 'decade')
+        splits = create_split_indices(catalog, key=key)
+
+        assert 'decade' not in catalog.columns
+        overall = np.bincount(key) / len(key)
+        for idx in splits.values():
+            np.testing.assert_allclose(np.bincount(key[idx]) / len(idx), overall, atol=0.02)
+
+    @pytest.mark.unit
+    def test_missing_column_falls_back_to_random(self, catalog):
+        """Testa divisão aleatória quando a coluna não existe"""
+        with pytest.warns(UserWarning):
+            splits = create_split_indices(catalog, stratify_by='genre')
+        assert sum(len(idx) for idx in splits.values()) == len(catalog)
+
+    @pytest.mark.unit
+    def test_save_and_load_npy(self, catalog, temp_dir):
+        """Testa persistência dos índices em .npy"""
+        splits = create_split_indices(catalog)
+        save_split_indices(splits, temp_dir / "splits")
+        loaded = load_split_indices(temp_dir / "splits")
+
+        assert set(loaded) == {'train', 'val', 'test'}
+        for name, idx in splits.items():
+            np.testing.assert_array_equal(loaded[name], idx)
+        assert take_split(catalog, loaded['val'])['title'].tolist() == catalog['title'].iloc[splits['val']].tolist()
+
+    @pytest.mark.unit
+    def test_dataframe_api_matches_indices(self, catalog):
+        """Testa compatibilidade de create_stratified_split com os índices"""
+        train_df, val_df, test_df = create_stratified_split(catalog)
+        splits = create_split_indices(catalog)
+
+        assert train_df.index.tolist() == splits['train'].tolist()
+        assert val_df.index.tolist() == splits['val'].tolist()
+        assert test_df.index.tolist() == splits['test'].tolist()
+
+
+    @pytest.mark.unit
+    def test_missing_year_is_its_own_stratum(self, catalog):
+        """Testa divisão e resumo com anos ausentes (código -1)"""
+        catalog = catalog.assign(year=catalog['year'].astype(float))
+        catalog.loc[catalog.index[::50], 'year'] = np.nan
+
+        train_df, val_df, test_df = create_stratified_split(catalog)
+        assert len(train_df) + len(val_df) + len(test_df) == len(catalog)
+
+        key = stratification_key(catalog, 'decade')
+        summary = summarize_split(create_split_indices(catalog, key=key), key)
+        assert summary['missing'].sum() == (key < 0).sum() == 40
+
+
+LABELS = ['misogyny', 'violence', 'depression', 'suicide', 'racism', 'homophobia']
+
+
+@pytest.fixture
+def labeled_catalog(catalog):
+    """Catálogo com rótulos desbalanceados (suicide muito raro)"""
+    rng = np.random.default_rng(1)
+    rates = [0.05, 0.2, 0.1, 0.005, 0.02, 0.01]
+    labels = pd.DataFrame(rng.random((len(catalog), len(LABELS))) < rates, columns=LABELS).astype(int)
+    return pd.concat([catalog, labels], axis=1)
+
+
+class TestMultilabelStratification:
+    """Testes da estratificação iterativa multirrótulo"""
+
+    @pytest.mark.unit
+    def test_label_proportions_are_preserved(self, labeled_catalog):
+        """Testa se cada rótulo mantém a proporção em todas as divisões"""
+        splits = create_multilabel_split_indices(labeled_catalog, LABELS, test_size=0.2, val_size=0.1)
+        Y = labeled_catalog[LABELS].to_numpy()
+
+        assert np.array_equal(np.sort(np.concatenate(list(splits.values()))), np.arange(len(Y)))
+        for name, fraction in [('train', 0.7), ('val', 0.1), ('test', 0.2)]:
+            assert len(splits[name]) == pytest.approx(fraction * len(Y), abs=2)
+            np.testing.assert_allclose(Y[splits[name]].sum(axis=0), fraction * Y.sum(axis=0), atol=1.5)
+
+    @pytest.mark.unit
+    def test_rare_label_reaches_every_split(self):
+        """Testa se um rótulo com poucos exemplos aparece em todas as partes"""
+        Y = np.zeros((100, 2), dtype=bool)
+        Y[:3, 0] = True
+        Y[::2, 1] = True
+        parts = iterative_stratification(Y, [0.8, 0.1, 0.1])
+        assert sorted(parts[:3]) == [0, 1, 2]
+
+    @pytest.mark.unit
+    def test_joint_decade_stratification(self, labeled_catalog):
+        """Testa estratificação conjunta com a década"""
+        splits = create_multilabel_split_indices(labeled_catalog, LABELS, stratify_by='decade')
+        decades = (labeled_catalog['year'] // 10).to_numpy()
+        overall = np.bincount(decades - 196) / len(decades)
+        for idx in splits.values():
+            np.testing.assert_allclose(np.bincount(decades[idx] - 196) / len(idx), overall, atol=0.01)
+
+    @pytest.mark.unit
+    def test_kfold_is_lazy_and_partitions(self, labeled_catalog):
+        """Testa se o k-fold gera folds disjuntos sob demanda"""
+        folds = multilabel_kfold(labeled_catalog, LABELS, n_splits=4)
+        assert iter(folds) is folds
+
+        val_parts = []
+        for train_idx, val_idx in folds:
+            assert len(np.intersect1d(train_idx, val_idx)) == 0
+            assert len(train_idx) + len(val_idx) == len(labeled_catalog)
+            val_parts.append(val_idx)
+        assert np.array_equal(np.sort(np.concatenate(val_parts)), np.arange(len(labeled_catalog)))
+
+    @pytest.mark.unit
+    def test_deterministic_assignment(self, labeled_catalog):
+        """Testa reprodutibilidade com a mesma seed"""
+        Y = labeled_catalog[LABELS].to_numpy()
+        np.testing.assert_array_equal(
+            iterative_stratification(Y, [0.5, 0.5], random_state=3),
+            iterative_stratification(Y, [0.5, 0.5], random_state=3)
+        )
+
+
+class TestBalancing:
+    """Testes do balanceamento vetorizado"""
+
+    @pytest.mark.unit
+    def test_undersample_is_seeded_and_balanced(self, labeled_catalog):
+        """Testa subamostragem reprodutível com min_count por classe"""
+        first = balance_dataset(labeled_catalog, LABELS, random_state=1)
+        assert first.equals(balance_dataset(labeled_catalog, LABELS, random_state=1))
+
+        indices = resample_indices(labeled_catalog, LABELS, random_state=1)
+        min_count = labeled_catalog[LABELS].sum().min()
+        assert len(np.unique(indices)) == len(indices)
+        assert labeled_catalog['suicide'].iloc[indices].sum() == min_count
+        assert (labeled_catalog[LABELS].iloc[indices].sum() >= min_count).all()
+
+    @pytest.mark.unit
+    def test_oversample_matches_multipliers(self):
+        """Testa se o oversampling repete a classe minoritária maioria // minoria vezes"""
+        df = pd.DataFrame({'violence': [1, 0, 0, 0, 0, 0, 0], 'racism': [1, 1, 1, 1, 1, 0, 0]})
+        balanced = balance_dataset(df, ['violence', 'racism'], method='oversample')
+
+        # violence: +6 cópias da linha 0; racism: +2 cópias das linhas 5 e 6
+        assert len(balanced) == 7 + 6 + 2 * 2
+        assert balanced['violence'].sum() == 7
+
+    @pytest.mark.unit
+    def test_sample_weights_balance_rare_labels(self, labeled_catalog):
+        """Testa se os pesos aumentam a massa dos rótulos raros"""
+        weights = compute_sample_weights(labeled_catalog, LABELS)
+        Y = labeled_catalog[LABELS].to_numpy()
+
+        assert weights.shape == (len(labeled_catalog),)
+        assert weights.mean() == pytest.approx(1.0)
+        weighted_rate = (weights[:, None] * Y).sum(axis=0) / weights.sum()
+        assert (weighted_rate > Y.mean(axis=0)).all()
+
+    @pytest.mark.unit
+    def test_weighted_sampler_is_seeded(self, labeled_catalog):
+        """Testa o WeightedRandomSampler reprodutível"""
+        weights = compute_sample_weights(labeled_catalog, LABELS)
+        first = list(make_weighted_sampler(weights, num_samples=50, random_state=5))
+        assert first == list(make_weighted_sampler(weights, num_samples=50, random_state=5))
+        assert len(first) == 50
+
+    @pytest.mark.unit
+    def test_unknown_method(self, labeled_catalog):
+        """Testa erro para método inválido"""
+        with pytest.raises(ValueError):
+            resample_indices(labeled_catalog, LABELS, method='smote')
+
+
+class TestSplitManifest:
+    """Testes da atribuição por hash e do manifesto"""
+
+    @pytest.mark.unit
+    def test_hash_assignment_ignores_row_order(self, catalog):
+        """Testa se a divisão depende apenas da identidade da música"""
+        keys = song_split_keys(catalog)
+        splits = hash_split_assignment(keys, random_state=0)
+        shuffled = np.random.default_rng(0).permutation(len(keys))
+
+        np.testing.assert_array_equal(hash_split_assignment(keys[shuffled], random_state=0), splits[shuffled])
+        np.testing.assert_allclose(np.bincount(splits) / len(splits), [0.7, 0.1, 0.2], atol=0.03)
+
+    @pytest.mark.unit
+    def test_new_songs_do_not_move_existing(self, catalog, temp_dir):
+        """Testa se adicionar músicas não altera as divisões existentes"""
+        manifest = SplitManifest()
+        before = manifest.assign(catalog.iloc[:1500], stratify_by='decade')
+        manifest.save(temp_dir / "manifest.npz")
+
+        reloaded = SplitManifest.load(temp_dir / "manifest.npz")
+        after = reloaded.assign(catalog.sample(frac=1, random_state=0).sort_index(), stratify_by='decade')
+
+        assert len(reloaded) == len(catalog)
+        np.testing.assert_array_equal(after[:1500], before)
+        np.testing.assert_allclose(np.bincount(after) / len(after), [0.7, 0.1, 0.2], atol=0.01)
+
+    @pytest.mark.unit
+    def test_same_song_across_years_stays_together(self, catalog):
+        """Testa se a mesma música em anos diferentes fica na mesma divisão"""
+        repeated = pd.concat([catalog, catalog.assign(year=catalog['year'] + 1)], ignore_index=True)
+        row_splits = SplitManifest().assign(repeated, stratify_by='decade')
+        np.testing.assert_array_equal(row_splits[:len(catalog)], row_splits[len(catalog):])
+
+    @pytest.mark.unit
+    def test_split_indices_format(self, catalog):
+        """Testa se split_indices segue o formato de create_split_indices"""
+        splits = SplitManifest().split_indices(catalog)
+        assert set(splits) == {'train', 'val', 'test'}
+        assert np.array_equal(np.sort(np.concatenate(list(splits.values()))), np.arange(len(catalog)))
@@ -0,0 +1,117 @@
+"""
+Testes das features temporais
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.features.temporal_features import TemporalFeatureExtractor, log_odds_z_scores
+from src.utils.helpers import compute_decade
+
+
+@pytest.fixture
+def catalog():
+    """Catálogo com uma palavra típica de cada época"""
+    rng = np.random.default_rng(0)
+    years = rng.integers(1959, 2020, size=600)
+    words = np.array(["love", "night", "baby", "heart", "dance", "time", "girl", "home"])
+    lyrics = [
+        " ".join(rng.choice(words, 20)) + (" groovy groovy" if year < 1980 else " phone phone")
+        for year in years
+    ]
+    return pd.DataFrame({
+        'title': [f"Song {i}" for i in range(len(years))],
+        'artist': "Artist",
+        'year': years,
+        'lyrics': lyrics,
+    })
+
+
+class TestDecade:
+    """Testes do cálculo centralizado da década"""
+
+    @pytest.mark.unit
+    def test_compute_decade(self):
+        """Testa décadas com anos ausentes e não numéricos"""
+        decades = compute_decade(pd.Series([1959, 1987.0, None, "2019", "unknown"], index=list("abcde")))
+        assert decades.tolist()[:2] == [1950, 1980]
+        assert decades.tolist()[3] == 2010
+        assert decades.isna().tolist() == [False, False, True, False, True]
+        assert list(decades.index) == list("abcde")
+
+
+class TestTemporalFeatureExtractor:
+    """Testes do extrator de features temporais"""
+
+    @pytest.mark.unit
+    def test_log_odds_sign(self):
+        """Testa se termos super-representados num grupo têm z positivo"""
+        counts = np.array([[50, 10, 10], [5, 10, 10]])
+        z = log_odds_z_scores(counts, prior_scale=10)
+        assert z[0, 0] > 2 and z[1, 0] < -2
+        assert abs(z[0, 1]) < abs(z[0, 0])
+
+    @pytest.mark.unit
+    def test_features_and_drift(self, catalog):
+        """Testa codificações de década/era e o desvio léxico por década"""
+        extractor = TemporalFeatureExtractor(era_boundaries=[1980, 2000], min_df=1)
+        features = extractor.fit_transform(catalog)
+
+        assert list(features.columns) == extractor.feature_names
+        assert features.shape == (len(catalog), len(extractor.feature_names))
+        decade_cols = [f"decade_{d}" for d in extractor.decades_]
+        assert (features[decade_cols].sum(axis=1) == 1).all()
+        assert (features[['era_<1980', 'era_1980-1999', 'era_>=2000']].sum(axis=1) == 1).all()
+        assert extractor.top_terms(1960, n=1)['term'].iloc[0] == "groovy"
+        assert extractor.top_terms(2010, n=1)['term'].iloc[0] == "phone"
+
+        old = catalog['year'] < 1980
+        drift = features['lexical_drift_1970'] - features['lexical_drift_2000']
+        assert (drift[old] > 0).all() and (drift[~old] < 0).all()
+
+    @pytest.mark.unit
+    def test_transform_new_songs(self, catalog):
+        """Testa transformação de músicas novas, inclusive sem ano"""
+        extractor = TemporalFeatureExtractor(min_df=1).fit(catalog)
+        new = pd.DataFrame({'title': ["a", "b"], 'year': [1975, None], 'lyrics': ["groovy love", "phone"]})
+        features = extractor.transform(new)
+
+        assert features.loc[0, 'decade_1970'] == 1
+        assert features.loc[1, 'year_missing'] == 1
+        assert features.filter(like='decade_').iloc[1].sum() == 0
+
+    @pytest.mark.unit
+    def test_cached_per_corpus_version(self, catalog, temp_dir, monkeypatch):
+        """Testa se o mesmo corpus é carregado do cache sem retokenizar"""
+        expected = TemporalFeatureExtractor(min_df=1, cache_dir=temp_dir).fit_transform(catalog)
+
+        extractor = TemporalFeatureExtractor(min_df=1, cache_dir=temp_dir)
+        monkeypatch.setattr(extractor, "_counts", lambda *args, **kwargs: pytest.fail("corpus retokenized"))
+        cached = extractor.fit_transform(catalog)
+
+        pd.testing.assert_frame_equal(cached, expected)
+        assert extractor.yearly_stats_['songs'].sum() == len(catalog)
+        assert len(list(temp_dir.glob("temporal_*.npz"))) == 1
+
+    @pytest.mark.unit
+    def test_year_span_shorter_than_window(self, catalog):
+        """Testa catálogo com menos anos que a janela móvel"""
+        recent = catalog.assign(year=2017 + np.arange(len(catalog)) % 3)
+        extractor = TemporalFeatureExtractor(min_df=1, rolling_window=5)
+        features = extractor.fit_transform(recent)
+
+        assert len(features) == len(recent)
+        assert extractor.yearly_stats_['year'].tolist() == [2017, 2018, 2019]
+        assert (extractor.yearly_stats_['rolling_songs'] == len(recent)).all()
+
+    @pytest.mark.unit
+    def test_transform_reuses_fit_without_row_hashing(self, catalog, monkeypatch):
+        """Testa se transform no corpus de treino reaproveita as features sem hashear linha a linha"""
+        extractor = TemporalFeatureExtractor(min_df=1)
+        monkeypatch.setattr(extractor, "corpus_version", lambda df: pytest.fail("rows hashed"))
+        expected = extractor.fit_transform(catalog)
+
+        monkeypatch.setattr(extractor, "_counts", lambda *args, **kwargs: pytest.fail("corpus retokenized"))
+        pd.testing.assert_frame_equal(extractor.transform(catalog), expected)
+
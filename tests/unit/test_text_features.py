@@ -0,0 +1,161 @@
+"""
+Testes das features TF-IDF / n-gramas
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.features import text_features
+from src.features.lexicons import LexiconMatcher
+from src.features.text_features import (
+    LinguisticFeatureExtractor,
+    TextFeatureExtractor,
+    load_features,
+    save_features,
+)
+
+
+@pytest.fixture
+def lyrics_corpus():
+    """Letras sintéticas com marcações de seção"""
+    rng = np.random.default_rng(0)
+    vocab = [f"word{i}" for i in range(300)]
+    return ["[Chorus] " + " ".join(rng.choice(vocab, 40)) for _ in range(120)] + [None]
+
+
+class TestTextFeatureExtractor:
+    """Testes do extrator de features textuais"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("mode", ["tfidf", "hashing"])
+    def test_fit_transform_returns_csr(self, lyrics_corpus, mode):
+        """Testa se fit_transform gera CSR float32 normalizada"""
+        extractor = TextFeatureExtractor(mode=mode, n_features=2 ** 12, min_df=1)
+        features = extractor.fit_transform(lyrics_corpus, n_jobs=1)
+
+        assert sp.isspmatrix_csr(features)
+        assert features.dtype == np.float32
+        assert features.shape == (len(lyrics_corpus), extractor.num_features)
+        norms = np.sqrt(features.multiply(features).sum(axis=1)).A1
+        np.testing.assert_allclose(norms[:-1], 1.0, rtol=1e-5)
+        assert norms[-1] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("mode", ["tfidf", "hashing"])
+    def test_parallel_transform_matches_serial(self, lyrics_corpus, mode):
+        """Testa se a transformação em processos é idêntica à sequencial"""
+        extractor = TextFeatureExtractor(mode=mode, n_features=2 ** 12, min_df=1)
+        fitted = extractor.fit_transform(lyrics_corpus, n_jobs=1)
+
+        serial = extractor.transform(lyrics_corpus, n_jobs=1)
+        parallel = extractor.transform(lyrics_corpus, n_jobs=2, chunk_size=25)
+        assert abs(serial - parallel).max() == 0
+        assert abs(fitted - serial).max() < 1e-6
+
+    @pytest.mark.unit
+    def test_section_markers_and_ngrams(self):
+        """Testa remoção de marcações e presença de bigramas"""
+        extractor = TextFeatureExtractor(min_df=1, max_df=1.0)
+        extractor.fit(["[Verse 1] Hello darkness my old friend", "hello again"], n_jobs=1)
+        names = extractor.get_feature_names()
+
+        assert "hello darkness" in names
+        assert not any("verse" in name for name in names)
+
+    @pytest.mark.unit
+    def test_transform_requires_fit(self):
+        """Testa erro ao transformar sem ajustar"""
+        with pytest.raises(ValueError):
+            TextFeatureExtractor().transform(["la la"])
+
+    @pytest.mark.unit
+    def test_features_npz_roundtrip(self, lyrics_corpus, temp_dir):
+        """Testa salvar e carregar as features em .npz"""
+        features = TextFeatureExtractor(mode='hashing', n_features=2 ** 10).fit_transform(lyrics_corpus, n_jobs=1)
+        path = save_features(features, temp_dir / "processed_features_2024_01_01.npz")
+
+        loaded = load_features(path)
+        assert sp.isspmatrix_csr(loaded)
+        assert abs(loaded - features).max() == 0
+
+
+class TestLexiconMatcher:
+    """Testes do autômato Aho-Corasick sobre tokens"""
+
+    @pytest.mark.unit
+    def test_words_and_phrases_in_one_pass(self):
+        """Testa palavras e frases de vários léxicos, sem casar dentro de palavras"""
+        matcher = LexiconMatcher({
+            'self_harm': ["kill myself", "want to die"],
+            'negative': ["die", "pain"],
+            'profanity': ["ass"],
+        })
+        tokens = "i want to die and kill myself in class pain".split()
+        assert matcher.count(tokens) == [2, 2, 0]
+
+    @pytest.mark.unit
+    def test_overlapping_phrases(self):
+        """Testa frases sobrepostas que dependem dos links de falha"""
+        matcher = LexiconMatcher({'a': ["a b c", "b c d"], 'b': ["c"]})
+        assert matcher.count("a b c d".split()) == [2, 1]
+
+
+class TestLinguisticFeatureExtractor:
+    """Testes das features linguísticas com cache"""
+
+    LYRIC = "[Chorus]\nI want to die tonight\nI want to die tonight\n[Verse 1]\nShe loves the gun"
+
+    @pytest.mark.unit
+    def test_song_features(self):
+        """Testa contagens, razões e densidade de refrão de uma letra"""
+        extractor = LinguisticFeatureExtractor()
+        features = extractor.transform([self.LYRIC, None]).iloc[0]
+
+        assert features['num_tokens'] == 14
+        assert features['num_lines'] == 3
+        assert features['section_markers'] == 2
+        assert features['chorus_markers'] == 1
+        assert features['repeated_line_ratio'] == pytest.approx(1 / 3)
+        assert features['chorus_token_ratio'] == pytest.approx(10 / 14)
+        assert features['type_token_ratio'] == pytest.approx(9 / 14)
+        assert features['self_harm_count'] == 2
+        assert features['violence_count'] == 1
+        assert features['sentiment_score'] == -1
+
+    @pytest.mark.unit
+    def test_results_are_cached_per_song(self, temp_dir, monkeypatch):
+        """Testa se músicas já vistas não são recalculadas, inclusive após recarregar"""
+        cache_path = temp_dir / "linguistic.npz"
+        extractor = LinguisticFeatureExtractor(cache_path=cache_path)
+        first = extractor.transform(pd.Series([self.LYRIC, "la la la", self.LYRIC], index=[10, 11, 12]))
+        assert first.index.tolist() == [10, 11, 12]
+
+        reloaded = LinguisticFeatureExtractor(cache_path=cache_path)
+        computed = []
+        original = reloaded.song_features
+        monkeypatch.setattr(reloaded, "song_features", lambda text: computed.append(text) or original(text))
+        second = reloaded.transform([self.LYRIC, "new song", "la la la"])
+
+        assert computed == ["new song"]
+        np.testing.assert_array_equal(second.iloc[[0, 2]].to_numpy(), first.iloc[[0, 1]].to_numpy())
+
+    @pytest.mark.unit
+    def test_cache_ignored_when_lexicons_change(self, temp_dir):
+        """Testa se o cache é descartado quando os léxicos mudam"""
+        cache_path = temp_dir / "linguistic.npz"
+        LinguisticFeatureExtractor(cache_path=cache_path).transform([self.LYRIC])
+
+        custom = LinguisticFeatureExtractor(lexicons={'weather': ["rain", "sun"]}, cache_path=cache_path)
+        features = custom.transform(["rain rain sun"])
+        assert list(features.columns[-2:]) == ['weather_count', 'weather_ratio']
+        assert features['weather_count'].iloc[0] == 3
+
+    @pytest.mark.unit
+    def test_spacy_is_optional(self):
+        """Testa erro claro quando spaCy é pedido e não está instalado"""
+        if text_features.SPACY_AVAILABLE:
+            pytest.skip("spaCy instalado")
+        with pytest.raises(ImportError):
+            LinguisticFeatureExtractor(use_spacy=True)
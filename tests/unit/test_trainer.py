@@ -0,0 +1,120 @@
+"""
+Testes do treinamento da CNN
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import torch
+
+from src.data.preprocessor import LyricsPreprocessor
+from src.data.splitter import compute_sample_weights
+from src.models.base_model import BaseModel
+from src.models.trainer import CNNTrainer
+
+
+LYRICS = ["kill the night gun blood", "love you baby tonight", "gun fight kill", "sweet love baby"] * 6
+
+
+@pytest.fixture
+def corpus(temp_dir):
+    """Corpus tokenizado com rótulos separáveis"""
+    preprocessor = LyricsPreprocessor(max_sequence_length=16, min_word_freq=1)
+    corpus = preprocessor.process_corpus(LYRICS, str(temp_dir / "corpus"), n_jobs=1)
+    violent = np.array(['kill' in text or 'gun' in text for text in LYRICS])
+    labels = np.stack([violent, ~violent], axis=1).astype(np.float32)
+    return preprocessor, corpus, labels
+
+
+def make_trainer(mock_config, corpus, temp_dir, **training):
+    """Trainer com a configuração mock sobrescrita"""
+    preprocessor, tokenized, labels = corpus
+    config = dict(mock_config, labels=['violence', 'clean'], experiment={'name': 'test'})
+    config['training'] = dict(mock_config['training'], num_workers=0, checkpoint_dir=str(temp_dir / "models"))
+    config['training'].update(training)
+    torch.manual_seed(0)
+    return CNNTrainer.from_corpus(config, preprocessor, tokenized, labels, np.arange(16), np.arange(16, 24))
+
+
+class TestCNNTrainer:
+    """Testes do loop de treino, early stopping e checkpoint"""
+
+    @pytest.mark.unit
+    def test_train_returns_history_and_checkpoint(self, mock_config, corpus, temp_dir):
+        """Testa histórico, aprendizado e checkpoint do melhor modelo"""
+        trainer = make_trainer(
+            mock_config, corpus, temp_dir, epochs=6, learning_rate=0.01, gradient_accumulation_steps=2
+        )
+        history = trainer.train()
+
+        assert len(history['train_loss']) == len(history['val_loss']) == len(history['val_f1']) == 6
+        assert history['train_loss'][-1] < history['train_loss'][0]
+        assert history['val_f1'][-1] > 0.9
+
+        loaded = BaseModel.load(trainer.checkpoint_path)
+        assert loaded.labels == ['violence', 'clean']
+        best = trainer.best_epoch
+        assert history['val_loss'][best] == min(history['val_loss'])
+        np.testing.assert_allclose(loaded.predict_proba(LYRICS[:4]), trainer.model.predict_proba(LYRICS[:4]))
+
+    @pytest.mark.unit
+    def test_early_stopping(self, mock_config, corpus, temp_dir):
+        """Testa a parada quando a perda de validação não melhora"""
+        trainer = make_trainer(mock_config, corpus, temp_dir, epochs=10, learning_rate=0.0, patience=1)
+        history = trainer.train()
+
+        # Best at epoch 1, then patience=1 epoch without improvement
+        assert len(history['val_loss']) == 2
+        assert trainer.best_epoch == 0
+
+    @pytest.mark.unit
+    def test_empty_validation_set_rejected(self, mock_config, corpus):
+        """Testa rejeição de conjunto de validação vazio"""
+        preprocessor, tokenized, labels = corpus
+        config = dict(mock_config, labels=['violence', 'clean'])
+        with pytest.raises(ValueError):
+            CNNTrainer.from_corpus(config, preprocessor, tokenized, labels, np.arange(16), np.arange(0))
+
+    @pytest.mark.unit
+    def test_workers_and_full_precision(self, mock_config, corpus, temp_dir):
+        """Testa workers persistentes e treino sem autocast"""
+        trainer = make_trainer(mock_config, corpus, temp_dir, num_workers=1, mixed_precision='none')
+        history = trainer.train()
+        assert len(history['train_loss']) == mock_config['training']['epochs']
+
+        with pytest.raises(ValueError):
+            make_trainer(mock_config, corpus, temp_dir, mixed_precision='fp8')
+
+    @pytest.mark.unit
+    def test_sample_weights_oversample_rare_label(self, mock_config, corpus, monkeypatch):
+        """Testa se os pesos aumentam a frequência do rótulo raro em cada época"""
+        preprocessor, tokenized, labels = corpus
+        config = dict(mock_config, labels=['violence', 'clean'])
+        config['training'] = dict(mock_config['training'], epochs=3, num_workers=0)
+        # Every clean song and only two violent ones
+        train_indices = np.concatenate([np.flatnonzero(labels[:, 1]), np.flatnonzero(labels[:, 0])[:2]])
+        weights = compute_sample_weights(pd.DataFrame(labels[train_indices], columns=config['labels']), config['labels'])
+
+        def violent_share(sample_weights):
+            trainer = CNNTrainer.from_corpus(
+                config, preprocessor, tokenized, labels, train_indices, sample_weights=sample_weights
+            )
+            shares = []
+            train_epoch = trainer._train_epoch
+
+            def recording(loader, optimizer, criterion):
+                seen = np.concatenate([batch_labels.numpy() for _, _, batch_labels in loader])
+                assert len(seen) == len(train_indices)
+                shares.append(seen[:, 0].mean())
+                return train_epoch(loader, optimizer, criterion)
+
+            monkeypatch.setattr(trainer, '_train_epoch', recording)
+            trainer.train()
+            return np.array(shares)
+
+        np.testing.assert_allclose(violent_share(None), 2 / len(train_indices))
+        assert violent_share(weights).mean() > 0.3
+
+        with pytest.raises(ValueError):
+            CNNTrainer.from_corpus(config, preprocessor, tokenized, labels, train_indices, sample_weights=weights[:3])
+